@@ -0,0 +1,3 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
@@ -0,0 +1,168 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+"""Run validocx benchmarks.
+
+Usage: python -m benchmarks [--paragraphs N] [--output results.json]
+
+Every case is timed with timeit (best and median of several repeats) and
+run once more under tracemalloc to get its peak memory usage.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import docx
+
+import validocx
+from validocx import utils
+
+from .generator import generate_document, generate_requirements
+
+
+def _measure(func, repeat):
+    times = timeit.Timer(func).repeat(repeat=repeat, number=1)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'min': min(times), 'median': statistics.median(times),
+            'peak_memory': peak}
+
+
+def iter_cases(data, requirements, requirements_dir):
+    """Yield (name, callable, number of processed items) for every case."""
+
+    for engine in validocx.ENGINES:
+        yield ('validate[{0}]'.format(engine),
+               lambda engine=engine: validocx.validate(
+                   io.BytesIO(data), requirements, engine=engine,
+                   log_violations=False),
+               'paragraphs')
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        for engine in validocx.ENGINES:
+            yield ('validate[{0},vectorized]'.format(engine),
+                   lambda engine=engine: validocx.validate(
+                       io.BytesIO(data), requirements, engine=engine,
+                       log_violations=False, vectorized=True),
+                   'paragraphs')
+
+    wrapper = validocx.DocumentWrapper(docx.Document(io.BytesIO(data)))
+    paragraphs = list(wrapper.iter_paragraphs())
+
+    def fonts():
+        for paragraph in paragraphs:
+            wrapper.get_font_attributes(paragraph)
+
+    def paragraph_attributes():
+        for paragraph in paragraphs:
+            wrapper.get_paragraph_attributes(paragraph)
+
+    yield 'DocumentWrapper.get_font_attributes', fonts, 'paragraphs'
+    yield ('DocumentWrapper.get_paragraph_attributes', paragraph_attributes,
+           'paragraphs')
+
+    for data_format in ('yaml', 'json'):
+        file_path = os.path.join(requirements_dir,
+                                 'requirements.' + data_format)
+        utils.write_to_file(file_path, requirements)
+
+        def read(file_path=file_path):
+            # Cold start, the file is parsed
+            utils.clear_file_cache()
+            utils.read_from_file(file_path)
+
+        yield 'utils.read_from_file[{0}]'.format(data_format), read, 'files'
+        yield ('utils.read_from_file[{0},cached]'.format(data_format),
+               lambda file_path=file_path: utils.read_from_file(file_path),
+               'files')
+
+
+def run(arguments):
+    parameters = {name: arguments[name]
+                  for name in ('paragraphs', 'runs', 'style_depth',
+                               'sections', 'direct_formatting', 'seed')}
+    document = generate_document(**parameters)
+    stream = io.BytesIO()
+    document.save(stream)
+    data = stream.getvalue()
+    requirements = generate_requirements(arguments['style_depth'],
+                                         arguments['sections'])
+    counts = {'paragraphs': arguments['paragraphs'], 'files': 1}
+
+    results = []
+    with tempfile.TemporaryDirectory() as requirements_dir:
+        for name, func, items in iter_cases(data, requirements,
+                                            requirements_dir):
+            if arguments['filter'] and arguments['filter'] not in name:
+                continue
+            result = _measure(func, arguments['repeat'])
+            result.update(name=name, items=items,
+                          throughput=counts[items] / result['min'])
+            results.append(result)
+            print('{0:<45} {1:>10.4f} s {2:>12.1f} {3}/s {4:>10.1f} '
+                  'KiB'.format(name, result['min'], result['throughput'],
+                               items, result['peak_memory'] / 1024.0))
+
+    output = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'validocx': validocx.__version__,
+            'python-docx': docx.__version__,
+        },
+        'parameters': dict(parameters, document_size=len(data),
+                           repeat=arguments['repeat']),
+        'results': results,
+    }
+    if arguments['output']:
+        with open(arguments['output'], 'w') as stream:
+            json.dump(output, stream, indent=4)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='validocx benchmarks on a synthetic document.')
+    parser.add_argument('--paragraphs', type=int, default=2000,
+                        help='Number of paragraphs. Defaults to 2000.')
+    parser.add_argument('--runs', type=int, default=4,
+                        help='Number of runs per paragraph. Defaults to 4.')
+    parser.add_argument('--style-depth', type=int, default=3,
+                        help='Length of the chain of inherited styles. '
+                             'Defaults to 3.')
+    parser.add_argument('--sections', type=int, default=2,
+                        help='Number of sections. Defaults to 2.')
+    parser.add_argument('--direct-formatting', type=float, default=0.2,
+                        help='Share of directly formatted paragraphs and '
+                             'runs. Defaults to 0.2.')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the document generator.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timed repeats. Defaults to 5.')
+    parser.add_argument('-k', '--filter',
+                        help='Run only cases containing the substring.')
+    parser.add_argument('-o', '--output',
+                        help='JSON file to store results.')
+    return parser
+
+
+if __name__ == '__main__':
+    sys.exit(run(vars(create_parser().parse_args())))
@@ -0,0 +1,106 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['generate_document', 'generate_requirements']
+
+import random
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Cm, Pt
+
+_WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur',
+          'adipiscing', 'elit', 'sed', 'do', 'eiusmod', 'tempor')
+
+FONT_NAME = 'Times New Roman'
+FONT_SIZE = 14
+
+
+def _style_name(level):
+    return 'Bench Level {0}'.format(level)
+
+
+def generate_document(paragraphs=1000, runs=4, style_depth=3, sections=1,
+                      direct_formatting=0.2, seed=0):
+    """Build a synthetic document.
+
+    Paragraph styles form a chain of ``style_depth`` styles, each one based
+    on the previous one (the first one is based on 'Normal'). Paragraphs
+    are spread evenly over 'Normal' and the styles of the chain. Every
+    section break adds an empty paragraph.
+
+    :param paragraphs: number of paragraphs
+    :param runs: number of runs per paragraph
+    :param style_depth: length of the chain of inherited styles
+    :param sections: number of sections
+    :param direct_formatting: share (0..1) of runs and paragraphs having
+                              direct formatting, which overrides the style
+    :param seed: seed of the random generator, equal arguments produce
+                 equal documents
+    :rtype: docx.Document
+    """
+
+    rnd = random.Random(seed)
+    document = Document()
+    normal = document.styles['Normal']
+    normal.font.name = FONT_NAME
+    normal.font.size = Pt(FONT_SIZE)
+    normal.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
+    normal.paragraph_format.line_spacing = 1
+
+    styles = [normal]
+    for level in range(1, style_depth + 1):
+        style = document.styles.add_style(_style_name(level),
+                                          WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = styles[-1]
+        # Every level overrides something, so the whole chain matters
+        if level % 2:
+            style.paragraph_format.space_after = Pt(level)
+        else:
+            style.font.italic = True
+        styles.append(style)
+
+    section_every = max(paragraphs // max(sections, 1), 1)
+    for index in range(paragraphs):
+        if index and index % section_every == 0 and \
+                len(document.sections) < sections:
+            document.add_section()
+        paragraph = document.add_paragraph(style=styles[index % len(styles)])
+        if rnd.random() < direct_formatting:
+            paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            paragraph.paragraph_format.left_indent = Cm(rnd.randint(1, 3))
+        for _ in range(runs):
+            run = paragraph.add_run(' '.join(rnd.choice(_WORDS)
+                                             for _ in range(5)) + ' ')
+            if rnd.random() < direct_formatting:
+                run.bold = True
+                run.font.size = Pt(rnd.choice((12, 14, 16)))
+    return document
+
+
+def generate_requirements(style_depth=3, sections=1):
+    """Build requirements matching documents of generate_document().
+
+    Paragraphs and runs without direct formatting satisfy them, the rest
+    produce violations.
+    """
+
+    paragraph = {'unit': 'cm',
+                 'attributes': {'alignment': 0, 'line_spacing': 1}}
+    font = {'unit': 'pt', 'attributes': [FONT_SIZE, FONT_NAME]}
+    styles = {'Normal': {'font': font, 'paragraph': paragraph}}
+    for level in range(1, style_depth + 1):
+        styles[_style_name(level)] = {
+            'font': {'unit': 'pt',
+                     'attributes': font['attributes'] +
+                     ([] if level < 2 else ['italic'])},
+            'paragraph': paragraph
+        }
+    return {
+        'styles': styles,
+        'sections': [{'unit': 'cm',
+                      'attributes': {'left_margin': 3.175,
+                                     'right_margin': 3.175}}] * sections
+    }
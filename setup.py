@@ -34,6 +34,9 @@ setup(
     classifiers=classifiers,
     keywords='MS-Word docx validator',
     packages=['validocx'],
+    extras_require={
+        'vectorized': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'validocx = validocx.cli:main',
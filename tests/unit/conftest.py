@@ -2,9 +2,18 @@
 #    Copyright 2018 Vitalii Kulanov
 #
 
+import copy
+import io
+
 import pytest
 
 from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
 from docx.shared import Pt
 from docx.shared import Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -39,3 +48,46 @@ def document():
     # Add new section
     doc.add_section()
     return doc
+
+
+@pytest.fixture
+def structured_docx():
+    """Document with content outside of top-level body paragraphs."""
+
+    doc = Document()
+    doc.add_paragraph('Intro')
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = 'A'
+    table.cell(1, 1).add_table(rows=1, cols=1).cell(0, 0).text = 'Nested'
+    # Content control
+    table._tbl.addnext(parse_xml(
+        '<w:sdt {0}><w:sdtContent><w:p><w:r><w:t>Control</w:t></w:r></w:p>'
+        '</w:sdtContent></w:sdt>'.format(nsdecls('w'))))
+    doc.sections[0].header.paragraphs[0].text = 'Header'
+    doc.sections[0].footer.paragraphs[0].text = 'Footer'
+    doc.add_section()
+    # The second section refers to the same header part explicitly
+    first, second = doc.sections
+    for reference in first._sectPr.iterchildren(qn('w:headerReference')):
+        second._sectPr.insert(0, copy.deepcopy(reference))
+    doc.add_paragraph('Outro')
+    footnotes = Part(PackURI('/word/footnotes.xml'), CT.WML_FOOTNOTES, (
+        '<w:footnotes {0}><w:footnote w:type="separator" w:id="-1"><w:p/>'
+        '</w:footnote><w:footnote w:id="1"><w:p><w:r><w:t>Note</w:t></w:r>'
+        '</w:p></w:footnote></w:footnotes>'.format(nsdecls('w'))).encode(),
+        doc.part.package)
+    doc.part.relate_to(footnotes, RT.FOOTNOTES)
+    stream = io.BytesIO()
+    doc.save(stream)
+    return stream
+
+
+@pytest.fixture
+def failing_requirements():
+    return {
+        "styles": {style: {
+            "font": {"unit": "pt", "attributes": [8, "Arial"]},
+            "paragraph": {"unit": "cm", "attributes": {"alignment": 2}}
+        } for style in ('Title', 'Heading 1', 'Heading 2', 'Normal')},
+        "sections": [{"attributes": {'orientation': 0}, "unit": "cm"}] * 2
+    }
@@ -0,0 +1,134 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import asyncio
+import concurrent.futures
+import io
+import threading
+
+import pytest
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from validocx import AsyncValidator
+from validocx import validate
+from validocx import validate_async
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture(scope='module')
+def docx_data(document):
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+@pytest.fixture
+def executor():
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_validate_async(docx_data, failing_requirements, executor):
+    report = _run(validate_async(io.BytesIO(docx_data),
+                                 failing_requirements, executor=executor,
+                                 log_violations=False, max_errors=3))
+    expected = validate(io.BytesIO(docx_data), failing_requirements,
+                        log_violations=False, max_errors=3)
+    assert report.truncated
+    assert list(report) == list(expected)
+
+
+def test_validate_async_in_process_pool(failing_requirements):
+    document = Document()
+    document.add_paragraph('Centered').alignment = WD_ALIGN_PARAGRAPH.CENTER
+    stream = io.BytesIO()
+    document.save(stream)
+    data = stream.getvalue()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+        report = _run(validate_async(data, failing_requirements,
+                                     executor=executor, log_violations=False))
+    expected = validate(io.BytesIO(data), failing_requirements,
+                        log_violations=False)
+    assert any(v.actual == WD_ALIGN_PARAGRAPH.CENTER for v in report)
+    assert [v.message for v in report] == [v.message for v in expected]
+
+
+def test_async_validator_bounds_concurrency(mocker, executor,
+                                            failing_requirements):
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def fake_validate(docx, requirements, **options):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        threading.Event().wait(0.01)
+        with lock:
+            state['running'] -= 1
+        return docx
+
+    mocker.patch('validocx.aio.validate', side_effect=fake_validate)
+    validator = AsyncValidator(failing_requirements, executor=executor,
+                               max_concurrency=1)
+
+    async def validate_all():
+        return await asyncio.gather(*[validator.validate(i)
+                                      for i in range(4)])
+
+    assert _run(validate_all()) == [0, 1, 2, 3]
+    assert state['peak'] == 1
+
+
+def test_validate_many(mocker, failing_requirements, executor):
+    delays = {'slow': 0.2, 'fast': 0, 'broken': 0}
+
+    def fake_validate(docx, requirements, **options):
+        threading.Event().wait(delays[docx])
+        if docx == 'broken':
+            raise ValueError('Not a docx file')
+        return 'report'
+
+    mocker.patch('validocx.aio.validate', side_effect=fake_validate)
+    validator = AsyncValidator(failing_requirements, executor=executor,
+                               max_concurrency=2)
+
+    class Documents(object):
+        def __init__(self):
+            self._documents = iter(['slow', 'fast', 'broken'])
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            try:
+                return next(self._documents)
+            except StopIteration:
+                raise StopAsyncIteration
+
+    async def collect():
+        results = []
+        async for docx, report in validator.validate_many(
+                Documents(), return_exceptions=True):
+            results.append((docx, str(report)))
+        return results
+
+    assert _run(collect()) == [('fast', 'report'),
+                               ('broken', 'Not a docx file'),
+                               ('slow', 'report')]
+
+    async def first_error():
+        async for _ in validator.validate_many(['slow', 'broken']):
+            pass
+
+    with pytest.raises(ValueError):
+        _run(first_error())
@@ -0,0 +1,26 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+
+from benchmarks.generator import generate_document
+from benchmarks.generator import generate_requirements
+from validocx import validate
+
+
+def test_generate_document():
+    document = generate_document(paragraphs=30, runs=3, style_depth=4,
+                                 sections=3, direct_formatting=0)
+    paragraphs = [p for p in document.paragraphs if p.runs]
+    assert len(paragraphs) == 30
+    assert all(len(p.runs) == 3 for p in paragraphs)
+    assert len(document.sections) == 3
+    assert document.styles['Bench Level 4'].base_style.name == \
+        'Bench Level 3'
+
+    stream = io.BytesIO()
+    document.save(stream)
+    report = validate(stream, generate_requirements(style_depth=4,
+                                                    sections=3))
+    assert report.errors == report.warnings == 0
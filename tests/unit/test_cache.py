@@ -0,0 +1,75 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+import os
+
+import pytest
+
+from validocx import cache
+from validocx import validate
+from validocx.report import ValidationReport
+
+
+@pytest.fixture(scope='module')
+def docx_data(document):
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+def test_validate_with_cache(docx_data, failing_requirements, tmpdir, mocker):
+    cache_dir = tmpdir.join('cache').strpath
+    report = validate(io.BytesIO(docx_data), failing_requirements,
+                      cache=cache_dir)
+
+    m_document = mocker.patch('validocx.validator.Document')
+    cached = validate(io.BytesIO(docx_data), failing_requirements,
+                      cache=cache_dir)
+    assert not m_document.called
+    assert [v.message for v in cached] == [v.message for v in report]
+
+    # A truncated report is stored apart from the complete one
+    validate(io.BytesIO(docx_data), failing_requirements, cache=cache_dir,
+             fail_fast=True)
+    assert m_document.called
+
+
+def test_result_cache_eviction(docx_data, failing_requirements, tmpdir):
+    def stored():
+        return [os.path.join(root, name)
+                for root, _, names in os.walk(tmpdir.strpath)
+                for name in names]
+
+    validate(io.BytesIO(docx_data), failing_requirements,
+             cache=tmpdir.strpath)
+    first, = stored()
+    os.utime(first, (0, 0))
+    result_cache = cache.ResultCache(tmpdir.strpath,
+                                     max_size=os.path.getsize(first))
+    validate(io.BytesIO(docx_data), failing_requirements, cache=result_cache,
+             max_errors=2)
+    last, = stored()
+    assert last != first
+
+
+def test_result_cache_tracks_size(tmpdir, mocker):
+    def stored():
+        return sorted(name for _, _, names in os.walk(tmpdir.strpath)
+                      for name in names)
+
+    keys = ['{0:064x}'.format(i) for i in range(4)]
+    result_cache = cache.ResultCache(tmpdir.strpath)
+    result_cache.put(keys[0], ValidationReport())
+    size = os.path.getsize(os.path.join(tmpdir.strpath, keys[0][:2],
+                                        keys[0] + '.report'))
+    result_cache = cache.ResultCache(tmpdir.strpath, max_size=3 * size)
+    m_walk = mocker.spy(cache.os, 'walk')
+    # The directory is walked once, then only to evict reports
+    result_cache.put(keys[1], ValidationReport())
+    result_cache.put(keys[2], ValidationReport())
+    assert m_walk.call_count == 1
+    result_cache.put(keys[3], ValidationReport())
+    assert m_walk.call_count == 2
+    assert len(stored()) == 3
@@ -2,13 +2,18 @@
 #    Copyright 2017 Vitalii Kulanov
 #
 
+import json
 import logging
+import pickle
 import shlex
+import zipfile
 
 import pytest
 import yaml
 
 from validocx import cli
+from validocx import profiling
+from validocx.report import ERROR, WARNING, ValidationReport, Violation
 
 
 def exec_command(command=''):
@@ -64,18 +69,29 @@ def test_cli_verbosity_level_w_mutually_exclusive_params_fail(mocker, capsys):
 
 
 @pytest.fixture
-def message_counter_handler(mocker):
-    m_msg_lvl_cnt = mocker.patch.object(cli.MessageCounterHandler,
-                                        'msg_level_count',
-                                        new_callable=mocker.PropertyMock)
-    yield m_msg_lvl_cnt
+def root_logger():
     root_logger = logging.getLogger()
-    root_logger.handlers = [h for h in root_logger.handlers if
-                            not isinstance(h, cli.MessageCounterHandler)]
+    handlers, level = root_logger.handlers[:], root_logger.level
+    yield root_logger
+    for handler in root_logger.handlers:
+        if handler not in handlers:
+            root_logger.removeHandler(handler)
+            handler.close()
+    root_logger.setLevel(level)
 
 
-def test_cli_validate(message_counter_handler, mocker, caplog):
-    message_counter_handler.return_value = {'ERROR': 5, 'WARNING': 10}
+@pytest.fixture
+def report():
+    fake_report = ValidationReport()
+    for _ in range(5):
+        fake_report.add(Violation('section-attribute', ERROR, ('section', 0)))
+    for _ in range(10):
+        fake_report.add(Violation('section-undefined', WARNING,
+                                  ('section', 1)))
+    return fake_report
+
+
+def test_cli_validate(root_logger, report, mocker, caplog):
     mocker.patch('validocx.cli.os.path.lexists', return_value=True)
     docx_file = '/tmp/fake.docx'
     requirements = {'fake': {'foo': ['bar']}}
@@ -83,16 +99,16 @@ def test_cli_validate(message_counter_handler, mocker, caplog):
     cmd = '{0} --requirements {1}'.format(docx_file, req_file)
     m_open = mocker.mock_open(read_data=yaml.dump(requirements))
     mocker.patch('validocx.utils.open', m_open, create=True)
-    m_validate = mocker.patch('validocx.cli.validate')
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
     exec_command(cmd)
     m_open.assert_called_once_with(req_file, 'r')
-    m_validate.assert_called_once_with(docx_file, requirements)
+    m_validate.assert_called_once_with(docx_file, requirements,
+                                       engine='docx', max_errors=None)
     assert caplog.record_tuples == [
         ('root', 20, 'Summary results: Errors - 5, Warnings - 10')]
 
 
-def test_cli_validate_w_log_file(message_counter_handler, tmpdir, mocker):
-    message_counter_handler.return_value = {'ERROR': 5, 'WARNING': 10}
+def test_cli_validate_w_log_file(root_logger, report, tmpdir, mocker):
     mocker.patch('validocx.cli.os.path.lexists', return_value=True)
     log_file = tmpdir.join('fake.log')
     docx_file = '/tmp/fake.docx'
@@ -102,8 +118,264 @@ def test_cli_validate_w_log_file(message_counter_handler, tmpdir, mocker):
         docx_file, req_file, log_file)
     m_open = mocker.mock_open(read_data=yaml.dump(requirements))
     mocker.patch('validocx.utils.open', m_open, create=True)
-    m_validate = mocker.patch('validocx.cli.validate')
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
     exec_command(cmd)
     m_open.assert_called_once_with(req_file, 'r')
-    m_validate.assert_called_once_with(docx_file, requirements)
+    m_validate.assert_called_once_with(docx_file, requirements,
+                                       engine='docx', max_errors=None)
     assert "Summary results: Errors - 5, Warnings - 10" in log_file.read()
+
+
+def test_cli_expand_paths(tmpdir):
+    tmpdir.join('b.docx').write('')
+    tmpdir.join('notes.txt').write('')
+    tmpdir.join('~$lock.docx').write('')
+    tmpdir.mkdir('nested').join('a.docx').write('')
+    paths = [tmpdir.strpath, tmpdir.join('*.docx').strpath]
+    assert cli._expand_paths(paths) == [
+        tmpdir.join('b.docx').strpath,
+        tmpdir.join('nested', 'a.docx').strpath,
+    ]
+
+
+def test_cli_expand_paths_w_archive(tmpdir):
+    bundle = tmpdir.join('bundle.zip').strpath
+    with zipfile.ZipFile(bundle, 'w') as archive:
+        archive.writestr('a.docx', '')
+        archive.writestr('notes/b.docx', '')
+        archive.writestr('notes/c.txt', '')
+    assert cli._expand_paths([bundle]) == [bundle + '::a.docx',
+                                           bundle + '::notes/b.docx']
+    assert cli._get_docx_path(bundle + '::notes/b.docx')
+
+
+def test_cli_validate_batch(root_logger, mocker, caplog):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    m_compile = mocker.patch('validocx.cli.compile_requirements')
+    compiled = m_compile.return_value
+    requirements = {'fake': {'foo': ['bar']}}
+    m_open = mocker.mock_open(read_data=yaml.dump(requirements))
+    mocker.patch('validocx.utils.open', m_open, create=True)
+
+    def fake_validate(file_path, requirements, **options):
+        fake_report = ValidationReport()
+        if file_path == '/tmp/bad.docx':
+            fake_report.add(Violation('section-attribute', ERROR,
+                                      ('section', 0)))
+        fake_report.add(Violation('section-undefined', WARNING,
+                                  ('section', 1)))
+        return fake_report
+
+    m_validate = mocker.patch('validocx.cli.validate',
+                              side_effect=fake_validate)
+    exec_command('/tmp/good.docx /tmp/bad.docx -r /tmp/req.yaml -j 1')
+    m_compile.assert_called_once_with(requirements)
+    m_validate.assert_has_calls([
+        mocker.call('/tmp/good.docx', compiled, engine='docx',
+                    max_errors=None),
+        mocker.call('/tmp/bad.docx', compiled, engine='docx',
+                    max_errors=None)])
+    messages = [r.getMessage() for r in caplog.records if r.name == 'root']
+    assert messages == [
+        "Validating '/tmp/good.docx'.",
+        "Summary results for '/tmp/good.docx': Errors - 0, Warnings - 1",
+        "Validating '/tmp/bad.docx'.",
+        "Summary results for '/tmp/bad.docx': Errors - 1, Warnings - 1",
+        "Summary results: Files - 2, Errors - 1, Warnings - 2"]
+
+
+def test_cli_jobs_wrong_value_fail(mocker, capsys):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    with pytest.raises(SystemExit):
+        exec_command('fake.docx -r requirements.yaml -j 0')
+    out, err = capsys.readouterr()
+    assert "Value must be a positive integer, got '0'" in err
+
+
+@pytest.mark.parametrize('limit, max_errors', [
+    ('--fail-fast', 1),
+    ('--max-errors 3', 3)
+])
+def test_cli_validate_w_limit(limit, max_errors, root_logger, report, mocker):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
+    exec_command('/tmp/fake.docx -r /tmp/req.yaml {0}'.format(limit))
+    m_validate.assert_called_once_with('/tmp/fake.docx', {}, engine='docx',
+                                       max_errors=max_errors)
+
+
+def test_cli_limits_mutually_exclusive_fail(mocker, capsys):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    with pytest.raises(SystemExit):
+        exec_command('fake.docx -r req.yaml --fail-fast --max-errors 2')
+    out, err = capsys.readouterr()
+    assert ("error: argument --max-errors: "
+            "not allowed with argument --fail-fast" in err)
+
+
+def test_cli_validate_w_profile(root_logger, report, mocker, caplog):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    report.profile = {'load': profiling.ProfileEntry(1, 0.25, None)}
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
+    exec_command('/tmp/fake.docx -r /tmp/req.yaml --profile-memory')
+    profiler = m_validate.call_args[1]['profiler']
+    assert profiler._trace_memory
+    assert caplog.records[-1].getMessage().splitlines()[-1].split() == [
+        'load', '1', '0.2500', '-']
+
+
+@pytest.mark.parametrize('options, cache_dir', [
+    ('', '/tmp/env-cache'),
+    ('--cache-dir /tmp/cache', '/tmp/cache'),
+    ('--no-cache', None)
+])
+def test_cli_validate_w_cache(options, cache_dir, root_logger, report,
+                              mocker, monkeypatch):
+    monkeypatch.setenv('VALIDOCX_CACHE_DIR', '/tmp/env-cache')
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.cache.os.makedirs')
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
+    exec_command('/tmp/fake.docx -r /tmp/req.yaml {0}'.format(options))
+    result_cache = m_validate.call_args[1].get('cache')
+    if cache_dir is None:
+        assert result_cache is None
+    else:
+        assert result_cache.directory == cache_dir
+
+
+def test_cli_validate_w_scope(root_logger, report, mocker):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
+    exec_command("/tmp/fake.docx -r /tmp/req.yaml --only styles "
+                 "--styles 'Heading 1, Normal' --paragraphs 10:")
+    m_validate.assert_called_once_with(
+        '/tmp/fake.docx', {}, engine='docx', max_errors=None, only='styles',
+        styles=['Heading 1', 'Normal'], paragraphs=(10, None))
+
+
+@pytest.mark.parametrize('paragraphs', ['10', '5:2', '-1:', 'a:b'])
+def test_cli_paragraphs_wrong_value_fail(paragraphs, mocker, capsys):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    with pytest.raises(SystemExit):
+        exec_command('fake.docx -r req.yaml --paragraphs={0}'.format(
+            paragraphs))
+    out, err = capsys.readouterr()
+    assert 'Range must be specified as START:STOP' in err
+
+
+@pytest.mark.parametrize('options, jobs', [
+    ('-j 4', 4),
+    ('-j 1', None),
+    ('-j 4 --incremental-cache /tmp/validocx.cache', None),
+    ('-j 4 --vectorized', None)
+])
+def test_cli_validate_single_document_w_jobs(options, jobs, root_logger,
+                                             report, mocker):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    m_validate = mocker.patch('validocx.cli.validate', return_value=report)
+    exec_command('/tmp/fake.docx -r /tmp/req.yaml {0}'.format(options))
+    assert m_validate.call_args[1].get('jobs') == jobs
+
+
+@pytest.mark.parametrize('violations, exit_code', [
+    ([], 0),
+    ([(WARNING, 'section-undefined')], 4),
+    ([(WARNING, 'section-undefined'), (ERROR, 'section-attribute')], 1)
+])
+def test_cli_exit_code(violations, exit_code, root_logger, mocker):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open',
+                 mocker.mock_open(read_data=yaml.dump({})), create=True)
+    fake_report = ValidationReport()
+    for severity, kind in violations:
+        fake_report.add(Violation(kind, severity, ('section', 0)))
+    mocker.patch('validocx.cli.validate', return_value=fake_report)
+    args = cli.parse_args(shlex.split('/tmp/fake.docx -r /tmp/req.yaml'))
+    assert cli.run(arguments=args) == exit_code
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_cli_validate_w_format(jobs, failing_requirements, root_logger,
+                               tmpdir, mocker):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open', mocker.mock_open(
+        read_data=yaml.dump(failing_requirements)), create=True)
+    output = tmpdir.join('report.jsonl')
+
+    def fake_validate(file_path, requirements, sinks=(), **options):
+        assert not options['log_violations'] and not options['keep']
+        fake_report = ValidationReport(sinks=sinks, keep=False)
+        fake_report.add(Violation('section-undefined', WARNING,
+                                  ('section', 1)))
+        return fake_report
+
+    mocker.patch('validocx.cli.validate', side_effect=fake_validate)
+    files = ['/tmp/fake.docx'] if jobs == 1 else ['/tmp/a.docx',
+                                                  '/tmp/b.docx']
+    # Documents of a batch are validated in this process for -j 1
+    args = cli.parse_args(shlex.split(
+        '{0} -r /tmp/req.yaml -j 1 --format jsonl -o {1}'.format(
+            ' '.join(files), output)))
+    assert cli.run(arguments=args) == 4
+    lines = [json.loads(line) for line in output.readlines()]
+    assert [line['type'] for line in lines] == [
+        'violation', 'document'] * len(files) + ['summary']
+    assert [line['file'] for line in lines[:-1]] == [
+        f for f in files for _ in range(2)]
+    assert lines[-1] == {'type': 'summary', 'files': len(files),
+                         'errors': 0, 'warnings': len(files)}
+
+
+@pytest.mark.parametrize('output_format', [None, 'jsonl'])
+def test_cli_validate_w_aggregate(output_format, failing_requirements,
+                                  root_logger, tmpdir, mocker, caplog):
+    mocker.patch('validocx.cli.os.path.lexists', return_value=True)
+    mocker.patch('validocx.utils.open', mocker.mock_open(
+        read_data=yaml.dump(failing_requirements)), create=True)
+    output = tmpdir.join('report.jsonl')
+
+    def fake_validate(file_path, requirements, sinks=(), **options):
+        assert not options['log_violations'] and not options['keep']
+        fake_report = ValidationReport(sinks=sinks, keep=False)
+        for i in range(3):
+            fake_report.add(Violation('style-undefined', WARNING,
+                                      ('paragraph', i), style='Quote'))
+        return fake_report
+
+    mocker.patch('validocx.cli.validate', side_effect=fake_validate)
+    command = '/tmp/fake.docx -r /tmp/req.yaml --aggregate 2'
+    if output_format:
+        command += ' --format {0} -o {1}'.format(output_format, output)
+    assert cli.run(arguments=cli.parse_args(shlex.split(command))) == 4
+    message = ("3 x 'style-undefined', style 'Quote' at: paragraph 0; "
+               "paragraph 1 ...")
+    if output_format is None:
+        assert ('root', logging.WARNING, message) in caplog.record_tuples
+    else:
+        lines = [json.loads(line) for line in output.readlines()]
+        assert [line['type'] for line in lines] == ['group', 'document',
+                                                    'summary']
+        assert lines[0]['message'] == message
+        assert lines[0]['count'] == 3
+
+
+def test_record_spool(tmpdir, monkeypatch):
+    monkeypatch.setattr(cli.tempfile, 'tempdir', tmpdir.strpath)
+    records = cli._RecordSpool(max_records=2)
+    for i in range(5):
+        records.append('record {0}\n'.format(i))
+    assert len(tmpdir.listdir()) == 1
+    # Records are read back in the parent process
+    records = pickle.loads(pickle.dumps(records))
+    assert list(records) == ['record {0}\n'.format(i) for i in range(5)]
+    assert not tmpdir.listdir()
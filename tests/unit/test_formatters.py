@@ -0,0 +1,144 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+import json
+
+import pytest
+
+from validocx import formatters
+from validocx.report import ERROR, WARNING, AggregatingSink, Violation
+
+
+@pytest.fixture
+def violations():
+    return [
+        Violation('section-attribute', ERROR, ('section', 0),
+                  attribute='orientation', actual=1, expected=0),
+        Violation('paragraph-undefined-attribute', ERROR, ('paragraph', 3),
+                  style='Normal', attribute='alignment', expected=1,
+                  text='Some text', context=('table', 0, 'row', 1, 'cell',
+                                             2)),
+        Violation('style-undefined', WARNING, ('paragraph', 4),
+                  style='Quote'),
+    ]
+
+
+def _write(output_format, violations):
+    stream = io.StringIO()
+    writer = formatters.get_writer(output_format)(stream)
+    sink = writer.sink('a.docx')
+    for violation in violations[:2]:
+        sink(violation)
+    writer.add_document('a.docx', 2, 0)
+    writer.write_record(writer.format_violation(violations[2],
+                                                'dir/b c.docx'))
+    writer.add_document('dir/b c.docx', 0, 1, truncated=True)
+    writer.close()
+    return stream.getvalue()
+
+
+def test_jsonl_writer(violations):
+    lines = [json.loads(line) for line in
+             _write('jsonl', violations).splitlines()]
+    assert [line['type'] for line in lines] == [
+        'violation', 'violation', 'document', 'violation', 'document',
+        'summary']
+    assert lines[1]['file'] == 'a.docx'
+    assert lines[1]['context'] == ['table', 0, 'row', 1, 'cell', 2]
+    assert lines[1]['message'] == violations[1].message
+    assert lines[4] == {'type': 'document', 'file': 'dir/b c.docx',
+                        'errors': 0, 'warnings': 1, 'truncated': True}
+    assert lines[-1] == {'type': 'summary', 'files': 2, 'errors': 2,
+                         'warnings': 1}
+
+
+def test_json_writer(violations):
+    data = json.loads(_write('json', violations))
+    assert [v['kind'] for v in data['violations']] == [
+        v.kind for v in violations]
+    assert [d['file'] for d in data['documents']] == ['a.docx',
+                                                      'dir/b c.docx']
+    assert data['summary'] == {'files': 2, 'errors': 2, 'warnings': 1}
+
+
+def test_sarif_writer(violations):
+    data = json.loads(_write('sarif', violations))
+    assert data['version'] == '2.1.0'
+    run = data['runs'][0]
+    rules = [rule['id'] for rule in run['tool']['driver']['rules']]
+    results = run['results']
+    assert all(result['ruleId'] in rules for result in results)
+    assert [result['level'] for result in results] == [
+        'error', 'error', 'warning']
+    location = results[1]['locations'][0]
+    assert location['physicalLocation']['artifactLocation']['uri'] == \
+        'a.docx'
+    assert location['logicalLocations'][0]['fullyQualifiedName'] == \
+        'table/0/row/1/cell/2/paragraph/3'
+    assert results[2]['locations'][0]['physicalLocation'][
+        'artifactLocation']['uri'] == 'dir/b%20c.docx'
+    assert results[1]['properties']['attribute'] == 'alignment'
+    assert run['properties'] == {'files': 2, 'errors': 2, 'warnings': 1}
+
+
+def _write_groups(output_format, violations):
+    stream = io.StringIO()
+    writer = formatters.get_writer(output_format)(stream)
+    aggregator = AggregatingSink(max_samples=2)
+    for violation in violations[:2] * 3:
+        aggregator(violation)
+    for group in aggregator:
+        writer.write_record(writer.format_group(group, 'a.docx'))
+    writer.add_document('a.docx', 6, 0)
+    writer.close()
+    return stream.getvalue()
+
+
+@pytest.mark.parametrize('output_format', ['json', 'jsonl'])
+def test_writer_groups(output_format, violations):
+    output = _write_groups(output_format, violations)
+    if output_format == 'jsonl':
+        groups = [json.loads(line) for line in output.splitlines()[:2]]
+        assert {group['type'] for group in groups} == {'group'}
+    else:
+        groups = json.loads(output)['violations']
+    assert [group['count'] for group in groups] == [3, 3]
+    assert [group['file'] for group in groups] == ['a.docx', 'a.docx']
+    assert groups[1]['samples'][0] == {
+        'context': ['table', 0, 'row', 1, 'cell', 2],
+        'location': ['paragraph', 3]}
+
+
+def test_sarif_writer_groups(violations):
+    results = json.loads(_write_groups('sarif', violations))['runs'][0][
+        'results']
+    assert [result['occurrenceCount'] for result in results] == [3, 3]
+    assert [len(result['locations']) for result in results] == [2, 2]
+    assert results[1]['locations'][0]['logicalLocations'][0][
+        'fullyQualifiedName'] == 'table/0/row/1/cell/2/paragraph/3'
+
+
+@pytest.mark.parametrize('output_format', ['json', 'jsonl', 'sarif'])
+def test_writer_wo_documents(output_format):
+    stream = io.StringIO()
+    formatters.get_writer(output_format)(stream).close()
+    lines = stream.getvalue().splitlines()
+    if output_format == 'jsonl':
+        assert json.loads(lines[-1])['files'] == 0
+    else:
+        json.loads(stream.getvalue())
+
+
+def test_get_writer_fail():
+    with pytest.raises(ValueError):
+        formatters.get_writer('xml')
+
+
+def test_incomplete_writer_fail():
+    class Writer(formatters._Writer):
+        format_violation = formatters.JsonLinesWriter.format_violation
+
+    with pytest.raises(TypeError):
+        Writer(io.StringIO())
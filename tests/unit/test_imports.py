@@ -0,0 +1,48 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+import validocx
+
+# Cumulative import time of the CLI entry point, in microseconds. Heavy
+# dependencies alone take several times longer to import
+CLI_IMPORT_TIME_BUDGET = 150000
+
+HEAVY_MODULES = ('docx', 'lxml', 'jsonschema', 'yaml')
+
+
+def _import_times(module):
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    times = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='-X importtime requires Python 3.7')
+def test_cli_import_time():
+    times = _import_times('validocx.cli')
+    heavy = [name for name in times
+             if name.split('.')[0] in HEAVY_MODULES]
+    assert heavy == []
+    assert times['validocx.cli'] < CLI_IMPORT_TIME_BUDGET
+
+
+def test_public_names():
+    for module, names in validocx._EXPORTS:
+        module = importlib.import_module('validocx.' + module)
+        assert sorted(module.__all__) == sorted(names)
+    for name in validocx.__all__:
+        assert getattr(validocx, name) is not None
@@ -0,0 +1,56 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+import logging
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from validocx import incremental
+from validocx import validate
+
+
+def _revision(texts):
+    document = Document()
+    for text in texts:
+        paragraph = document.add_paragraph(text)
+        paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream
+
+
+def _messages(report):
+    return [(v.location, v.message) for v in report]
+
+
+def test_incremental_validation(tmpdir, failing_requirements):
+    cache_file = tmpdir.join('validocx.cache').strpath
+    first = _revision(['one', 'two', 'three'])
+    report = validate(first, failing_requirements, incremental=cache_file)
+    cache = incremental.IncrementalCache(cache_file)
+    assert len(cache) == 3
+
+    second = _revision(['zero', 'one', 'two', 'three (revised)'])
+    report = validate(second, failing_requirements, incremental=cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+    second.seek(0)
+    assert _messages(report) == _messages(validate(second,
+                                                   failing_requirements))
+    assert len(incremental.IncrementalCache(cache_file)) == 5
+
+    # Other requirements make all the cached violations stale
+    failing_requirements['styles']['Normal']['font']['attributes'] = [9]
+    validate(second, failing_requirements, incremental=cache)
+    assert (cache.hits, cache.misses) == (0, 4)
+
+
+def test_incremental_cache_broken_file(tmpdir, caplog):
+    cache_file = tmpdir.join('validocx.cache')
+    cache_file.write('garbage')
+    with caplog.at_level(logging.WARNING):
+        cache = incremental.IncrementalCache(cache_file.strpath)
+    assert len(cache) == 0
+    assert 'is ignored' in caplog.text
@@ -0,0 +1,60 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+
+import pytest
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+from validocx import parallel
+from validocx import validate
+
+
+@pytest.fixture
+def docx():
+    document = Document()
+    for i in range(25):
+        paragraph = document.add_paragraph('Paragraph {0}'.format(i))
+        if i % 3:
+            paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if i % 5 == 0:
+            document.add_heading('Heading {0}'.format(i), 1)
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream
+
+
+def _violations(report):
+    return [(v.severity, v.location, v.message) for v in report]
+
+
+@pytest.mark.parametrize('engine', ['docx', 'stream'])
+@pytest.mark.parametrize('scope', [
+    {},
+    {'only': 'styles', 'styles': ['Heading 1']},
+    {'paragraphs': (7, 22)}
+])
+def test_parallel_validation(engine, scope, docx, failing_requirements,
+                             mocker):
+    mocker.patch.object(parallel, 'DEFAULT_CHUNK_SIZE', 4)
+    expected = _violations(validate(docx, failing_requirements,
+                                    engine=engine, **scope))
+    docx.seek(0)
+    report = validate(docx, failing_requirements, engine=engine, jobs=2,
+                      **scope)
+    assert expected
+    assert _violations(report) == expected
+
+
+def test_parallel_validation_w_limit(docx, failing_requirements):
+    report = validate(docx, failing_requirements, jobs=2, max_errors=3)
+    assert report.errors == 3
+
+
+def test_parallel_validation_incremental_fail(docx, failing_requirements):
+    with pytest.raises(ValueError):
+        validate(docx, failing_requirements, jobs=2,
+                 incremental=io.BytesIO())
@@ -0,0 +1,53 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+
+from validocx import profiling
+from validocx import validate
+
+
+class Fake(object):
+    def method(self, value):
+        return value * 2
+
+
+def test_profiler_phases_and_methods():
+    stats = []
+    profiler = profiling.Profiler(trace_memory=True, hook=stats.append)
+    fake = Fake()
+    with profiler.phase('load'):
+        [bytearray(1024) for _ in range(10)]
+    profiler.instrument(fake, ['method'])
+    items = profiler.iter_phase('check', (fake.method(i) for i in range(3)))
+    assert list(items) == [0, 2, 4]
+    assert fake.method(5) == 10
+    profiler.restore()
+    assert 'method' not in fake.__dict__
+
+    result = profiler.finish()
+    assert stats == [result]
+    assert list(result) == ['load', 'check', 'Fake.method']
+    assert result['load'].calls == result['check'].calls == 1
+    assert result['load'].peak_memory > 0
+    assert result['Fake.method'].calls == 4
+    assert result['Fake.method'].peak_memory is None
+
+
+def test_merge_stats():
+    entry = profiling.ProfileEntry
+    merged = profiling.merge_stats({'load': entry(1, 0.5, 10)},
+                                   {'load': entry(2, 1.0, 30)}, None)
+    assert merged == {'load': entry(3, 1.5, 30)}
+
+
+def test_validate_with_profiler(document, failing_requirements):
+    stream = io.BytesIO()
+    document.save(stream)
+    report = validate(stream, failing_requirements, log_violations=False,
+                      profiler=profiling.Profiler())
+    phases = ['load', 'requirements', 'sections', 'styles']
+    assert [name for name in report.profile if name in phases] == phases
+    assert report.profile['DocumentWrapper.get_run_signature'].calls == 7
+    assert report.to_json()['profile']['load']['calls'] == 1
@@ -0,0 +1,140 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import logging
+import pickle
+
+import pytest
+
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+from validocx import report
+
+
+@pytest.mark.parametrize('violation, expected', [
+    (report.Violation('section-attribute', report.ERROR, ('section', 1),
+                      attribute='orientation', actual=0, expected=1),
+     "'Section 1': attribute 'orientation' with value 0 does not match "
+     "required value 1"),
+    (report.Violation('section-undefined', report.WARNING, ('section', 2)),
+     "The requirements for 'Section 2' are not specified."),
+    (report.Violation('style-undefined', report.WARNING, ('paragraph', 0),
+                      style='Title'),
+     "Undefined style: 'Title'."),
+    (report.Violation('font', report.ERROR, ('paragraph', 0, 'run', 1),
+                      style='Title', actual=[26.0, 'Calibri', 'bold'],
+                      expected=(26, 'Calibri'), text='Fake'),
+     "Font attributes (26.0, Calibri, bold) mismatch required (26, Calibri) "
+     "in paragraph with style 'Title':\n'Fake'"),
+    (report.Violation('paragraph-attribute', report.ERROR, ('paragraph', 3),
+                      style='Normal', attribute='alignment', actual=3,
+                      expected=1, text='Fake'),
+     "The attribute of paragraph 'alignment' (Normal) with value 3 does not "
+     "match required value 1: \n'Fake'"),
+    (report.Violation('paragraph-undefined-attribute', report.ERROR,
+                      ('paragraph', 3), style='Normal',
+                      attribute='keep_together', expected=True, text='Fake'),
+     "The attribute of paragraph 'keep_together' is not defined. "
+     "The required value is True: \n'Fake'"),
+])
+def test_violation_message(violation, expected):
+    assert violation.message == expected
+    assert str(violation) == expected
+
+
+def test_report_counters():
+    sink = []
+    validation_report = report.ValidationReport(sinks=[sink.append],
+                                                keep=False)
+    violations = [
+        report.Violation('section-undefined', report.WARNING, ('section', 1)),
+        report.Violation('section-attribute', report.ERROR, ('section', 0)),
+    ]
+    for violation in violations:
+        validation_report.add(violation)
+    assert (validation_report.errors, validation_report.warnings) == (1, 1)
+    assert list(validation_report) == []
+    assert sink == violations
+
+
+def test_report_pickle():
+    validation_report = report.ValidationReport(sinks=[print])
+    violations = [
+        report.Violation('section-undefined', report.WARNING,
+                         ('section', 1)),
+        report.Violation('paragraph-attribute', report.ERROR,
+                         ('paragraph', 3), style='Normal',
+                         attribute='alignment',
+                         actual=WD_PARAGRAPH_ALIGNMENT.CENTER, expected=0,
+                         text='Fake')
+    ]
+    for violation in violations:
+        validation_report.add(violation)
+    restored = pickle.loads(pickle.dumps(validation_report))
+    assert (restored.errors, restored.warnings) == (1, 1)
+    assert restored.violations == violations
+    assert [v.message for v in restored] == [v.message for v in violations]
+
+
+def test_logging_sink_renders_lazily(mocker, caplog):
+    m_message = mocker.patch.object(report.Violation, 'message',
+                                    new_callable=mocker.PropertyMock,
+                                    return_value='fake message')
+    sink = report.LoggingSink(logging.getLogger('fake'))
+    violation = report.Violation('style-undefined', report.WARNING,
+                                 ('paragraph', 0))
+    with caplog.at_level(logging.ERROR):
+        sink(violation)
+    assert not m_message.called
+    sink(violation)
+    assert caplog.record_tuples == [('fake', logging.WARNING,
+                                     'fake message')]
+
+
+def _paragraph_violation(index, actual, context=()):
+    return report.Violation('paragraph-attribute', report.ERROR,
+                            ('paragraph', index), style='Normal',
+                            attribute='first_line_indent', actual=actual,
+                            expected=1.25, text='Fake', context=context)
+
+
+def test_aggregating_sink():
+    sink = report.AggregatingSink(max_samples=2)
+    for i in range(5):
+        sink(_paragraph_violation(i, 0.5))
+    sink(_paragraph_violation(5, 0.75, context=('table', 0)))
+    font = {'size': 14, 'name': 'Calibri'}
+    for j in range(2):
+        sink(report.Violation('font', report.ERROR, ('paragraph', 7, 'run', j),
+                              style='Normal', actual=[11.0, 'Calibri'],
+                              expected=font, text='Fake'))
+    first, second, third = sink.groups
+    assert [g.count for g in sink.groups] == [5, 1, 2]
+    assert first.samples == [((), ('paragraph', 0)), ((), ('paragraph', 1))]
+    assert first.message == (
+        "5 x 'paragraph-attribute', style 'Normal', attribute "
+        "'first_line_indent', value 0.5, required value 1.25 at: "
+        "paragraph 0; paragraph 1 ...")
+    assert second.message.endswith('at: table 0, paragraph 5')
+    assert third.samples[1] == ((), ('paragraph', 7, 'run', 1))
+    assert len(sink) == 3 and not sink.dropped
+
+
+def test_aggregating_sink_max_groups():
+    sink = report.AggregatingSink(max_groups=2)
+    for i in range(5):
+        sink(_paragraph_violation(i, float(i % 3)))
+    assert [g.actual for g in sink] == [0.0, 1.0]
+    assert [g.count for g in sink] == [2, 2]
+    assert sink.dropped == 1
+
+
+def test_violation_group_to_json():
+    sink = report.AggregatingSink()
+    sink(_paragraph_violation(3, 0.5, context=('table', 0)))
+    data = next(iter(sink)).to_json()
+    assert data['count'] == 1
+    assert data['samples'] == [{'context': ['table', 0],
+                                'location': ['paragraph', 3]}]
+    assert 'text' not in data and data['message']
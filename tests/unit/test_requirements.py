@@ -0,0 +1,75 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import pickle
+
+import jsonschema
+import pytest
+
+from validocx import requirements
+
+
+@pytest.fixture
+def document_requirements():
+    return {
+        'styles': {
+            'Normal': {
+                'font': {'unit': 'pt', 'attributes': [14, 'Calibri']},
+                'paragraph': {'unit': 'cm',
+                              'attributes': {'line_spacing': 1}}
+            }
+        },
+        'sections': [{'unit': 'cm', 'attributes': {'orientation': 0}}]
+    }
+
+
+def test_compile_requirements(document_requirements):
+    compiled = requirements.compile_requirements(document_requirements)
+    assert compiled.sections[0]['attributes'] == {'orientation': 0}
+    font = compiled.styles['Normal']['font']
+    assert font['attributes'] == (14, 'Calibri')
+    assert font['attribute_set'] == frozenset([14, 'Calibri'])
+    # 14 pt in EMUs
+    assert font['record'].size == 177800
+    assert compiled.styles['Normal']['paragraph']['bounds'] == {
+        'line_spacing': (356401, 363636)}
+    assert compiled.sections[0]['bounds'] == {'orientation': (0, 0)}
+    assert compiled.to_dict() == document_requirements
+    assert requirements.compile_requirements(compiled) is compiled
+
+
+def test_compiled_requirements_immutable(document_requirements):
+    compiled = requirements.CompiledRequirements(document_requirements)
+    with pytest.raises(TypeError):
+        compiled.styles['Normal']['font']['unit'] = 'cm'
+    # Changes of the source requirements do not affect compiled ones
+    document_requirements['sections'].clear()
+    assert len(compiled['sections']) == 1
+
+
+def test_compiled_requirements_pickle(document_requirements):
+    compiled = requirements.CompiledRequirements(document_requirements)
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert restored.to_dict() == compiled.to_dict()
+    assert restored.styles['Normal']['font']['attribute_set'] == frozenset(
+        [14, 'Calibri'])
+    assert restored.digest == compiled.digest
+
+
+def test_compiled_requirements_digest(document_requirements):
+    digest = requirements.CompiledRequirements(document_requirements).digest
+    document_requirements['sections'][0]['attributes']['orientation'] = 1
+    assert requirements.CompiledRequirements(
+        document_requirements).digest != digest
+
+
+def test_compile_requirements_fail():
+    with pytest.raises(jsonschema.exceptions.ValidationError) as excinfo:
+        requirements.CompiledRequirements({'styles': {}})
+    assert "'sections' is a required property" in str(excinfo.value)
+
+
+def test_schema_validator_cached():
+    assert (requirements.get_schema_validator() is
+            requirements.get_schema_validator())
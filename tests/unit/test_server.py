@@ -0,0 +1,131 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import concurrent.futures
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from validocx import cli
+from validocx import server
+
+
+@pytest.fixture(scope='module')
+def docx_data(document):
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+@pytest.fixture
+def service():
+    requirements = {
+        'styles': {},
+        'sections': [{'unit': 'cm', 'attributes': {'orientation': 1}}]
+    }
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    validation_server = server.create_server(
+        {'thesis': requirements}, address=('127.0.0.1', 0),
+        executor=executor)
+    thread = threading.Thread(target=validation_server.serve_forever)
+    thread.start()
+    yield 'http://127.0.0.1:{0}'.format(validation_server.server_address[1])
+    validation_server.shutdown()
+    validation_server.server_close()
+    executor.shutdown()
+    thread.join()
+
+
+def request(url, data=None):
+    try:
+        with urllib.request.urlopen(url, data=data) as response:
+            return response.status, json.loads(
+                response.read().decode('utf-8'))
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read().decode('utf-8'))
+
+
+def test_server_profiles(service):
+    assert request(service + '/profiles') == (200, {'profiles': ['thesis']})
+
+
+def test_server_validate(service, docx_data):
+    status, result = request(service + '/validate?profile=thesis', docx_data)
+    assert status == 200
+    assert result['profile'] == 'thesis'
+    assert (result['errors'], result['warnings']) == (1, 6)
+    assert result['violations'][0] == {
+        'kind': 'section-attribute', 'severity': 'error',
+        'location': ['section', 0], 'style': None,
+        'attribute': 'orientation', 'actual': 0, 'expected': 1, 'text': None,
+        'context': [],
+        'message': "'Section 0': attribute 'orientation' with value "
+                   "PORTRAIT (0) does not match required value 1"}
+
+
+def test_server_validate_fail_fast(service, docx_data):
+    status, result = request(
+        service + '/validate?profile=thesis&fail_fast=1', docx_data)
+    assert (status, result['errors'], result['truncated']) == (200, 1, True)
+
+
+@pytest.mark.parametrize('path, data, expected', [
+    ('/validate?profile=fake', b'', (404, "Unknown profile 'fake'")),
+    ('/fake', None, (404, "Unknown path '/fake'")),
+    ('/validate?profile=thesis&max_errors=x', b'',
+     (400, 'Invalid request parameters')),
+    ('/validate?profile=thesis&max_errors=0', b'',
+     (400, 'Invalid request parameters')),
+    ('/validate?profile=thesis&max_errors=-5', b'',
+     (400, 'Invalid request parameters')),
+    ('/validate?profile=thesis', b'fake',
+     (422, 'Failed to validate document: File is not a zip file')),
+])
+def test_server_request_fail(service, path, data, expected):
+    status, result = request(service + path, data)
+    assert (status, result['error']) == expected
+
+
+def test_server_parse_args(tmpdir):
+    requirements = tmpdir.join('thesis.yaml')
+    requirements.write('')
+    args = cli.parse_args(['serve', '-r', 'thesis={0}'.format(requirements),
+                           '--unix-socket', '/tmp/validocx.sock', '-j', '2'])
+    assert args['command'] == 'serve'
+    assert args['requirements'] == [('thesis', requirements.strpath)]
+    assert (args['unix_socket'], args['jobs']) == ('/tmp/validocx.sock', 2)
+
+
+def test_server_wrong_profile_fail(capsys):
+    with pytest.raises(SystemExit):
+        cli.parse_args(['serve', '-r', 'thesis.yaml'])
+    out, err = capsys.readouterr()
+    assert ("Profile must be specified as NAME=FILE, "
+            "got 'thesis.yaml'" in err)
+
+
+@pytest.mark.parametrize('queue_size', ['-1', 'x'])
+def test_server_wrong_queue_size_fail(queue_size, tmpdir, capsys):
+    requirements = tmpdir.join('thesis.yaml')
+    requirements.write('')
+    with pytest.raises(SystemExit):
+        cli.parse_args(['serve', '-r', 'thesis={0}'.format(requirements),
+                        '--queue-size', queue_size])
+    out, err = capsys.readouterr()
+    assert ("Value must be a non-negative integer, "
+            "got '{0}'".format(queue_size) in err)
+
+
+def test_pool_executor():
+    executor = server._PoolExecutor(1)
+    try:
+        assert executor.submit(abs, -2).result(timeout=10) == 2
+        with pytest.raises(ValueError):
+            executor.submit(int, 'x').result(timeout=10)
+    finally:
+        executor.shutdown()
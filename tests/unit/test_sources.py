@@ -0,0 +1,103 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+import mmap
+import tarfile
+import zipfile
+
+import pytest
+
+from docx import Document
+
+from validocx import sources
+from validocx import validate
+
+
+@pytest.fixture
+def docx_data():
+    document = Document()
+    document.add_heading('Title', 0)
+    document.add_paragraph('Some text.')
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream.getvalue()
+
+
+@pytest.fixture
+def bundles(tmpdir, docx_data):
+    docx_file = tmpdir.join('thesis.docx')
+    docx_file.write_binary(docx_data)
+    paths = {}
+    for name, compression in (('stored.zip', zipfile.ZIP_STORED),
+                              ('deflated.zip', zipfile.ZIP_DEFLATED)):
+        paths[name] = tmpdir.join(name).strpath
+        with zipfile.ZipFile(paths[name], 'w', compression) as archive:
+            archive.writestr('notes.txt', 'notes')
+            archive.write(docx_file.strpath, 'docs/thesis.docx')
+    for name, mode in (('bundle.tar', 'w'), ('bundle.tar.gz', 'w:gz')):
+        paths[name] = tmpdir.join(name).strpath
+        with tarfile.open(paths[name], mode) as archive:
+            archive.add(docx_file.strpath, 'docs/thesis.docx')
+    return paths
+
+
+def test_buffer_reader():
+    reader = sources.BufferReader(bytearray(b'0123456789'))
+    assert reader.read(3) == b'012'
+    assert reader.seek(-2, io.SEEK_END) == 8
+    assert reader.read() == b'89'
+    assert reader.read(1) == b''
+    reader.seek(2)
+    buffer = bytearray(4)
+    assert reader.readinto(buffer) == 4
+    assert buffer == b'2345'
+    with pytest.raises(OSError):
+        reader.seek(-1)
+    reader.close()
+    assert reader.closed
+
+
+@pytest.mark.parametrize('name', ['stored.zip', 'deflated.zip', 'bundle.tar',
+                                  'bundle.tar.gz'])
+def test_open_docx_archive_member(name, bundles, docx_data):
+    path = '{0}::docs/thesis.docx'.format(bundles[name])
+    assert sources.exists(path)
+    assert not sources.exists('{0}::docs/fake.docx'.format(bundles[name]))
+    with sources.open_docx(path) as stream:
+        assert stream.read() == docx_data
+
+
+def test_iter_archive_members(bundles):
+    for name, path in bundles.items():
+        assert list(sources.iter_archive_members(path)) == [
+            '{0}::docs/thesis.docx'.format(path)]
+
+
+def test_validate_in_memory_inputs(tmpdir, docx_data, bundles,
+                                   failing_requirements):
+    docx_file = tmpdir.join('thesis.docx')
+    docx_file.write_binary(docx_data)
+    expected = [v.message for v in validate(io.BytesIO(docx_data),
+                                            failing_requirements)]
+    with open(docx_file.strpath, 'rb') as stream:
+        mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    for docx in (docx_data, memoryview(docx_data), mapping,
+                 docx_file.strpath,
+                 '{0}::docs/thesis.docx'.format(bundles['stored.zip'])):
+        for engine in ('docx', 'stream'):
+            report = validate(docx, failing_requirements, engine=engine)
+            assert [v.message for v in report] == expected
+    mapping.close()
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('thesis.docx', True),
+    ('docs/thesis.docx', True),
+    ('docs/~$thesis.docx', False),
+    ('~$thesis.docx', False),
+    ('docs/thesis.doc', False),
+])
+def test_is_docx(path, expected):
+    assert sources.is_docx(path) is expected
@@ -0,0 +1,82 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+
+import pytest
+
+from validocx import streaming
+from validocx import validate
+from validocx import wrapper
+
+
+@pytest.fixture(scope='module')
+def docx_file(document):
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream
+
+
+@pytest.fixture
+def docx_wrapper(docx_file):
+    return streaming.StreamingDocumentWrapper(docx_file)
+
+
+def test_streaming_core_properties(docx_wrapper):
+    assert docx_wrapper.author == 'python-docx'
+    assert docx_wrapper.last_modified_by == ''
+
+
+@pytest.mark.parametrize('paragraph_styles, expected', [
+    (['Title'], ['Fake Title']),
+    (['Heading 1', 'Heading 2'], ['Fake Header 1', 'Fake Header 2']),
+    (None, ['Fake Title', 'Fake Header 1', 'Fake Header 2',
+            'Some bold and some italic.', ''])
+])
+def test_streaming_paragraphs(docx_wrapper, paragraph_styles, expected):
+    paragraphs = docx_wrapper.iter_paragraphs(paragraph_styles)
+    assert [p.text for p in paragraphs] == expected
+
+
+def test_streaming_attributes(docx_wrapper, document):
+    docx_loaded = wrapper.DocumentWrapper(document)
+    streamed = [(docx_wrapper.get_paragraph_attributes(p),
+                 docx_wrapper.get_font_attributes(p))
+                for p in docx_wrapper.iter_paragraphs()]
+    loaded = [(docx_loaded.get_paragraph_attributes(p),
+               docx_loaded.get_font_attributes(p))
+              for p in docx_loaded.iter_paragraphs()]
+    assert streamed == loaded
+    assert [docx_wrapper.get_section_attributes(s).page_width
+            for s in docx_wrapper.iter_sections()] == [21.59, 21.59]
+
+
+def test_streaming_engine_same_violations(docx_file, caplog):
+    requirements = {
+        'styles': {
+            'Title': {
+                'font': {'unit': 'pt', 'attributes': [14, 'Calibri']},
+                'paragraph': {'unit': 'cm', 'attributes': {'alignment': 1}}
+            },
+            'Normal': {
+                'font': {'unit': 'pt', 'attributes': [12, 'Calibri']},
+                'paragraph': {'unit': 'cm',
+                              'attributes': {'alignment': 0,
+                                             'first_line_indent': 1.25}}
+            }
+        },
+        'sections': [{'unit': 'cm', 'attributes': {'page_width': 21.0}}]
+    }
+    validate(docx_file, requirements, engine='docx')
+    expected = caplog.record_tuples
+    caplog.clear()
+    validate(docx_file, requirements, engine='stream')
+    assert caplog.record_tuples == expected
+    assert any(level == 40 for _, level, _ in expected)
+
+
+def test_validate_unsupported_engine_fail(docx_file):
+    with pytest.raises(ValueError) as excinfo:
+        validate(docx_file, {}, engine='fake')
+    assert "Unsupported engine 'fake'" in str(excinfo.value)
@@ -46,3 +46,44 @@ def test_write_file_bad_format_fail(tmpdir):
     with pytest.raises(ValueError) as excinfo:
         utils.write_to_file(fake_file.strpath, data={})
     assert 'Unsupported data format.' in str(excinfo.value)
+
+
+def test_read_from_file_yml(tmpdir):
+    fake_file = tmpdir.join('fake.yml')
+    fake_file.write('fake: [1, 2]\n')
+    assert utils.read_from_file(fake_file.strpath) == {'fake': [1, 2]}
+
+
+def test_read_from_file_cached(tmpdir, mocker):
+    fake_file = tmpdir.join('fake.yaml')
+    fake_file.write('fake: [1, 2]\n')
+    m_load = mocker.spy(utils, 'safe_load')
+    data = utils.read_from_file(fake_file.strpath)
+    data['fake'].append(3)
+    assert utils.read_from_file(fake_file.strpath) == {'fake': [1, 2]}
+    assert m_load.call_count == 1
+
+    fake_file.write('fake: [1, 2, 3, 4]\n')
+    assert utils.read_from_file(fake_file.strpath) == {'fake': [1, 2, 3, 4]}
+    assert m_load.call_count == 2
+
+
+def test_read_from_file_w_sidecar(tmpdir, mocker):
+    fake_file = tmpdir.join('fake.yaml')
+    fake_file.write('fake: [1, 2]\n')
+    m_load = mocker.spy(utils, 'safe_load')
+    utils.read_from_file(fake_file.strpath, sidecar=True)
+    assert tmpdir.join('fake.yaml.pickle').check()
+
+    # Another process starts with an empty cache
+    utils.clear_file_cache()
+    assert utils.read_from_file(fake_file.strpath, sidecar=True) == {
+        'fake': [1, 2]}
+    assert m_load.call_count == 1
+
+    # Sidecar of a changed file is stale
+    utils.clear_file_cache()
+    fake_file.write('fake: [3]\n')
+    assert utils.read_from_file(fake_file.strpath, sidecar=True) == {
+        'fake': [3]}
+    assert m_load.call_count == 2
@@ -7,6 +7,7 @@ import logging
 import pytest
 
 from validocx import Validator
+from validocx import validate
 
 
 @pytest.fixture(scope='module')
@@ -98,3 +99,119 @@ def test_validate_paragraph(validator, caplog, p_requirements, expected):
     paragraph = list(validator._docx.iter_paragraphs('Normal'))[0]
     validator.validate_paragraph(paragraph, p_requirements)
     assert caplog.record_tuples == expected
+
+
+def test_validate_styles_verdict_cache(document, caplog):
+    validator = Validator(document, cache_size=2)
+    style_requirements = {style: {
+        "font": {"unit": "pt", "attributes": [12, "Calibri"]},
+        "paragraph": {"unit": "cm", "attributes": {"alignment": 3}}
+    } for style in ('Title', 'Heading 1', 'Heading 2', 'Normal')}
+    validator.validate_styles(style_requirements)
+    info = validator.cache_info()
+    # All the paragraphs have different formatting, while the 1st and the
+    # 3rd runs of 'Normal' paragraph have the same one
+    assert info['paragraph'] == (0, 5, 2, 2)
+    assert info['font'] == (1, 6, 2, 2)
+    assert [m for _, _, m in caplog.record_tuples if 'Font' in m] == [
+        "Font attributes (26.0, Calibri) mismatch required (12, Calibri) "
+        "in paragraph with style 'Title':\n'Fake Title'",
+        "Font attributes (14.0, Calibri, bold, cs_bold) mismatch required "
+        "(12, Calibri) in paragraph with style 'Heading 1':\n'Fake Header 1'",
+        "Font attributes (13.0, Calibri, bold, cs_bold) mismatch required "
+        "(12, Calibri) in paragraph with style 'Heading 2':\n'Fake Header 2'",
+        "Font attributes (12.0, Calibri, bold) mismatch required "
+        "(12, Calibri) in paragraph with style 'Normal':\n'bold'",
+        "Font attributes (12.0, Calibri, italic) mismatch required "
+        "(12, Calibri) in paragraph with style 'Normal':\n'italic.'"]
+
+
+def test_validate_returns_report(document, caplog):
+    requirements = {
+        "styles": {},
+        "sections": [{"attributes": {'orientation': 1}, "unit": "cm"}]
+    }
+    validation_report = Validator(document, log_violations=False).validate(
+        requirements)
+    assert (validation_report.errors, validation_report.warnings) == (1, 6)
+    assert [(v.kind, v.location) for v in validation_report][:3] == [
+        ('section-attribute', ('section', 0)),
+        ('section-undefined', ('section', 1)),
+        ('style-undefined', ('paragraph', 0))]
+    assert not [r for r in caplog.records if r.levelno >= logging.WARNING]
+
+
+def test_iter_violations_lazy(document, failing_requirements, mocker):
+    validator = Validator(document)
+    m_fonts = mocker.spy(validator._docx, 'get_run_font_attributes')
+    violations = validator.iter_violations(failing_requirements)
+    first = next(violations)
+    assert (first.kind, first.location) == ('paragraph-undefined-attribute',
+                                            ('paragraph', 0))
+    assert not m_fonts.called
+    violations.close()
+
+
+@pytest.mark.parametrize('options, errors', [
+    ({'fail_fast': True}, 1),
+    ({'max_errors': 3}, 3),
+    ({}, 12),
+])
+def test_validate_w_limit(document, failing_requirements, options, errors):
+    validator = Validator(document, log_violations=False)
+    validation_report = validator.validate(failing_requirements, **options)
+    assert validation_report.errors == errors
+    assert validation_report.truncated is bool(options)
+
+
+@pytest.mark.parametrize('max_errors', [0, -5])
+def test_validate_w_wrong_limit_fail(document, failing_requirements,
+                                     max_errors, mocker):
+    with pytest.raises(ValueError):
+        Validator(document).validate(failing_requirements,
+                                     max_errors=max_errors)
+    m_open = mocker.patch('validocx.validator.open_docx')
+    with pytest.raises(ValueError):
+        validate('/tmp/fake.docx', failing_requirements,
+                 max_errors=max_errors)
+    assert not m_open.called
+
+
+@pytest.mark.parametrize('scope, locations', [
+    ({'only': 'sections'}, [('section', 0), ('section', 1)]),
+    ({'only': 'styles', 'styles': ['Title', 'Heading 2']},
+     [('paragraph', 0), ('paragraph', 0, 'run', 0), ('paragraph', 2),
+      ('paragraph', 2, 'run', 0)]),
+    ({'only': 'styles', 'paragraphs': (1, 2)},
+     [('paragraph', 1), ('paragraph', 1, 'run', 0)]),
+])
+def test_validate_w_scope(document, failing_requirements, scope, locations):
+    failing_requirements['sections'] = [{'attributes': {'orientation': 1},
+                                         'unit': 'cm'}]
+    report = Validator(document).validate(failing_requirements, **scope)
+    assert [v.location for v in report] == locations
+
+
+def test_validate_w_wrong_scope_fail(document, failing_requirements):
+    with pytest.raises(ValueError):
+        Validator(document).validate(failing_requirements, only='fonts')
+
+
+@pytest.mark.parametrize('options', [
+    {'engine': 'stream'},
+    {'jobs': 2},
+])
+def test_validate_all_parts(structured_docx, failing_requirements, options):
+    report = validate(structured_docx, failing_requirements, only='styles',
+                      log_violations=False)
+    violations = {v.location[1]: v for v in report if len(v.location) == 2}
+    assert violations[5].context == ('table', 0, 'row', 1, 'cell', 1,
+                                     'table', 0, 'row', 0, 'cell', 0)
+    assert violations[10].message == (
+        "[section 0, header default] Undefined style: 'Header'.")
+    assert violations[12].context == ('footnote', 1)
+
+    structured_docx.seek(0)
+    other = validate(structured_docx, failing_requirements, only='styles',
+                     log_violations=False, **options)
+    assert list(other) == list(report)
@@ -0,0 +1,94 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+import io
+import math
+
+import pytest
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Cm
+
+from validocx import validate
+
+numpy = pytest.importorskip('numpy')
+vectorized = pytest.importorskip('validocx.vectorized')
+
+
+@pytest.fixture
+def docx():
+    document = Document()
+    for i in range(25):
+        paragraph = document.add_paragraph('Paragraph {0}'.format(i))
+        if i % 3:
+            paragraph.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        if i % 4:
+            paragraph.paragraph_format.left_indent = Cm(1 + i % 2 * 0.005)
+        if i % 5 == 0:
+            document.add_heading('Heading {0}'.format(i), 1)
+    document.add_section()
+    stream = io.BytesIO()
+    document.save(stream)
+    return stream
+
+
+@pytest.fixture
+def requirements(failing_requirements):
+    for style in failing_requirements['styles'].values():
+        style['paragraph'] = {'unit': 'cm', 'attributes': {
+            'alignment': 1, 'left_indent': 1.0, 'space_after': 0.35}}
+    failing_requirements['sections'] = [
+        {'unit': 'cm', 'attributes': {'page_width': 21.59,
+                                      'left_margin': 3.0}}]
+    return failing_requirements
+
+
+def _violations(report):
+    return [(v.severity, v.location, v.message) for v in report]
+
+
+@pytest.mark.parametrize('engine', ['docx', 'stream'])
+@pytest.mark.parametrize('scope', [
+    {},
+    {'only': 'styles', 'styles': ['Heading 1']},
+    {'paragraphs': (7, 22)}
+])
+def test_vectorized_validation(engine, scope, docx, requirements, mocker):
+    mocker.patch.object(vectorized, 'DEFAULT_BATCH_SIZE', 4)
+    expected = _violations(validate(docx, requirements, engine=engine,
+                                    **scope))
+    docx.seek(0)
+    report = validate(docx, requirements, engine=engine, vectorized=True,
+                      **scope)
+    assert expected
+    assert _violations(report) == expected
+
+
+@pytest.mark.parametrize('fetched, expected', [
+    (1.0, 1.0), (1.0, 1.0101), (1.0101, 1.0), (1.0, 1.0102), (0.0, 0.0),
+    (0.0, 1e-9), (-2.0, -2.01), (float('inf'), float('inf'))
+])
+def test_isclose(fetched, expected):
+    close = vectorized.isclose(numpy.array([fetched]),
+                               numpy.array([expected]))
+    assert close.tolist() == [math.isclose(fetched, expected,
+                                           rel_tol=1e-02)]
+
+
+def test_isclose_undefined():
+    fetched = vectorized._to_array([None, 2])
+    assert vectorized.isclose(fetched, 2.0).tolist() == [False, True]
+
+
+def test_vectorized_validation_w_jobs_fail(docx, requirements):
+    with pytest.raises(ValueError):
+        validate(docx, requirements, jobs=2, vectorized=True)
+
+
+def test_vectorized_validation_wo_numpy(document, mocker):
+    mocker.patch.object(vectorized, 'numpy', None)
+    with pytest.raises(ImportError) as e:
+        vectorized.VectorizedValidator(document)
+    assert 'requires NumPy' in str(e.value)
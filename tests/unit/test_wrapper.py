@@ -2,8 +2,15 @@
 #    Copyright 2018 Vitalii Kulanov
 #
 
+import math
+
 import pytest
 
+from docx import Document
+from docx.shared import Length
+from docx.shared import Pt
+
+from validocx import streaming
 from validocx import wrapper
 
 
@@ -51,32 +58,141 @@ def test_fetch_section_data(docx_wrapper):
 def test_fetch_font_attributes(docx_wrapper, p_style, expected):
     p = list(docx_wrapper.iter_paragraphs(p_style))[0]
     runs = docx_wrapper.get_font_attributes(p)
-    assert runs == expected
+    assert [list(record) for record in runs] == expected
 
 
 def test_fetch_section_attributes(docx_wrapper):
     section = list(docx_wrapper.iter_sections())[0]
     section_attr = docx_wrapper.get_section_attributes(section)
-    assert section_attr == {'page_height': 27.94, 'left_margin': 3.175,
-                            'page_width': 21.59, 'gutter': 0.0,
-                            'bottom_margin': 2.54, 'orientation': 0,
-                            'header_distance': 1.27, 'footer_distance': 1.27,
-                            'top_margin': 2.54, 'right_margin': 3.175,
-                            'start_type': 2}
+    assert section_attr._asdict() == {
+        'page_height': 27.94, 'left_margin': 3.175, 'page_width': 21.59,
+        'gutter': 0.0, 'bottom_margin': 2.54, 'orientation': 0,
+        'header_distance': 1.27, 'footer_distance': 1.27, 'top_margin': 2.54,
+        'right_margin': 3.175, 'start_type': 2}
 
 
 def test_fetch_paragraph_attributes(docx_wrapper):
     p = list(docx_wrapper.iter_paragraphs('Normal'))[0]
     p_attr = docx_wrapper.get_paragraph_attributes(p)
-    assert p_attr == {'page_break_before': None,
-                      'keep_together': None,
-                      'line_spacing': 1.000125,
-                      'space_after': 1.000125,
-                      'space_before': 1.000125,
-                      'keep_with_next': True,
-                      'alignment': 3,
-                      'right_indent': 0.49918055555555557,
-                      'line_spacing_rule': 4,
-                      'left_indent': 0.49918055555555557,
-                      'first_line_indent': 1.2505972222222221,
-                      'widow_control': None}
+    assert p_attr._asdict() == {'page_break_before': None,
+                                'keep_together': None,
+                                'line_spacing': 1.000125,
+                                'space_after': 1.000125,
+                                'space_before': 1.000125,
+                                'keep_with_next': True,
+                                'alignment': 3,
+                                'right_indent': 0.49918055555555557,
+                                'line_spacing_rule': 4,
+                                'left_indent': 0.49918055555555557,
+                                'first_line_indent': 1.2505972222222221,
+                                'widow_control': None}
+
+
+def test_effective_style_table(document):
+    docx_wrapper = wrapper.DocumentWrapper(document)
+    assert docx_wrapper.style_table_info() == (0, 0, 0)
+    title = docx_wrapper.get_effective_style('Title')
+    # Defined in 'Title' style itself
+    assert title.font['size'].pt == 26.0
+    # Inherited from 'Normal' base style
+    assert title.font['name'] == 'Calibri'
+    # Inherited from document defaults
+    normal = docx_wrapper.get_effective_style('Normal')
+    assert normal.paragraph_format['space_after'].twips == 200
+    # Default paragraph style is used for missing and unknown style ids
+    assert docx_wrapper.get_effective_style(None) is normal
+    assert docx_wrapper.get_effective_style('Non-existing-style') is normal
+    assert docx_wrapper.get_effective_style('Non-existing-style') is normal
+    hits, misses, size = docx_wrapper.style_table_info()
+    assert (hits, misses) == (4, 1)
+    assert size > 0
+
+
+def test_accessor_plan_cached():
+    from docx.section import Section
+    plan = wrapper.accessor_plan(Section, include=('orientation',))
+    assert plan is wrapper.accessor_plan(Section, include=('orientation',))
+    assert [attr for attr, _ in plan] == ['orientation']
+
+
+def test_fetch_required_attributes_only(docx_wrapper):
+    p = list(docx_wrapper.iter_paragraphs('Normal'))[0]
+    p_attr = docx_wrapper.get_paragraph_attributes(
+        p, attributes=('alignment', 'keep_with_next'))
+    assert p_attr == (3, None, None, True) + (None,) * 8
+    assert (p_attr.alignment, p_attr.keep_with_next) == (3, True)
+    section = list(docx_wrapper.iter_sections())[0]
+    section_attr = docx_wrapper.get_section_attributes(
+        section, attributes=('page_width',))
+    assert section_attr.page_width == 21.59
+    assert section_attr.count(None) == len(section_attr) - 1
+
+
+@pytest.mark.parametrize('value, unit', [
+    (2.54, 'cm'), (12, 'pt'), (-1.25, 'cm'), (0, 'mm'), (1, 'inches'),
+    (240, 'twips'), (0.4, 'twips'), (7, 'px')
+])
+def test_length_bounds(value, unit):
+    lower, upper = wrapper.length_bounds(value, unit, 1e-02)
+    step = max((upper - lower) // 50, 1)
+    edges = [lower - 1, lower, upper, upper + 1]
+    for emu in edges + list(range(lower - 3 * step, upper + 3 * step,
+                                  step)):
+        length = Length(emu)
+        close = math.isclose(wrapper.convert_unit(length, unit), value,
+                             rel_tol=1e-02)
+        assert close == (lower <= length <= upper)
+
+
+def test_font_record():
+    record = wrapper.FontRecord.from_attributes(['italic', 'Arial', 14,
+                                                 'bold'])
+    assert list(record) == [14, 'Arial', 'bold', 'italic']
+    assert record == wrapper.FontRecord(14.0, 'Arial', record.flags)
+    assert record != wrapper.FontRecord(14.0, 'Arial')
+    assert hash(record) == hash(wrapper.FontRecord(14.0, 'Arial',
+                                                   record.flags))
+    # Anything but a size, a name and flags is not a record
+    assert wrapper.FontRecord.from_attributes(['Arial', 14, 'Times']) is None
+    assert wrapper.FontRecord.from_attributes(['Arial', True]) is None
+    # Sizes of requirements are converted to EMUs
+    assert wrapper.FontRecord.from_attributes(['Arial', 10.5],
+                                              'pt').size == Pt(10.5)
+
+
+def test_iter_indexed_paragraphs(document, mocker):
+    docx_wrapper = wrapper.DocumentWrapper(document)
+    style_ids = docx_wrapper.resolve_style_ids(['Heading1', 'Normal'])
+    assert style_ids == frozenset(['Heading1', 'Normal', None])
+    m_create = mocker.spy(docx_wrapper, '_create_paragraph')
+    paragraphs = docx_wrapper.iter_indexed_paragraphs(style_ids, start=1,
+                                                      stop=4)
+    assert [(i, p.text) for i, p in paragraphs] == [
+        (1, 'Fake Header 1'), (3, 'Some bold and some italic.')]
+    assert m_create.call_count == 2
+
+
+@pytest.mark.parametrize('engine', ['docx', 'stream'])
+def test_walk(engine, structured_docx):
+    if engine == 'docx':
+        docx_wrapper = wrapper.DocumentWrapper(Document(structured_docx))
+    else:
+        docx_wrapper = streaming.StreamingDocumentWrapper(structured_docx)
+    cell = ('table', 0, 'row', 1, 'cell', 1)
+    assert [(i, context, p.text) for i, context, p in
+            docx_wrapper.walk()] == [
+        (0, (), 'Intro'),
+        (1, ('table', 0, 'row', 0, 'cell', 0), 'A'),
+        (2, ('table', 0, 'row', 0, 'cell', 1), ''),
+        (3, ('table', 0, 'row', 1, 'cell', 0), ''),
+        (4, cell, ''),
+        (5, cell + ('table', 0, 'row', 0, 'cell', 0), 'Nested'),
+        (6, cell, ''),
+        (7, (), 'Control'),
+        (8, (), ''),
+        (9, (), 'Outro'),
+        # The header part shared by both sections is visited once
+        (10, ('section', 0, 'header', 'default'), 'Header'),
+        (11, ('section', 0, 'footer', 'default'), 'Footer'),
+        (12, ('footnote', 1), 'Note'),
+    ]
@@ -1,9 +1,44 @@
-from .validator import *  # noqa
-from .wrapper import *  # noqa
+import importlib
+import sys
 
 __version__ = '0.0.1'
 
-__all__ = [
-    *validator.__all__,  # noqa
-    *wrapper.__all__,  # noqa
-]
+# Public names by the module they are defined in. Modules are imported on
+# the first access to their names (PEP 562), so importing the package, e.g.
+# by the CLI, does not pull in python-docx, lxml, jsonschema or PyYAML
+_EXPORTS = (
+    ('aio', ('AsyncValidator', 'validate_async')),
+    ('report', ('ERROR', 'WARNING', 'AggregatingSink', 'LoggingSink',
+                'ValidationReport', 'Violation', 'ViolationGroup')),
+    ('requirements', ('CompiledRequirements', 'compile_requirements')),
+    ('validator', ('CacheInfo', 'ENGINES', 'Validator', 'validate')),
+    ('wrapper', ('DocumentWrapper', 'EffectiveStyle', 'FontRecord',
+                 'ParagraphAttributes', 'SectionAttributes',
+                 'StyleTableInfo')),
+)
+
+_MODULES = {name: module for module, names in _EXPORTS for name in names}
+
+__all__ = [name for _, names in _EXPORTS for name in names]
+
+
+def __getattr__(name):
+    try:
+        module = _MODULES[name]
+    except KeyError:
+        raise AttributeError("module '{0}' has no attribute '{1}'".format(
+            __name__, name))
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ is not supported, names are imported eagerly
+    for _name in __all__:
+        __getattr__(_name)
+    del _name
@@ -0,0 +1,176 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['AsyncValidator', 'validate_async']
+
+import asyncio
+import functools
+import os
+
+from .requirements import compile_requirements
+from .validator import validate
+
+
+def _run_in_executor(executor, docx, requirements, options):
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(
+        executor, functools.partial(validate, docx, requirements, **options))
+
+
+async def validate_async(docx, requirements, executor=None, **options):
+    """Validates docx document without blocking the event loop.
+
+    Both parsing and validation are run in an executor. A document has to
+    be passed as a file path or bytes to be validated in a process pool.
+
+    :param docx: path to docx file (as a string), bytes or a file-like object
+    :param requirements: document requirements as a dict (see examples)
+                         or CompiledRequirements
+    :param executor: concurrent.futures executor, None value implies the
+                     default executor of the event loop
+    :param options: validate() keyword arguments, e.g. engine or max_errors
+    :rtype: ValidationReport
+    """
+    return await _run_in_executor(executor, docx, requirements, options)
+
+
+class AsyncValidator(object):
+    """Validates many documents against the same requirements.
+
+    Requirements are compiled once. The number of documents validated at the
+    same time is bounded, so a burst of requests does not flood the
+    executor.
+    """
+
+    def __init__(self, requirements, executor=None, max_concurrency=None,
+                 **options):
+        """
+        :param requirements: document requirements as a dict (see examples)
+                             or CompiledRequirements
+        :param executor: concurrent.futures executor, None value implies the
+                         default executor of the event loop
+        :param max_concurrency: max number of documents validated at the
+                                same time, e.g. the number of workers of
+                                the executor. Defaults to the number of CPUs
+        :param options: validate() keyword arguments, e.g. engine
+        """
+        self._requirements = compile_requirements(requirements)
+        self._executor = executor
+        self._max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._options = options
+        self._semaphore = None
+
+    @property
+    def max_concurrency(self):
+        return self._max_concurrency
+
+    async def validate(self, docx):
+        """Validate a document, waiting for a free slot if needed.
+
+        :param docx: path to docx file (as a string), bytes or a file-like
+                     object
+        :rtype: ValidationReport
+        """
+        if self._semaphore is None:
+            # Created lazily to be bound to the running event loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        async with self._semaphore:
+            return await _run_in_executor(self._executor, docx,
+                                          self._requirements, self._options)
+
+    def validate_many(self, documents, return_exceptions=False):
+        """Validate documents, yielding results as they are finished.
+
+        Documents are taken from the iterable only when there is a free
+        slot, so a slow or endless source is consumed at the validation
+        pace. If the iteration is stopped early, aclose() method of the
+        iterator cancels validations in progress.
+
+        :param documents: an async iterable (or a regular iterable) of
+                          documents
+        :param return_exceptions: whether an exception raised by validation
+                                  has to be yielded instead of a report,
+                                  otherwise it is propagated
+        :returns: an async iterator of (document, report) pairs
+        """
+        return _CompletionIterator(self, documents, return_exceptions)
+
+
+class _CompletionIterator(object):
+    """Async iterator over validation results in the order of completion."""
+
+    def __init__(self, validator, documents, return_exceptions):
+        self._validator = validator
+        self._documents = documents
+        self._return_exceptions = return_exceptions
+        self._source = None
+        self._fetch = None
+        self._pending = set()
+        self._done = []
+
+    def __aiter__(self):
+        return self
+
+    async def _validate(self, docx):
+        try:
+            report = await self._validator.validate(docx)
+        except Exception as e:
+            if not self._return_exceptions:
+                raise
+            report = e
+        return docx, report
+
+    async def _next_document(self):
+        if self._source is None:
+            if hasattr(self._documents, '__aiter__'):
+                self._source = self._documents.__aiter__()
+            else:
+                self._source = iter(self._documents)
+        if hasattr(self._source, '__anext__'):
+            return await self._source.__anext__()
+        try:
+            return next(self._source)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def __anext__(self):
+        try:
+            while not self._done:
+                if (self._fetch is None and self._documents is not None and
+                        len(self._pending) < self._validator.max_concurrency):
+                    self._fetch = asyncio.ensure_future(
+                        self._next_document())
+                waiting = set(self._pending)
+                if self._fetch is not None:
+                    waiting.add(self._fetch)
+                if not waiting:
+                    raise StopAsyncIteration
+                done, _ = await asyncio.wait(
+                    waiting, return_when=asyncio.FIRST_COMPLETED)
+                if self._fetch in done:
+                    done.discard(self._fetch)
+                    fetch, self._fetch = self._fetch, None
+                    try:
+                        docx = fetch.result()
+                    except StopAsyncIteration:
+                        self._documents = None
+                    else:
+                        self._pending.add(
+                            asyncio.ensure_future(self._validate(docx)))
+                self._pending.difference_update(done)
+                self._done.extend(done)
+            return self._done.pop(0).result()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """Cancel validations in progress."""
+
+        for future in self._pending:
+            future.cancel()
+        if self._fetch is not None:
+            self._fetch.cancel()
+        self._pending.clear()
+        self._fetch = None
@@ -0,0 +1,166 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['ResultCache']
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+from . import __version__
+from . import sources
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# Bumped whenever stored reports may not be loadable or valid anymore,
+# e.g. on changes of violation fields
+_FORMAT_VERSION = 2
+
+_CHUNK_SIZE = 1024 * 1024
+_SUFFIX = '.report'
+
+
+def get_docx_digest(docx):
+    """Get SHA-256 hex digest of a docx file.
+
+    :param docx: docx document as accepted by validocx.sources.open_docx().
+                 A file-like object has to be seekable, it is rewound to
+                 its initial position
+    """
+
+    digest = hashlib.sha256()
+    with sources.open_docx(docx) as stream:
+        if isinstance(stream, sources.BufferReader):
+            digest.update(stream.getbuffer())
+        else:
+            position = stream.tell()
+            for chunk in iter(functools.partial(stream.read, _CHUNK_SIZE),
+                              b''):
+                digest.update(chunk)
+            stream.seek(position)
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """Directory store of validation reports.
+
+    A report is keyed by the digest of the document bytes, the digest of
+    the requirements, validation options and the validocx version, so
+    a document is not even opened if it has been validated already.
+    Once the store exceeds its size, the least recently used reports are
+    evicted. The size is computed once and then tracked as reports are
+    stored, so reports stored by other processes (e.g. workers of a batch)
+    are accounted for only by an explicit evict().
+
+    Reports are pickled, the directory must be trusted as much as the code.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param directory: cache directory, created if it does not exist
+        :param max_size: max total size of the stored reports in bytes
+        """
+        self._directory = directory
+        self._max_size = max_size
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def get_key(self, docx, requirements, options=None):
+        """Get key of a report.
+
+        :param docx: docx document as accepted by get_docx_digest()
+        :param requirements: CompiledRequirements
+        :param options: a dict of validation options affecting the report,
+                        e.g. limit of errors or scope, with JSON compatible
+                        values
+        """
+
+        return hashlib.sha256('{0}:{1}:{2}:{3}:{4}'.format(
+            get_docx_digest(docx), requirements.digest,
+            json.dumps(options, sort_keys=True, default=sorted),
+            __version__, _FORMAT_VERSION).encode()).hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self._directory, key[:2], key + _SUFFIX)
+
+    def get(self, key):
+        """Get a stored report or None."""
+
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as stream:
+                report = pickle.load(stream)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Cached report '{0}' is ignored: {1}".format(
+                path, e))
+            return None
+        try:
+            # Modification time orders reports for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return report
+
+    def put(self, key, report):
+        """Store a report, evicting the least recently used ones if needed."""
+
+        path = self._get_path(key)
+        if self._size is None:
+            self._size = self._scan()[1]
+        try:
+            # A report of the key stored by another process is replaced
+            self._size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        utils.write_atomically(path, functools.partial(utils.dump_pickle,
+                                                       report))
+        self._size += os.path.getsize(path)
+        if self._size > self._max_size:
+            self.evict()
+
+    def evict(self):
+        """Remove the least recently used reports exceeding the size."""
+
+        entries, total = self._scan()
+        entries.sort()
+        while total > self._max_size and entries:
+            _, size, path = entries.pop(0)
+            try:
+                os.unlink(path)
+            except OSError:
+                # Removed by a concurrent process
+                pass
+            total -= size
+        self._size = total
+
+    def _scan(self):
+        """Get (mtime, size, path) of stored reports and their total size."""
+
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self._directory):
+            for name in names:
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
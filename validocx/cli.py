@@ -3,12 +3,20 @@
 #
 
 import argparse
+import collections
+import glob
 import logging
 import os
+import pickle
 import sys
+import tempfile
 
+from . import profiling
 from . import utils
-from .validator import validate
+from .constants import AGGREGATE_SAMPLES, ARCHIVE_EXTENSIONS
+from .constants import ARCHIVE_SEPARATOR
+from .constants import CACHE_DIR_ENV, ENGINES, FORMATS, SCOPES
+from .constants import EXIT_ERRORS, EXIT_OK, EXIT_WARNINGS
 
 DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 CONSOLE_LOG_FORMAT = '%(levelname)s: %(message)s'
@@ -16,18 +24,23 @@ FILE_LOG_FORMAT = ('%(asctime)s.%(msecs)03d %(levelname)s '
                    '(%(module)s) %(message)s')
 
 
-class MessageCounterHandler(logging.Handler):
-    msg_level_count = None
+# Modules depending on python-docx, lxml and jsonschema are imported only
+# when a document is actually validated, so that printing help or reporting
+# an argument error does not pay for them
 
-    def __init__(self, *args, **kwargs):
-        super(MessageCounterHandler, self).__init__(*args, **kwargs)
-        self.msg_level_count = {}
 
-    def emit(self, record):
-        level = record.levelname
-        if level not in self.msg_level_count:
-            self.msg_level_count[level] = 0
-        self.msg_level_count[level] += 1
+def validate(docx, requirements, **options):
+    """Validates docx document, see validocx.validator.validate()."""
+
+    from .validator import validate
+    return validate(docx, requirements, **options)
+
+
+def compile_requirements(requirements):
+    """Compiles requirements, see validocx.requirements."""
+
+    from .requirements import compile_requirements
+    return compile_requirements(requirements)
 
 
 def _get_file_path(file_path):
@@ -37,19 +50,101 @@ def _get_file_path(file_path):
     return file_path
 
 
-def create_parser():
-    parser = argparse.ArgumentParser(description='docx-file validation CLI.')
-    parser.add_argument(
-        'docx-file',
-        type=_get_file_path,
-        help='Docx file to be validated.'
-    )
+def _get_docx_path(file_path):
+    if glob.has_magic(file_path):
+        return file_path
+    if ARCHIVE_SEPARATOR in file_path and not os.path.lexists(file_path):
+        from . import sources
+        if sources.exists(file_path):
+            return file_path
+    return _get_file_path(file_path)
+
+
+def _get_positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            "Value must be a positive integer, got '{0}'".format(value))
+    return number
+
+
+def _get_non_negative_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise argparse.ArgumentTypeError(
+            "Value must be a non-negative integer, got '{0}'".format(value))
+    return number
+
+
+def _get_styles(value):
+    return [style.strip() for style in value.split(',') if style.strip()]
+
+
+def _get_range(value):
+    start, sep, stop = value.partition(':')
+    try:
+        if not sep:
+            raise ValueError
+        start = int(start) if start else 0
+        stop = int(stop) if stop else None
+        if start < 0 or stop is not None and stop < start:
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Range must be specified as START:STOP of non-negative "
+            "integers, got '{0}'".format(value))
+    return start, stop
+
+
+def _expand_paths(paths):
+    """Expand directories, archives and glob patterns into a list of docx
+    files.
+
+    Directories are searched recursively, zip and tar archives are expanded
+    into 'archive::member' paths of the docx files they contain. Duplicates
+    are skipped, the order of the first appearance is preserved.
+    """
+
+    from . import sources
+    files = []
+    for path in paths:
+        if glob.has_magic(path):
+            candidates = [c for c in sorted(glob.glob(path, recursive=True))
+                          if os.path.isdir(c) or sources.is_docx(c)]
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                for root, dirs, names in os.walk(candidate):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name)
+                                 for name in sorted(names)
+                                 if sources.is_docx(name))
+            elif candidate.lower().endswith(ARCHIVE_EXTENSIONS):
+                files.extend(sources.iter_archive_members(candidate))
+            else:
+                files.append(candidate)
+    return list(collections.OrderedDict.fromkeys(files))
+
+
+def add_engine_argument(parser):
     parser.add_argument(
-        '-r', '--requirements',
-        required=True,
-        type=_get_file_path,
-        help='File with the requirements. In YAML or JSON format.'
+        '--engine',
+        choices=ENGINES,
+        default='docx',
+        help="Engine used to read documents: 'docx' loads a whole document "
+             "with python-docx, 'stream' parses it incrementally keeping "
+             "memory usage constant. Defaults to 'docx'."
     )
+
+
+def add_logging_arguments(parser):
     parser.add_argument(
         '--log-file',
         help='Log file to store logs.'
@@ -69,11 +164,397 @@ def create_parser():
         const='verbose',
         help='Increase output verbosity.'
     )
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        description='docx-file validation CLI.',
+        epilog="Run 'validocx serve --help' to see options of the "
+               "long-running validation service.")
+    parser.add_argument(
+        'docx-file',
+        nargs='+',
+        type=_get_docx_path,
+        help='Docx file(s) to be validated. Directories (searched '
+             'recursively), glob patterns, zip and tar archives of docx '
+             "files and 'ARCHIVE::MEMBER' paths of docx files in archives are "
+             'accepted as well.'
+    )
+    parser.add_argument(
+        '-r', '--requirements',
+        required=True,
+        type=_get_file_path,
+        help='File with the requirements. In YAML or JSON format.'
+    )
+    parser.add_argument(
+        '--requirements-sidecar',
+        action='store_true',
+        help="Store parsed requirements next to the requirements file (in "
+             "'<file>.pickle'), so later runs load them without parsing "
+             'the file while it is unchanged.'
+    )
+    add_engine_argument(parser)
+    parser.add_argument(
+        '-j', '--jobs',
+        type=_get_positive_int,
+        help='Number of worker processes used to validate several '
+             'documents. Defaults to the number of CPUs. For a single '
+             'document, the number of processes its paragraphs are split '
+             'across, which are not split by default.'
+    )
+    parser.add_argument(
+        '--vectorized',
+        action='store_true',
+        help='Compare numeric attributes of paragraphs and sections as '
+             'NumPy arrays, which pays off for documents with many distinct '
+             'paragraph formattings. Requires NumPy.'
+    )
+    parser.add_argument(
+        '--format',
+        dest='output_format',
+        choices=FORMATS,
+        help='Write violations in a machine-readable format as they are '
+             'found, followed by a summary: JSON Lines, a JSON object or a '
+             'SARIF log. Violations are not logged then.'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        metavar='FILE',
+        help='File to write violations to in --format. Defaults to stdout.'
+    )
+    parser.add_argument(
+        '--aggregate',
+        nargs='?',
+        const=AGGREGATE_SAMPLES,
+        type=_get_positive_int,
+        metavar='K',
+        help='Report identical violations of a document (of the same kind, '
+             'style, attribute, actual and required values) once, with '
+             'their number and locations of the first K of them ({0} by '
+             'default).'.format(AGGREGATE_SAMPLES)
+    )
+    limits = parser.add_mutually_exclusive_group()
+    limits.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop validation of a document on the first error.'
+    )
+    limits.add_argument(
+        '--max-errors',
+        type=_get_positive_int,
+        metavar='N',
+        help='Stop validation of a document once N errors are found.'
+    )
+    parser.add_argument(
+        '--only',
+        choices=SCOPES,
+        help='Validate only sections or styles of a document.'
+    )
+    parser.add_argument(
+        '--styles',
+        type=_get_styles,
+        metavar='STYLE[,STYLE...]',
+        help="Validate only paragraphs of the styles, specified by names "
+             "(e.g. 'Heading 1') or ids (e.g. 'Heading1') separated by "
+             "commas."
+    )
+    parser.add_argument(
+        '--paragraphs',
+        type=_get_range,
+        metavar='START:STOP',
+        help='Validate only paragraphs with indices in the range, e.g. '
+             "'0:500'. Either bound can be omitted."
+    )
+    parser.add_argument(
+        '--incremental-cache',
+        metavar='FILE',
+        help='Cache file with violations of checked paragraphs. Paragraphs '
+             'unchanged since a previous validation (e.g. of an earlier '
+             'revision of a document) are not checked again.'
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        '--cache-dir',
+        default=os.environ.get(CACHE_DIR_ENV),
+        help='Directory to store reports in. A document validated against '
+             'the same requirements already is not opened again, its stored '
+             'report is used. Defaults to ${0} environment variable, if '
+             'set.'.format(CACHE_DIR_ENV)
+    )
+    cache.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not use the report cache.'
+    )
+    parser.add_argument(
+        '--profile',
+        dest='profile',
+        action='store_const',
+        const='time',
+        help='Print wall time of validation phases and call counts and '
+             'time of hot methods.'
+    )
+    parser.add_argument(
+        '--profile-memory',
+        dest='profile',
+        action='store_const',
+        const='memory',
+        help='Same as --profile, but trace peak memory usage of the phases '
+             'as well. Slows validation down considerably.'
+    )
+    add_logging_arguments(parser)
     return parser
 
 
+_requirements = None
+_options = None
+#: Max number of rendered violations of a document a worker keeps in memory
+MAX_BUFFERED_RECORDS = 1000
+
+_profile = None
+_output_format = None
+_writer = None
+_aggregate = None
+
+
+def _init_worker(requirements, options, profile=None, output_format=None,
+                 writer=None, aggregate=None):
+    """Set up validation of documents of a batch.
+
+    :param output_format: format violations are rendered in, see
+                          validocx.formatters
+    :param writer: writer violations are written to. Set only if documents
+                   are validated in the process the writer belongs to,
+                   violations rendered in worker processes are returned
+    :param aggregate: number of sampled locations of identical violations,
+                      which are reported once. None to report every one
+    """
+
+    global _requirements, _options, _profile, _output_format, _writer
+    global _aggregate
+    _requirements = requirements
+    _options = options
+    _profile = profile
+    _output_format = output_format
+    _writer = writer
+    _aggregate = aggregate
+
+
+class _RecordSpool(object):
+    """Violations of a document rendered in a worker process.
+
+    Up to max_records records are kept in memory, the rest are spilled to
+    a temporary file. Only the file path is sent to the parent process, so
+    neither process holds all the violations of a large document. Records
+    can be iterated once, the file is removed then.
+    """
+
+    def __init__(self, max_records=MAX_BUFFERED_RECORDS):
+        self._max_records = max_records
+        self._records = []
+        self._file = None
+        self._path = None
+
+    def append(self, record):
+        self._records.append(record)
+        if len(self._records) < self._max_records:
+            return
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(
+                prefix='validocx-', suffix='.records', delete=False)
+            self._path = self._file.name
+        for buffered in self._records:
+            pickle.dump(buffered, self._file, pickle.HIGHEST_PROTOCOL)
+        self._records = []
+
+    def __iter__(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path is not None:
+            try:
+                with open(self._path, 'rb') as stream:
+                    while True:
+                        try:
+                            yield pickle.load(stream)
+                        except EOFError:
+                            break
+            finally:
+                os.unlink(self._path)
+                self._path = None
+        yield from self._records
+
+    def __getstate__(self):
+        # The spilled records are flushed before they are read by the
+        # parent process
+        if self._file is not None:
+            self._file.close()
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+
+def _validate_file(file_path, requirements, options, profile=None):
+    """Validate a document, profiling it if requested.
+
+    :param profile: None, 'time' or 'memory' to trace memory usage as well
+    """
+
+    if profile:
+        options = dict(options, profiler=profiling.Profiler(
+            trace_memory=profile == 'memory'))
+    return validate(file_path, requirements, **options)
+
+
+def _report_groups(file_path, aggregator, output_format=None, writer=None):
+    """Report groups of identical violations of a document.
+
+    Groups are written to the writer, rendered in the output format or
+    logged if neither is set.
+
+    :returns: a list of rendered groups or None
+    """
+
+    root_logger = logging.getLogger()
+    if aggregator.dropped:
+        root_logger.warning(
+            "Violations of '{0}' are grouped into the first {1} group(s), "
+            "{2} violation(s) of other groups are only counted.".format(
+                file_path, len(aggregator), aggregator.dropped))
+    if writer is not None:
+        for group in aggregator:
+            writer.write_record(writer.format_group(group, file_path))
+    elif output_format is not None:
+        from . import formatters
+        format_group = formatters.get_writer(output_format).format_group
+        return [format_group(group, file_path) for group in aggregator]
+    else:
+        from .report import LoggingSink
+        sink = LoggingSink(root_logger)
+        for group in aggregator:
+            sink(group)
+    return None
+
+
+def _get_exit_code(errors, warnings):
+    if errors:
+        return EXIT_ERRORS
+    return EXIT_WARNINGS if warnings else EXIT_OK
+
+
+def _log_profile(stats):
+    logging.getLogger().info('Profile:\n{0}'.format(
+        '\n'.join(profiling.format_stats(stats))))
+
+
+def _validate_document(file_path):
+    """Validate a single document of a batch.
+
+    Compiled requirements and validation options are expected to be set up
+    by :func:`_init_worker`.
+
+    :returns: a tuple of the file path, number of errors and warnings,
+              whether validation was truncated, profile statistics and
+              an iterable of violations rendered in the output format (None
+              if they are written already or no format is set)
+    """
+
+    root_logger = logging.getLogger()
+    root_logger.info("Validating '{0}'.".format(file_path))
+    options = _options
+    records = aggregator = None
+    if _aggregate is not None:
+        from .report import AggregatingSink
+        aggregator = AggregatingSink(_aggregate)
+        options = dict(options, sinks=(aggregator,))
+    elif _writer is not None:
+        options = dict(options, sinks=(_writer.sink(file_path),))
+    elif _output_format is not None:
+        from . import formatters
+        records = _RecordSpool()
+        format_violation = formatters.get_writer(
+            _output_format).format_violation
+        options = dict(options, sinks=(lambda violation: records.append(
+            format_violation(violation, file_path)),))
+    try:
+        report = _validate_file(file_path, _requirements, options, _profile)
+    except Exception as e:
+        root_logger.error("Failed to validate '{0}': {1}".format(file_path,
+                                                                 e))
+        return file_path, 1, 0, False, None, records
+    if aggregator is not None:
+        records = _report_groups(file_path, aggregator, _output_format,
+                                 _writer)
+    return (file_path, report.errors, report.warnings, report.truncated,
+            report.profile, records)
+
+
+def _validate_batch(files, requirements, jobs, options, profile=None,
+                    writer=None, aggregate=None):
+    """Validate many documents, each one in a worker process.
+
+    :param writer: writer of validocx.formatters violations are written to
+    :param aggregate: number of sampled locations of identical violations,
+                      see validocx.report.AggregatingSink
+    :returns: total number of errors and warnings
+    """
+
+    root_logger = logging.getLogger()
+    if not files:
+        root_logger.warning("No docx files found.")
+    requirements = compile_requirements(requirements)
+    output_format = writer.format if writer is not None else None
+    if jobs == 1:
+        _init_worker(requirements, options, profile, output_format, writer,
+                     aggregate)
+        results = map(_validate_document, files)
+        pool = None
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(processes=jobs,
+                                    initializer=_init_worker,
+                                    initargs=(requirements, options,
+                                              profile, output_format, None,
+                                              aggregate))
+        results = pool.imap(_validate_document, files)
+
+    total_errors = total_warnings = 0
+    profiles = []
+    try:
+        for (file_path, errors, warnings, truncated, stats,
+             records) in results:
+            if writer is not None:
+                for record in records or ():
+                    writer.write_record(record)
+                writer.add_document(file_path, errors, warnings, truncated)
+            profiles.append(stats)
+            total_errors += errors
+            total_warnings += warnings
+            root_logger.info("Summary results for '{0}': Errors - {1}, "
+                             "Warnings - {2}".format(file_path, errors,
+                                                     warnings))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if options.get('cache') is not None:
+        # Workers track only sizes of the reports they store themselves
+        options['cache'].evict()
+    root_logger.info("Summary results: Files - {0}, Errors - {1}, "
+                     "Warnings - {2}".format(len(files), total_errors,
+                                             total_warnings))
+    if profile:
+        _log_profile(profiling.merge_stats(*profiles))
+    return total_errors, total_warnings
+
+
 def parse_args(args):
-    parser = create_parser()
+    if args and args[0] == 'serve':
+        from . import server
+        parser = server.create_parser()
+        args = args[1:]
+    else:
+        parser = create_parser()
     parsed_args = vars(parser.parse_args(args=args))
     return parsed_args
 
@@ -85,8 +566,8 @@ def run(arguments):
     log_file = arguments['log_file'] if arguments['log_file'] else None
     logging.basicConfig(level=level, format=CONSOLE_LOG_FORMAT)
     root_logger = logging.getLogger()
-    mch = MessageCounterHandler()
-    root_logger.addHandler(mch)
+    # basicConfig() does not change the level if logging is configured
+    root_logger.setLevel(level)
     if log_file:
         fh = logging.FileHandler(filename=log_file)
         fh.setLevel(level=level)
@@ -94,11 +575,93 @@ def run(arguments):
         fh.setFormatter(formatter)
         root_logger.addHandler(fh)
 
-    requirements = utils.read_from_file(arguments['requirements'])
-    validate(arguments['docx-file'], requirements)
-    root_logger.info("Summary results: Errors - {0}, "
-                     "Warnings - {1}".format(mch.msg_level_count['ERROR'],
-                                             mch.msg_level_count['WARNING']))
+    if arguments.get('command') == 'serve':
+        from . import server
+        return server.run(arguments)
+
+    requirements = utils.read_from_file(
+        arguments['requirements'], sidecar=arguments['requirements_sidecar'])
+    files = _expand_paths(arguments['docx-file'])
+    options = {'engine': arguments['engine'],
+               'max_errors': 1 if arguments['fail_fast'] else
+               arguments['max_errors']}
+    for option in ('only', 'styles', 'paragraphs'):
+        if arguments[option] is not None:
+            options[option] = arguments[option]
+    if arguments['incremental_cache']:
+        options['incremental'] = arguments['incremental_cache']
+    if arguments['cache_dir'] and not arguments['no_cache']:
+        from .cache import ResultCache
+        # A single store keeps track of its size across documents
+        options['cache'] = ResultCache(arguments['cache_dir'])
+    if arguments['vectorized']:
+        options['vectorized'] = True
+    if arguments['aggregate']:
+        # Groups are reported once a document is validated
+        options.update(log_violations=False, keep=False)
+    if len(files) == 1 and arguments['jobs'] and arguments['jobs'] > 1:
+        if 'incremental' in options:
+            root_logger.warning("Incremental validation runs in a single "
+                                "process, --jobs is ignored.")
+        elif 'vectorized' in options:
+            root_logger.warning("Vectorized validation runs in a single "
+                                "process, --jobs is ignored.")
+        else:
+            options['jobs'] = arguments['jobs']
+    if arguments['output_format'] is None:
+        errors, warnings = _validate_files(files, requirements, arguments,
+                                           options)
+        return _get_exit_code(errors, warnings)
+
+    from . import formatters
+    # Violations are written instead of being logged and are not kept
+    options.update(log_violations=False, keep=False)
+    stream = (open(arguments['output'], 'w', encoding='utf-8')
+              if arguments['output'] else sys.stdout)
+    try:
+        writer = formatters.get_writer(arguments['output_format'])(stream)
+        errors, warnings = _validate_files(files, requirements, arguments,
+                                           options, writer)
+        writer.close()
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return _get_exit_code(errors, warnings)
+
+
+def _validate_files(files, requirements, arguments, options, writer=None):
+    """Validate documents, writing their violations to the writer.
+
+    :returns: total number of errors and warnings
+    """
+
+    aggregate = arguments['aggregate']
+    if len(files) != 1:
+        return _validate_batch(files, requirements, arguments['jobs'],
+                               options, arguments['profile'], writer,
+                               aggregate)
+
+    file_path = files[0]
+    aggregator = None
+    if aggregate:
+        from .report import AggregatingSink
+        aggregator = AggregatingSink(aggregate)
+        options = dict(options, sinks=(aggregator,))
+    elif writer is not None:
+        options = dict(options, sinks=(writer.sink(file_path),))
+    report = _validate_file(file_path, requirements, options,
+                            arguments['profile'])
+    if aggregator is not None:
+        _report_groups(file_path, aggregator, writer=writer)
+    if writer is not None:
+        writer.add_document(file_path, report.errors, report.warnings,
+                            report.truncated)
+    logging.getLogger().info("Summary results: Errors - {0}, "
+                             "Warnings - {1}".format(report.errors,
+                                                     report.warnings))
+    if report.profile is not None:
+        _log_profile(report.profile)
+    return report.errors, report.warnings
 
 
 def main(args=sys.argv[1:]):  # pragma: no cover
@@ -0,0 +1,41 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+# The module is imported by the CLI on startup, so it must not depend on
+# python-docx, lxml, jsonschema or PyYAML
+
+#: Engines used to read a document: 'docx' loads the whole document with
+#: python-docx, 'stream' parses it incrementally with constant memory usage
+ENGINES = ('docx', 'stream')
+
+#: Parts of a document validation can be limited to
+SCOPES = ('sections', 'styles')
+
+#: Relative tolerance of numeric attributes of paragraphs and sections
+REL_TOL = 1e-02
+
+#: Machine-readable formats of violations written by the CLI
+FORMATS = ('json', 'jsonl', 'sarif')
+
+#: Number of sampled locations and maximum number of groups of identical
+#: violations, see validocx.report.AggregatingSink
+AGGREGATE_SAMPLES = 5
+AGGREGATE_GROUPS = 1000
+
+#: Exit codes of the CLI: no violations, errors found (or a document failed
+#: to be validated), only warnings found
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_WARNINGS = 4
+
+#: Environment variable with the default report cache directory of the CLI
+CACHE_DIR_ENV = 'VALIDOCX_CACHE_DIR'
+
+#: Separates a path of a zip or tar archive and a path of a docx file in it,
+#: e.g. 'bundle.zip::thesis/main.docx'
+ARCHIVE_SEPARATOR = '::'
+
+#: Extensions of archives (bundles of documents)
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2',
+                      '.tar.xz', '.txz')
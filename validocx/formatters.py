@@ -0,0 +1,289 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['JsonLinesWriter', 'JsonWriter', 'SarifWriter', 'get_writer']
+
+import abc
+import json
+import os
+import urllib.parse
+
+from . import __version__
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+# Descriptions of kinds of violations, rules of SARIF
+_RULES = (
+    ('section-attribute',
+     'Attribute of a section does not match the requirements.'),
+    ('section-undefined', 'Requirements of a section are not specified.'),
+    ('style-undefined', 'Style of a paragraph has no requirements.'),
+    ('font', 'Font attributes of a run do not match the requirements.'),
+    ('paragraph-attribute',
+     'Attribute of a paragraph does not match the requirements.'),
+    ('paragraph-undefined-attribute',
+     'Required attribute of a paragraph is not defined.'),
+)
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class _Writer(object, metaclass=abc.ABCMeta):
+    """Base class of writers streaming violations of documents.
+
+    A writer is a sink: violations are written to the stream as they are
+    passed to it, nothing but per-document counters is kept in memory.
+    Violations are formatted into records by format_violation() (groups
+    of violations, see validocx.report.AggregatingSink, by format_group()),
+    so they can be formatted in other processes and written by
+    write_record().
+    """
+
+    #: Name of the format, one of validocx.constants.FORMATS
+    format = None
+
+    def __init__(self, stream):
+        """
+        :param stream: text stream to write to, e.g. sys.stdout
+        """
+        self._stream = stream
+        self._started = False
+        self.files = 0
+        self.errors = 0
+        self.warnings = 0
+
+    @staticmethod
+    @abc.abstractmethod
+    def format_violation(violation, file_path):
+        """Format a violation of a document into a record.
+
+        :returns: a string to be passed to write_record()
+        """
+
+    @staticmethod
+    @abc.abstractmethod
+    def format_group(group, file_path):
+        """Format a group of violations of a document into a record.
+
+        :returns: a string to be passed to write_record()
+        """
+
+    def sink(self, file_path):
+        """Get a sink writing violations of a document."""
+
+        return lambda violation: self.write_record(
+            self.format_violation(violation, file_path))
+
+    def write_record(self, record):
+        self._start()
+        self._write_record(record)
+
+    def add_document(self, file_path, errors, warnings, truncated=False):
+        """Count a document once all its violations are written."""
+
+        self._start()
+        self.files += 1
+        self.errors += errors
+        self.warnings += warnings
+        self._write_document({'file': file_path, 'errors': errors,
+                              'warnings': warnings, 'truncated': truncated})
+
+    def summary(self):
+        return {'files': self.files, 'errors': self.errors,
+                'warnings': self.warnings}
+
+    def close(self):
+        """Write the summary, the stream is flushed but not closed."""
+
+        self._start()
+        self._write_footer()
+        self._stream.flush()
+
+    def _start(self):
+        if not self._started:
+            self._started = True
+            self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _write_record(self, record):
+        self._stream.write(record)
+
+    def _write_document(self, document):
+        pass
+
+    def _write_footer(self):
+        pass
+
+
+class JsonLinesWriter(_Writer):
+    """Writer of JSON Lines: a violation, document or summary per line.
+
+    Every line has a 'type' key: 'violation', 'group' (of violations),
+    'document' (written once a document is validated) or 'summary' (the
+    last line).
+    """
+
+    format = 'jsonl'
+
+    @staticmethod
+    def format_violation(violation, file_path):
+        data = violation.to_json()
+        data['type'] = 'violation'
+        data['file'] = file_path
+        return _dumps(data) + '\n'
+
+    @staticmethod
+    def format_group(group, file_path):
+        data = group.to_json()
+        data['type'] = 'group'
+        data['file'] = file_path
+        return _dumps(data) + '\n'
+
+    def _write_document(self, document):
+        document['type'] = 'document'
+        self._stream.write(_dumps(document) + '\n')
+
+    def _write_footer(self):
+        summary = self.summary()
+        summary['type'] = 'summary'
+        self._stream.write(_dumps(summary) + '\n')
+
+
+class JsonWriter(_Writer):
+    """Writer of a single JSON object.
+
+    The object has 'violations', 'documents' and 'summary' keys.
+    Violations (or groups of them with 'count' and 'samples' keys) are
+    written as they are found, documents (small records with counters)
+    once all of them are validated.
+    """
+
+    format = 'json'
+
+    def __init__(self, stream):
+        super(JsonWriter, self).__init__(stream)
+        self._documents = []
+        self._separator = '\n'
+
+    @staticmethod
+    def format_violation(violation, file_path):
+        data = violation.to_json()
+        data['file'] = file_path
+        return _dumps(data)
+
+    format_group = format_violation
+
+    def _write_header(self):
+        self._stream.write('{"violations":[')
+
+    def _write_record(self, record):
+        self._stream.write(self._separator)
+        self._stream.write(record)
+        self._separator = ',\n'
+
+    def _write_document(self, document):
+        self._documents.append(document)
+
+    def _write_footer(self):
+        self._stream.write('\n],"documents":{0},"summary":{1}}}\n'.format(
+            _dumps(self._documents), _dumps(self.summary())))
+
+
+def _to_uri(file_path):
+    return urllib.parse.quote(file_path.replace(os.sep, '/'), safe='/:')
+
+
+def _get_location(uri, context, location):
+    name = '/'.join(str(part) for part in context + location)
+    return {
+        'physicalLocation': {'artifactLocation': {'uri': uri}},
+        'logicalLocations': [{'fullyQualifiedName': name,
+                              'kind': 'element'}]
+    }
+
+
+class SarifWriter(JsonWriter):
+    """Writer of a SARIF 2.1.0 log with a single run.
+
+    Violations are results, kinds of violations are rules. A group of
+    violations is a result with a location per sample and the number of
+    violations in occurrenceCount. Documents are artifacts, the summary is
+    stored in the properties of the run.
+    """
+
+    format = 'sarif'
+
+    @staticmethod
+    def format_violation(violation, file_path):
+        data = violation.to_json()
+        result = {
+            'ruleId': data.pop('kind'),
+            'level': data.pop('severity'),
+            'message': {'text': data.pop('message')},
+            'locations': [_get_location(_to_uri(file_path),
+                                        violation.context,
+                                        violation.location)],
+            'properties': data
+        }
+        return _dumps(result)
+
+    @staticmethod
+    def format_group(group, file_path):
+        data = group.to_json()
+        del data['samples']
+        uri = _to_uri(file_path)
+        result = {
+            'ruleId': data.pop('kind'),
+            'level': data.pop('severity'),
+            'message': {'text': data.pop('message')},
+            'locations': [_get_location(uri, context, location)
+                          for context, location in group.samples],
+            'occurrenceCount': data.pop('count'),
+            'properties': data
+        }
+        return _dumps(result)
+
+    def _write_header(self):
+        driver = {
+            'name': 'validocx',
+            'version': __version__,
+            'informationUri': 'https://github.com/tivaliy/docx-validator',
+            'rules': [{'id': kind, 'shortDescription': {'text': text}}
+                      for kind, text in _RULES]
+        }
+        self._stream.write(
+            '{{"$schema":{0},"version":"2.1.0","runs":[{{"tool":{{'
+            '"driver":{1}}},"results":['.format(_dumps(SARIF_SCHEMA),
+                                                _dumps(driver)))
+
+    def _write_footer(self):
+        artifacts = [{'location': {'uri': _to_uri(document['file'])},
+                      'properties': document}
+                     for document in self._documents]
+        self._stream.write(
+            '\n],"artifacts":{0},"invocations":[{{"executionSuccessful":'
+            'true}}],"properties":{1}}}]}}\n'.format(
+                _dumps(artifacts), _dumps(self.summary())))
+
+
+_WRITERS = {writer.format: writer
+            for writer in (JsonWriter, JsonLinesWriter, SarifWriter)}
+
+
+def get_writer(output_format):
+    """Get a writer class by the name of its format.
+
+    :param output_format: one of validocx.constants.FORMATS
+    """
+
+    try:
+        return _WRITERS[output_format]
+    except KeyError:
+        raise ValueError("Unsupported format '{0}'. Only {1} formats are "
+                         "allowed".format(output_format,
+                                          ', '.join(sorted(_WRITERS))))
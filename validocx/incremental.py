@@ -0,0 +1,127 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['IncrementalCache']
+
+import collections
+import functools
+import hashlib
+import logging
+import os
+import pickle
+
+from lxml import etree
+
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever cached verdicts may become stale, e.g. on changes of the
+# way attributes are fetched or compared
+_FORMAT_VERSION = 2
+
+
+class IncrementalCache(object):
+    """Violations of paragraphs of previously validated documents.
+
+    A paragraph is identified by a hash of its XML (which includes its
+    style id and direct formatting), the styles part of the document and
+    the requirements. So unchanged paragraphs of a new revision of
+    a document are not checked again, their cached violations are reused.
+
+    The cache file is a pickle, it must be trusted as much as the code.
+    """
+
+    def __init__(self, path=None, maxsize=100000):
+        """
+        :param path: file the cache is loaded from and saved to. None value
+                     implies an in-memory cache
+        :param maxsize: max number of paragraphs kept, the least recently
+                        used ones are dropped first
+        """
+        self._path = path
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._context = None
+        self._modified = False
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def bound(self):
+        return self._context is not None
+
+    def load(self):
+        """Load entries from the cache file, a broken file is ignored."""
+
+        try:
+            with open(self._path, 'rb') as stream:
+                data = pickle.load(stream)
+            if data['version'] != _FORMAT_VERSION:
+                return
+            self._entries = data['entries']
+        except Exception as e:
+            logger.warning("Incremental cache '{0}' is ignored: "
+                           "{1}".format(self._path, e))
+
+    def save(self):
+        """Save entries to the cache file, if they have been modified.
+
+        The file is replaced atomically, so concurrent readers never see
+        a partially written cache.
+        """
+
+        if not self._modified:
+            return
+        utils.write_atomically(self._path, functools.partial(
+            utils.dump_pickle,
+            {'version': _FORMAT_VERSION, 'entries': self._entries}))
+        self._modified = False
+
+    def bind(self, styles_digest, requirements_digest):
+        """Set up the context paragraphs of a document are validated in.
+
+        Hit and miss counters are reset.
+
+        :param styles_digest: digest of the styles part of the document
+        :param requirements_digest: digest of the requirements
+        """
+
+        self._context = '{0}:{1}:{2}'.format(
+            _FORMAT_VERSION, styles_digest, requirements_digest).encode()
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, paragraph):
+        """Get key of a paragraph in the bound context."""
+
+        return hashlib.sha1(self._context +
+                            etree.tostring(paragraph._p)).digest()
+
+    def get(self, key):
+        """Get cached violations of a paragraph or None."""
+
+        try:
+            violations = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return violations
+
+    def put(self, key, violations):
+        self._modified = True
+        self._entries[key] = tuple(violations)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,162 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['ParallelValidator']
+
+import collections
+import io
+import multiprocessing
+import os
+import pickle
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from . import utils
+from .requirements import CompiledRequirements, _thaw
+from .validator import Validator
+from .wrapper import _P, DocumentWrapper
+
+DEFAULT_CHUNK_SIZE = 1000
+
+_BODY_START = '<w:body {0}>'.format(nsdecls('w')).encode()
+_BODY_END = b'</w:body>'
+
+
+def _join_chunk(elements):
+    return b''.join([_BODY_START] + elements + [_BODY_END])
+
+
+class _ChunkWrapper(DocumentWrapper):
+    """Wrapper of a chunk of paragraphs of a document.
+
+    The style table is built once and shared by all the chunks validated
+    in a worker process.
+    """
+
+    def __init__(self, styles_element):
+        self._styles_element = styles_element
+        self._body = None
+        self._contexts = ()
+        self._author = self._created = None
+        self._modified = self._last_modified_by = None
+
+    def set_chunk(self, chunk, contexts):
+        self._body = parse_xml(chunk)
+        self._contexts = contexts
+
+    def iter_sections(self):
+        return iter(())
+
+    def _walk(self):
+        return zip(self._body.iterchildren(_P), self._contexts)
+
+    def _create_paragraph(self, element):
+        return Paragraph(element, None)
+
+
+_validator = None
+_style_requirements = None
+_style_ids = None
+
+
+def _init_worker(styles_xml, requirements, style_ids):
+    global _validator, _style_requirements, _style_ids
+    _validator = Validator(_ChunkWrapper(parse_xml(styles_xml)),
+                           log_violations=False)
+    _style_requirements = requirements.styles
+    _style_ids = style_ids
+
+
+def _validate_chunk(offset, chunk, contexts):
+    """Validate a chunk of paragraphs.
+
+    :param offset: index of the first paragraph of the chunk in a document
+    :param chunk: serialized w:body element with the paragraphs
+    :param contexts: contexts of the paragraphs, see DocumentWrapper.walk()
+    :returns: violations with indices in a document, pickled
+    """
+
+    _validator._docx.set_chunk(chunk, contexts)
+    violations = []
+    for violation in _validator._iter_style_violations(_style_requirements,
+                                                       _style_ids):
+        location = violation.location
+        violations.append(violation.replace(
+            location=location[:1] + (location[1] + offset,) +
+            location[2:]))
+    stream = io.BytesIO()
+    # Violations hold python-docx enumeration values
+    utils.dump_pickle(violations, stream)
+    return stream.getvalue()
+
+
+class ParallelValidator(Validator):
+    """Validator spreading paragraphs of a document across processes.
+
+    Sections are validated in the calling process, while paragraphs (as
+    walked by DocumentWrapper.walk()) are split into contiguous chunks,
+    which are sent (as XML along with the styles part) to a pool of worker
+    processes. Violations are merged back in document order, so the result
+    is the same as of Validator.
+
+    Incremental validation is not supported, paragraphs are always
+    checked.
+    """
+
+    def __init__(self, document, jobs=None, chunk_size=None, **kwargs):
+        """
+        :param document: docx.Document or an instance of DocumentWrapper
+                         (or its subclass)
+        :param jobs: number of worker processes. Defaults to the number of
+                     CPUs
+        :param chunk_size: number of paragraphs sent to a worker at once.
+                           Defaults to DEFAULT_CHUNK_SIZE
+        :param kwargs: Validator keyword arguments
+        """
+        super(ParallelValidator, self).__init__(document, **kwargs)
+        self._jobs = jobs or os.cpu_count() or 1
+        self._chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+
+    def _iter_chunks(self, paragraphs=None):
+        start, stop = paragraphs or (0, None)
+        start = start or 0
+        offset, elements, contexts = start, [], []
+        for i, (element, context) in enumerate(self._docx._walk()):
+            if i < start:
+                continue
+            if stop is not None and i >= stop:
+                break
+            elements.append(etree.tostring(element))
+            contexts.append(context)
+            if len(elements) == self._chunk_size:
+                yield offset, _join_chunk(elements), contexts
+                offset, elements, contexts = i + 1, [], []
+        if elements:
+            yield offset, _join_chunk(elements), contexts
+
+    def _iter_style_violations(self, style_requirements, style_ids=None,
+                               paragraphs=None):
+        pool = multiprocessing.Pool(
+            processes=self._jobs, initializer=_init_worker,
+            initargs=(etree.tostring(self._docx._styles_element),
+                      # Compiled requirements keep their frozen form
+                      CompiledRequirements._from_valid(
+                          {'styles': _thaw(style_requirements)}),
+                      style_ids))
+        # A few chunks per worker are queued, the rest of a document is
+        # not serialized until they are done
+        pending = collections.deque()
+        try:
+            for chunk in self._iter_chunks(paragraphs):
+                pending.append(pool.apply_async(_validate_chunk, chunk))
+                if len(pending) > 2 * self._jobs:
+                    yield from pickle.loads(pending.popleft().get())
+            while pending:
+                yield from pickle.loads(pending.popleft().get())
+        finally:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,204 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['ProfileEntry', 'Profiler']
+
+import collections
+import contextlib
+import functools
+import time
+import tracemalloc
+
+ProfileEntry = collections.namedtuple('ProfileEntry',
+                                      ['calls', 'seconds', 'peak_memory'])
+
+
+class Profiler(object):
+    """Collects wall time, call counts and memory peaks of validation.
+
+    Phases (e.g. loading of a document) are timed as a whole, hot methods
+    are instrumented to count calls and accumulate time spent in them.
+    Memory peaks are traced with tracemalloc for phases only, they are
+    exact on Python 3.9+ and the peak since tracing started otherwise.
+    """
+
+    def __init__(self, trace_memory=False, hook=None):
+        """
+        :param trace_memory: whether peak memory usage of phases has to be
+                             traced. Slows validation down considerably
+        :param hook: callable the collected statistics (as returned by
+                     stats()) are passed to once profiling is finished,
+                     e.g. to forward them to a metrics system
+        """
+        self._trace_memory = trace_memory
+        self._hook = hook
+        self._started_tracing = False
+        self._entries = collections.OrderedDict()
+        self._instrumented = []
+
+    def _add(self, name, calls, seconds, peak_memory=None):
+        entry = self._entries.get(name)
+        if entry is not None:
+            calls += entry.calls
+            seconds += entry.seconds
+            if entry.peak_memory is not None:
+                peak_memory = max(peak_memory or 0, entry.peak_memory)
+        self._entries[name] = ProfileEntry(calls, seconds, peak_memory)
+
+    def _start_memory(self):
+        if not self._trace_memory:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    def _peak_memory(self):
+        if self._trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1]
+        return None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time a block of code as a phase."""
+
+        self._start_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add(name, 1, time.perf_counter() - start,
+                      self._peak_memory())
+
+    def iter_phase(self, name, iterable):
+        """Time a lazily consumed phase.
+
+        Only time spent in producing items is accounted, the consumer's
+        processing of the items is not.
+        """
+
+        iterator = iter(iterable)
+        self._start_memory()
+        self._add(name, 1, 0.0)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self._add(name, 0, time.perf_counter() - start)
+                yield item
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            self._add(name, 0, 0.0, self._peak_memory())
+
+    def wrap(self, name, func):
+        """Wrap a callable to count its calls and time spent in it."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(name, 1, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, obj, methods, prefix=None):
+        """Instrument methods of an object till restore() is called.
+
+        :param obj: object to be instrumented, its class is not affected
+        :param methods: names of the methods
+        :param prefix: prefix of the names of the entries. Defaults to the
+                       class name of the object
+        """
+
+        prefix = prefix or type(obj).__name__
+        for method in methods:
+            self._instrumented.append((obj, method, obj.__dict__.get(method)))
+            setattr(obj, method, self.wrap('{0}.{1}'.format(prefix, method),
+                                           getattr(obj, method)))
+
+    def restore(self):
+        """Undo instrumentation done with instrument()."""
+
+        while self._instrumented:
+            obj, method, original = self._instrumented.pop()
+            if original is None:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, original)
+
+    def stats(self):
+        """Get statistics collected so far.
+
+        :returns: a dict (ordered by the first appearance) of ProfileEntry
+                  by phase or method name
+        """
+
+        return collections.OrderedDict(self._entries)
+
+    def finish(self):
+        """Finish profiling, passing statistics to the hook.
+
+        :returns: statistics as returned by stats()
+        """
+
+        self.restore()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        stats = self.stats()
+        if self._hook is not None:
+            self._hook(stats)
+        return stats
+
+
+class _NullProfiler(object):
+    """Profiler doing nothing, used when profiling is off."""
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        yield
+
+    def iter_phase(self, name, iterable):
+        return iterable
+
+    def instrument(self, obj, methods, prefix=None):
+        pass
+
+    def restore(self):
+        pass
+
+    def finish(self):
+        return None
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+def merge_stats(*stats):
+    """Merge statistics of several profilers, e.g. of a batch."""
+
+    merged = Profiler()
+    for entries in stats:
+        for name, entry in (entries or {}).items():
+            merged._add(name, *entry)
+    return merged.stats()
+
+
+def format_stats(stats):
+    """Render statistics as lines of a table."""
+
+    yield '{0:<50} {1:>10} {2:>12} {3:>12}'.format('Phase / method', 'Calls',
+                                                   'Time, s', 'Peak, KiB')
+    for name, entry in stats.items():
+        yield '{0:<50} {1:>10} {2:>12.4f} {3:>12}'.format(
+            name, entry.calls, entry.seconds,
+            '-' if entry.peak_memory is None else
+            '{0:.1f}'.format(entry.peak_memory / 1024.0))
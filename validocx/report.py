@@ -0,0 +1,385 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['ERROR', 'WARNING', 'AggregatingSink', 'LoggingSink',
+           'ValidationReport', 'Violation', 'ViolationGroup']
+
+import collections
+import logging
+
+from . import utils
+from .constants import AGGREGATE_GROUPS, AGGREGATE_SAMPLES
+
+ERROR = 'error'
+WARNING = 'warning'
+
+_LOG_LEVELS = {ERROR: logging.ERROR, WARNING: logging.WARNING}
+
+
+def _join(values):
+    return ', '.join(str(v) for v in values)
+
+
+def _to_json(value):
+    """Convert a value to a JSON compatible one.
+
+    python-docx enumerations and lengths are int subclasses, they are
+    converted to plain numbers.
+    """
+
+    if value is None or isinstance(value, (bool, str, float)):
+        return value
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return str(value)
+
+
+def _describe(context):
+    """Render a context, e.g. 'table 0, row 1, cell 2'."""
+
+    return ', '.join('{0} {1}'.format(name, value) for name, value in
+                     zip(context[::2], context[1::2]))
+
+
+_TEMPLATES = {
+    'section-attribute': lambda v: (
+        "'Section {0}': attribute '{1}' with value {2} does not match "
+        "required value {3}".format(v.location[1], v.attribute, v.actual,
+                                    v.expected)),
+    'section-undefined': lambda v: (
+        "The requirements for 'Section {0}' are not specified.".format(
+            v.location[1])),
+    'style-undefined': lambda v: (
+        "Undefined style: '{0}'.".format(v.style)),
+    'font': lambda v: (
+        "Font attributes ({0}) mismatch required ({1}) in paragraph with "
+        "style '{2}':\n'{3}'".format(_join(v.actual), _join(v.expected),
+                                     v.style, v.text)),
+    'paragraph-attribute': lambda v: (
+        "The attribute of paragraph '{0}' ({1}) with value {2} does not "
+        "match required value {3}: \n'{4}'".format(v.attribute, v.style,
+                                                   v.actual, v.expected,
+                                                   v.text)),
+    'paragraph-undefined-attribute': lambda v: (
+        "The attribute of paragraph '{0}' is not defined. The required "
+        "value is {1}: \n'{2}'".format(v.attribute, v.expected, v.text)),
+}
+
+
+class _PicklableEnumValue(object):
+    """Wrapper pickled as the python-docx enumeration value it holds."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce__(self):
+        return utils.reduce_enum_value(self.value)
+
+
+class Violation(object):
+    """A single requirement violation found in a document.
+
+    A violation holds raw data only, the message is rendered on demand.
+    """
+
+    __slots__ = ('kind', 'severity', 'location', 'style', 'attribute',
+                 'actual', 'expected', 'text', 'context')
+
+    def __init__(self, kind, severity, location, style=None, attribute=None,
+                 actual=None, expected=None, text=None, context=()):
+        """
+        :param kind: kind of a violation, e.g. 'paragraph-attribute'
+        :param severity: ERROR or WARNING
+        :param location: path to the violating element as a tuple, e.g.
+                         ('section', 0) or ('paragraph', 5, 'run', 2)
+        :param style: name of the paragraph style
+        :param attribute: name of the violating attribute
+        :param actual: value found in a document
+        :param expected: value required by the requirements
+        :param text: text of the violating paragraph or run
+        :param context: path to the container of the violating paragraph,
+                        e.g. ('table', 0, 'row', 1, 'cell', 2), see
+                        DocumentWrapper.walk(). Empty for the body
+        """
+        self.kind = kind
+        self.severity = severity
+        self.location = location
+        self.style = style
+        self.attribute = attribute
+        self.actual = actual
+        self.expected = expected
+        self.text = text
+        self.context = context
+
+    @property
+    def message(self):
+        message = _TEMPLATES[self.kind](self)
+        if self.context:
+            message = '[{0}] {1}'.format(_describe(self.context), message)
+        return message
+
+    def as_dict(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    def replace(self, **changes):
+        """Get a copy of the violation with the specified fields replaced."""
+
+        violation = object.__new__(type(self))
+        for attr in self.__slots__:
+            setattr(violation, attr, changes.pop(attr, getattr(self, attr)))
+        if changes:
+            raise TypeError('Unexpected fields: {0}'.format(
+                ', '.join(sorted(changes))))
+        return violation
+
+    def to_json(self):
+        """Get violation as a dict of JSON compatible values."""
+
+        data = {attr: _to_json(getattr(self, attr))
+                for attr in self.__slots__}
+        data['message'] = self.message
+        return data
+
+    def __reduce__(self):
+        # Values of python-docx 0.8 enumerations (e.g. of alignment) are
+        # pickled but can not be unpickled. Fields are listed in the order
+        # of __init__() arguments
+        enum_value_class = utils.get_enum_value_class()
+        args = tuple(getattr(self, attr) for attr in self.__slots__)
+        if enum_value_class is not None:
+            args = tuple(_PicklableEnumValue(value)
+                         if isinstance(value, enum_value_class) else value
+                         for value in args)
+        return type(self), args
+
+    def __eq__(self, other):
+        if not isinstance(other, Violation):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr)
+                   for attr in self.__slots__)
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, ', '.join(
+            '{0}={1!r}'.format(attr, getattr(self, attr))
+            for attr in self.__slots__))
+
+
+class LoggingSink(object):
+    """Sink that logs violations.
+
+    A violation is passed to the logger as is, so its message is rendered
+    only if the record is actually emitted.
+    """
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def __call__(self, violation):
+        self._logger.log(_LOG_LEVELS[violation.severity], violation)
+
+
+def _hashable(value):
+    # Font attributes are lists, font requirements are dicts
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    return value
+
+
+def _format_value(value):
+    if isinstance(value, (list, tuple, dict)):
+        return _join(value)
+    return str(value)
+
+
+class ViolationGroup(object):
+    """Identical violations found at different locations of a document.
+
+    Violations are identical if they have the same kind, severity, style,
+    attribute, actual and expected values. Only the first locations of
+    violations are sampled.
+    """
+
+    __slots__ = ('kind', 'severity', 'style', 'attribute', 'actual',
+                 'expected', 'count', 'samples')
+
+    def __init__(self, violation):
+        self.kind = violation.kind
+        self.severity = violation.severity
+        self.style = violation.style
+        self.attribute = violation.attribute
+        self.actual = violation.actual
+        self.expected = violation.expected
+        self.count = 0
+        #: (context, location) tuples of the first violations
+        self.samples = []
+
+    @property
+    def message(self):
+        details = ["{0} x '{1}'".format(self.count, self.kind)]
+        if self.style is not None:
+            details.append("style '{0}'".format(self.style))
+        if self.attribute is not None:
+            details.append("attribute '{0}'".format(self.attribute))
+        if self.actual is not None:
+            details.append('value {0}'.format(_format_value(self.actual)))
+        if self.expected is not None:
+            details.append('required value {0}'.format(
+                _format_value(self.expected)))
+        locations = ['; '.join(_describe(context + location)
+                               for context, location in self.samples)]
+        if self.count > len(self.samples):
+            locations.append('...')
+        return '{0} at: {1}'.format(', '.join(details), ' '.join(locations))
+
+    def to_json(self):
+        """Get group as a dict of JSON compatible values."""
+
+        data = {attr: _to_json(getattr(self, attr))
+                for attr in self.__slots__}
+        data['samples'] = [{'context': _to_json(context),
+                            'location': _to_json(location)}
+                           for context, location in self.samples]
+        data['message'] = self.message
+        return data
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return '{0}(kind={1!r}, style={2!r}, attribute={3!r}, ' \
+               'count={4})'.format(type(self).__name__, self.kind,
+                                   self.style, self.attribute, self.count)
+
+
+class AggregatingSink(object):
+    """Sink that groups identical violations, see ViolationGroup.
+
+    Memory usage is bounded by the number of groups and samples, so it is
+    proportional to the number of distinct violations rather than to the
+    size of a document. Violations not fitting into max_groups groups are
+    only counted in the dropped attribute.
+    """
+
+    def __init__(self, max_samples=AGGREGATE_SAMPLES,
+                 max_groups=AGGREGATE_GROUPS):
+        """
+        :param max_samples: number of locations sampled per group
+        :param max_groups: maximum number of groups
+        """
+        self._max_samples = max_samples
+        self._max_groups = max_groups
+        self._groups = collections.OrderedDict()
+        self.dropped = 0
+
+    def __call__(self, violation):
+        key = (violation.kind, violation.severity, violation.style,
+               violation.attribute, _hashable(violation.actual),
+               _hashable(violation.expected))
+        group = self._groups.get(key)
+        if group is None:
+            if len(self._groups) >= self._max_groups:
+                self.dropped += 1
+                return
+            group = self._groups[key] = ViolationGroup(violation)
+        group.count += 1
+        if len(group.samples) < self._max_samples:
+            group.samples.append((violation.context, violation.location))
+
+    @property
+    def groups(self):
+        """Groups in the order their first violations were found."""
+
+        return list(self._groups.values())
+
+    def __iter__(self):
+        return iter(self._groups.values())
+
+    def __len__(self):
+        return len(self._groups)
+
+
+class ValidationReport(object):
+    """Violations found in a document.
+
+    The report is marked as truncated if validation has been stopped
+    before the whole document was checked. Statistics of a profiled
+    validation are stored in the profile attribute.
+    """
+
+    def __init__(self, sinks=(), keep=True):
+        """
+        :param sinks: callables each violation is passed to when it is added
+        :param keep: whether violations have to be stored in the report.
+                     Counters are maintained regardless of it
+        """
+        self._sinks = tuple(sinks)
+        self._keep = keep
+        self._violations = []
+        self._counts = {ERROR: 0, WARNING: 0}
+        self.truncated = False
+        self.profile = None
+
+    def add(self, violation):
+        self._counts[violation.severity] += 1
+        if self._keep:
+            self._violations.append(violation)
+        for sink in self._sinks:
+            sink(violation)
+
+    @property
+    def errors(self):
+        return self._counts[ERROR]
+
+    @property
+    def warnings(self):
+        return self._counts[WARNING]
+
+    @property
+    def violations(self):
+        return self._violations
+
+    def to_json(self):
+        """Get report as a dict of JSON compatible values."""
+
+        data = {'errors': self.errors, 'warnings': self.warnings,
+                'truncated': self.truncated,
+                'violations': [v.to_json() for v in self._violations]}
+        if self.profile is not None:
+            data['profile'] = {name: entry._asdict()
+                               for name, entry in self.profile.items()}
+        return data
+
+    def messages(self):
+        """Render messages of the stored violations."""
+
+        for violation in self._violations:
+            yield violation.message
+
+    def __iter__(self):
+        return iter(self._violations)
+
+    def __len__(self):
+        return len(self._violations)
+
+    def __bool__(self):
+        return True
+
+    def __getstate__(self):
+        # Sinks are bound to the process the report was created in
+        state = self.__dict__.copy()
+        state['_sinks'] = ()
+        return state
+
+    def __repr__(self):
+        return '{0}(errors={1}, warnings={2})'.format(
+            type(self).__name__, self.errors, self.warnings)
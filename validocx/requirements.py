@@ -0,0 +1,206 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['CompiledRequirements', 'compile_requirements']
+
+import collections.abc
+import functools
+import hashlib
+import json
+import logging
+import types
+
+import jsonschema
+
+from .constants import REL_TOL
+from .schema import RequirementsSchema
+from .wrapper import FontRecord, length_bounds
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_schema_validator():
+    """Get jsonschema validator instance for the requirements schema.
+
+    The schema is checked against its meta-schema only once, the validator
+    instance is shared by all the callers.
+    """
+
+    schema = RequirementsSchema().requirements_schema
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+def validate_requirements(requirements):
+    """Validate requirements against the requirements schema.
+
+    :raises jsonschema.exceptions.ValidationError: if requirements are not
+                                                   valid
+    """
+
+    error = jsonschema.exceptions.best_match(
+        get_schema_validator().iter_errors(requirements))
+    if error is not None:
+        raise error
+
+
+def _freeze(data):
+    if isinstance(data, dict):
+        return types.MappingProxyType(
+            {k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+
+def _thaw(data):
+    if isinstance(data, types.MappingProxyType):
+        return {k: _thaw(v) for k, v in data.items()}
+    if isinstance(data, tuple):
+        return [_thaw(v) for v in data]
+    return data
+
+
+def compile_bounds(requirements):
+    """Get bounds of Length values meeting paragraph or section attributes.
+
+    :param requirements: 'unit' and 'attributes' of paragraph or section
+                         requirements
+    :returns: read-only dict of (lower, upper) EMU bounds by attribute name,
+              see validocx.wrapper.length_bounds()
+    """
+
+    unit = requirements['unit']
+    return types.MappingProxyType({
+        attr: length_bounds(value, unit, REL_TOL)
+        for attr, value in requirements['attributes'].items()})
+
+
+def _with_bounds(requirements):
+    requirements = dict(requirements)
+    requirements['bounds'] = compile_bounds(requirements)
+    return types.MappingProxyType(requirements)
+
+
+class CompiledRequirements(collections.abc.Mapping):
+    """Document requirements prepared for validation of many documents.
+
+    Requirements are validated against the schema once and stored in
+    a read-only form, so the same instance can be safely shared by any
+    number of validations (and sent to worker processes).
+    """
+
+    __slots__ = ('_data', '_digest')
+
+    def __init__(self, requirements):
+        """
+        :param requirements: document requirements as a dict (see examples)
+        :raises jsonschema.exceptions.ValidationError: if requirements are
+                                                       not valid
+        """
+
+        logger.info("Start validating requirements schema.")
+        try:
+            validate_requirements(requirements)
+        except jsonschema.exceptions.ValidationError as e:
+            logger.exception(e)
+            raise
+        self._data = self._compile(requirements)
+        self._digest = None
+
+    @classmethod
+    def _from_valid(cls, requirements):
+        """Compile requirements that are known to be valid."""
+
+        compiled = cls.__new__(cls)
+        compiled._data = cls._compile(requirements)
+        compiled._digest = None
+        return compiled
+
+    @staticmethod
+    def _compile(requirements):
+        data = _freeze(requirements)
+        styles = {}
+        for name, style in data['styles'].items():
+            font = dict(style['font'])
+            # Font attributes are compared regardless of their order
+            font['attribute_set'] = frozenset(font['attributes'])
+            # Usual attributes (a size, a name and flags) are compared as
+            # a record with the size in EMUs, None otherwise
+            font['record'] = FontRecord.from_attributes(font['attributes'],
+                                                        font['unit'])
+            style = dict(style)
+            style['font'] = types.MappingProxyType(font)
+            # Lengths are compared in EMUs, as they are stored in documents
+            style['paragraph'] = _with_bounds(style['paragraph'])
+            styles[name] = types.MappingProxyType(style)
+        data = dict(data)
+        data['styles'] = types.MappingProxyType(styles)
+        if 'sections' in data:
+            data['sections'] = tuple(_with_bounds(section)
+                                     for section in data['sections'])
+        return types.MappingProxyType(data)
+
+    @property
+    def styles(self):
+        return self._data['styles']
+
+    @property
+    def sections(self):
+        return self._data['sections']
+
+    @property
+    def digest(self):
+        """Hex digest identifying the requirements.
+
+        Equal requirements have equal digests regardless of the order of
+        their keys, so the digest can be used in cache keys.
+        """
+
+        if self._digest is None:
+            self._digest = hashlib.sha1(json.dumps(
+                self.to_dict(), sort_keys=True).encode('utf-8')).hexdigest()
+        return self._digest
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __reduce__(self):
+        return self._from_valid, (self.to_dict(),)
+
+    def to_dict(self):
+        """Get requirements as plain (mutable) dict."""
+
+        data = _thaw(self._data)
+        for style in data['styles'].values():
+            del style['font']['attribute_set']
+            del style['font']['record']
+            del style['paragraph']['bounds']
+        for section in data.get('sections', ()):
+            del section['bounds']
+        return data
+
+    def __repr__(self):
+        return '{0}({1!r})'.format(type(self).__name__, self.to_dict())
+
+
+def compile_requirements(requirements):
+    """Get compiled requirements.
+
+    :param requirements: document requirements as a dict or
+                         already compiled requirements
+    :rtype: CompiledRequirements
+    """
+
+    if isinstance(requirements, CompiledRequirements):
+        return requirements
+    return CompiledRequirements(requirements)
@@ -0,0 +1,345 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['create_server']
+
+import argparse
+import concurrent.futures
+import http.server
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socketserver
+import sys
+import threading
+import urllib.parse
+
+from . import cli
+from . import utils
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8070
+DEFAULT_MAX_BODY_SIZE = 64 * 1024 * 1024
+
+_profiles = None
+
+
+def _init_worker(profiles):
+    global _profiles
+    _profiles = profiles
+
+
+class _PoolExecutor(object):
+    """Executor running tasks in a pool of worker processes.
+
+    ProcessPoolExecutor accepts a worker initializer only since Python 3.7,
+    so the pool is set up by multiprocessing.Pool instead.
+    """
+
+    def __init__(self, processes, initializer=None, initargs=()):
+        self._pool = multiprocessing.Pool(processes=processes,
+                                          initializer=initializer,
+                                          initargs=initargs)
+
+    def submit(self, fn, *args, **kwargs):
+        """Run a task in a worker.
+
+        :rtype: concurrent.futures.Future
+        """
+
+        future = concurrent.futures.Future()
+        future.set_running_or_notify_cancel()
+        self._pool.apply_async(fn, args, kwargs, callback=future.set_result,
+                               error_callback=future.set_exception)
+        return future
+
+    def shutdown(self, wait=True):
+        self._pool.close()
+        if wait:
+            self._pool.join()
+
+
+def _validate_request(profile, data, options):
+    """Validate docx bytes against requirements of a profile.
+
+    Runs in a worker, profiles are expected to be set up by
+    :func:`_init_worker`.
+
+    :returns: report as a dict of JSON compatible values
+    """
+
+    report = cli.validate(data, _profiles[profile],
+                          log_violations=False, **options)
+    return report.to_json()
+
+
+def load_profiles(requirements=(), requirements_dir=None):
+    """Load and compile requirements profiles.
+
+    :param requirements: profiles as a list of (name, file path) pairs
+    :param requirements_dir: directory with requirements files, each file
+                             is a profile named after the file
+    :returns: a dict of CompiledRequirements by profile name
+    """
+
+    sources = []
+    if requirements_dir:
+        for name in sorted(os.listdir(requirements_dir)):
+            profile, ext = os.path.splitext(name)
+            if ext in ('.yaml', '.yml', '.json'):
+                sources.append((profile,
+                                os.path.join(requirements_dir, name)))
+    sources.extend(requirements)
+    profiles = {}
+    for profile, file_path in sources:
+        logger.info("Loading profile '{0}' from '{1}'.".format(
+            profile, file_path))
+        profiles[profile] = cli.compile_requirements(
+            utils.read_from_file(file_path))
+    return profiles
+
+
+class ValidationRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Handler of the validation service requests.
+
+    GET /profiles lists names of available requirements profiles.
+    POST /validate?profile=NAME validates docx file sent as a request body
+    and responds with a JSON report. fail_fast and max_errors query
+    parameters limit validation as in validate().
+    """
+
+    server_version = 'validocx'
+
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == '/profiles':
+            self._send_json(200, {'profiles': sorted(self.server.profiles)})
+        elif path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_error(404, "Unknown path '{0}'".format(path))
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/validate':
+            self._send_error(404, "Unknown path '{0}'".format(url.path))
+            return
+        query = urllib.parse.parse_qs(url.query)
+        profile = query.get('profile', [None])[0]
+        if profile not in self.server.profiles:
+            self._send_error(404, "Unknown profile '{0}'".format(profile))
+            return
+        options = dict(self.server.options)
+        try:
+            if 'max_errors' in query:
+                options['max_errors'] = int(query['max_errors'][0])
+                if options['max_errors'] < 1:
+                    raise ValueError('Limit of errors must be positive')
+            if query.get('fail_fast', ['0'])[0] not in ('0', 'false'):
+                options['fail_fast'] = True
+            length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self._send_error(400, 'Invalid request parameters')
+            return
+        if length > self.server.max_body_size:
+            self._send_error(413, 'Document is too large')
+            return
+        data = self.rfile.read(length)
+
+        if not self.server.slots.acquire(blocking=False):
+            self._send_error(503, 'Too many pending validations')
+            return
+        try:
+            future = self.server.executor.submit(_validate_request, profile,
+                                                 data, options)
+            result = future.result()
+        except Exception as e:
+            logger.exception(e)
+            self._send_error(422, 'Failed to validate document: '
+                                  '{0}'.format(e))
+            return
+        finally:
+            self.server.slots.release()
+        result['profile'] = profile
+        self._send_json(200, result)
+
+    def _send_error(self, code, message):
+        self._send_json(code, {'error': message})
+
+    def _send_json(self, code, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Clients of a Unix socket server have no address
+        if isinstance(self.client_address, tuple):
+            return super(ValidationRequestHandler, self).address_string()
+        return 'unix-socket'
+
+    def log_message(self, format, *args):
+        logger.info("%s - %s", self.address_string(), format % args)
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn,
+                           http.server.HTTPServer):
+    daemon_threads = True
+
+
+class _ThreadingUnixHTTPServer(socketserver.ThreadingMixIn,
+                               socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(profiles, address=(DEFAULT_HOST, DEFAULT_PORT),
+                  unix_socket=None, jobs=None, queue_size=None,
+                  executor=None, options=None,
+                  max_body_size=DEFAULT_MAX_BODY_SIZE):
+    """Create validation service server.
+
+    Requests are handled in threads, while documents are validated in
+    a pool of worker processes with requirements compiled once.
+
+    :param profiles: a dict of requirements (or CompiledRequirements) by
+                     profile name
+    :param address: (host, port) pair to listen on
+    :param unix_socket: path to a Unix socket to listen on instead
+    :param jobs: number of worker processes (or workers of the executor).
+                 Defaults to the number of CPUs, to 1 with an executor
+    :param queue_size: max number of validations waiting for a worker,
+                       requests above the limit are rejected with 503.
+                       Defaults to the number of workers
+    :param executor: concurrent.futures executor to be used instead of
+                     a pool of worker processes (e.g. a thread pool)
+    :param options: validate() keyword arguments, e.g. engine
+    :param max_body_size: max size of a document in bytes
+    """
+
+    profiles = {name: cli.compile_requirements(requirements)
+                for name, requirements in profiles.items()}
+    if executor is None:
+        jobs = jobs or os.cpu_count() or 1
+        executor = _PoolExecutor(jobs, initializer=_init_worker,
+                                 initargs=(profiles,))
+    else:
+        jobs = jobs or 1
+        _init_worker(profiles)
+
+    if unix_socket:
+        server = _ThreadingUnixHTTPServer(unix_socket,
+                                          ValidationRequestHandler)
+    else:
+        server = _ThreadingHTTPServer(address, ValidationRequestHandler)
+    server.profiles = frozenset(profiles)
+    server.executor = executor
+    server.options = options or {}
+    server.max_body_size = max_body_size
+    server.slots = threading.BoundedSemaphore(
+        jobs + (jobs if queue_size is None else queue_size))
+    return server
+
+
+def _get_profile(value):
+    name, sep, file_path = value.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(
+            "Profile must be specified as NAME=FILE, got '{0}'".format(value))
+    return name, cli._get_file_path(file_path)
+
+
+def _get_directory(value):
+    if not os.path.isdir(value):
+        raise argparse.ArgumentTypeError(
+            "Directory '{0}' does not exist".format(value))
+    return value
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(
+        prog='validocx serve',
+        description='Long-running docx-file validation service. '
+                    'Documents are POSTed to /validate?profile=NAME, '
+                    'reports are returned in JSON.')
+    parser.set_defaults(command='serve')
+    parser.add_argument(
+        '-r', '--requirements',
+        action='append',
+        default=[],
+        type=_get_profile,
+        metavar='NAME=FILE',
+        help='Requirements profile: a name and a file with the '
+             'requirements. In YAML or JSON format. Can be repeated.'
+    )
+    parser.add_argument(
+        '--requirements-dir',
+        type=_get_directory,
+        help='Directory with requirements files, each file is a profile '
+             'named after the file (without extension).'
+    )
+    listen = parser.add_mutually_exclusive_group()
+    listen.add_argument(
+        '--port',
+        type=int,
+        default=DEFAULT_PORT,
+        help='Port to listen on. Defaults to {0}.'.format(DEFAULT_PORT)
+    )
+    listen.add_argument(
+        '--unix-socket',
+        help='Unix socket to listen on instead of a TCP port.'
+    )
+    parser.add_argument(
+        '--host',
+        default=DEFAULT_HOST,
+        help='Host to listen on. Defaults to {0}.'.format(DEFAULT_HOST)
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=cli._get_positive_int,
+        help='Number of worker processes. Defaults to the number of CPUs.'
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=cli._get_non_negative_int,
+        help='Max number of documents waiting for a worker, further '
+             'requests are rejected. Defaults to the number of workers.'
+    )
+    cli.add_engine_argument(parser)
+    cli.add_logging_arguments(parser)
+    return parser
+
+
+def run(arguments):
+    profiles = load_profiles(arguments['requirements'],
+                             arguments['requirements_dir'])
+    if not profiles:
+        logger.error('No requirements profiles specified.')
+        return 2
+    server = create_server(profiles,
+                           address=(arguments['host'], arguments['port']),
+                           unix_socket=arguments['unix_socket'],
+                           jobs=arguments['jobs'],
+                           queue_size=arguments['queue_size'],
+                           options={'engine': arguments['engine']})
+    logger.info("Serving profiles {0} on {1}.".format(
+        ', '.join(sorted(profiles)),
+        arguments['unix_socket'] or '{0}:{1}'.format(arguments['host'],
+                                                     arguments['port'])))
+    # Shut down gracefully on SIGTERM as well
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.executor.shutdown()
+        if arguments['unix_socket']:
+            os.unlink(arguments['unix_socket'])
@@ -0,0 +1,233 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['BufferReader', 'iter_archive_members', 'open_docx']
+
+import contextlib
+import errno
+import io
+import mmap
+import os
+import struct
+import tarfile
+import zipfile
+
+from .constants import ARCHIVE_EXTENSIONS, ARCHIVE_SEPARATOR
+
+# Local file header of a zip member, see zipfile.structFileHeader
+_ZIP_FILE_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+
+class BufferReader(io.RawIOBase):
+    """Read-only seekable file over a buffer.
+
+    Unlike io.BytesIO, the buffer (bytes, memoryview, mmap, etc.) is not
+    copied, only the requested slices are.
+    """
+
+    def __init__(self, buffer):
+        super(BufferReader, self).__init__()
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def getbuffer(self):
+        """Get a memoryview of the whole buffer."""
+
+        return self._view
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        elif whence != io.SEEK_SET:
+            raise ValueError('Invalid whence ({0})'.format(whence))
+        if offset < 0:
+            # Same as for files on disk, e.g. zipfile relies on it
+            raise OSError(errno.EINVAL, 'Invalid argument')
+        self._position = offset
+        return offset
+
+    def read(self, size=-1):
+        start = self._position
+        stop = len(self._view) if size is None or size < 0 else \
+            min(start + size, len(self._view))
+        if stop <= start:
+            return b''
+        self._position = stop
+        return self._view[start:stop].tobytes()
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super(BufferReader, self).close()
+
+
+def is_docx(path):
+    """Whether the path (or an archive member) is of a docx file.
+
+    Lock files created by MS Word, prefixed with '~$', are not.
+    """
+
+    return path.endswith('.docx') and \
+        not os.path.basename(path).startswith('~$')
+
+
+def is_archive(path):
+    """Whether the path looks like a bundle of documents."""
+
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _map_file(path):
+    """Memory-map a file, an empty file is read as is."""
+
+    with open(path, 'rb') as stream:
+        try:
+            return mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return stream.read()
+
+
+def _zip_member(data, name):
+    with zipfile.ZipFile(BufferReader(data)) as archive:
+        info = archive.getinfo(name)
+        if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            # Decompressed in memory
+            return archive.read(info)
+    header = _ZIP_FILE_HEADER.unpack_from(data, info.header_offset)
+    # Local header is followed by the file name and extra field, which may
+    # differ from the ones of the central directory
+    start = info.header_offset + _ZIP_FILE_HEADER.size + header[10] + \
+        header[11]
+    return memoryview(data)[start:start + info.compress_size]
+
+
+def _tar_member(data, name):
+    try:
+        with tarfile.open(fileobj=BufferReader(data), mode='r:') as archive:
+            info = archive.getmember(name)
+            if info.isfile() and not info.issparse():
+                return memoryview(data)[info.offset_data:
+                                        info.offset_data + info.size]
+    except tarfile.ReadError:
+        # Compressed archive, the member is decompressed in memory
+        with tarfile.open(fileobj=BufferReader(data), mode='r:*') as archive:
+            stream = archive.extractfile(name)
+            if stream is None:
+                raise KeyError("'{0}' is not a file".format(name))
+            return stream.read()
+    raise KeyError("'{0}' is not a file".format(name))
+
+
+def _is_zip(path):
+    # A tar bundle of documents would be taken for a zip archive by its
+    # trailing member, so the extension is checked first
+    if path.lower().endswith('.zip'):
+        return True
+    return not is_archive(path) and zipfile.is_zipfile(path)
+
+
+def _read_member(path, name):
+    data = _map_file(path)
+    if _is_zip(path):
+        return _zip_member(data, name)
+    return _tar_member(data, name)
+
+
+def iter_archive_members(path):
+    """Iterate over docx files in a zip or tar archive.
+
+    :returns: 'archive::member' paths of the files
+    """
+
+    if _is_zip(path):
+        with zipfile.ZipFile(path) as archive:
+            # ZipInfo.is_dir() is available only since Python 3.6
+            names = [info.filename for info in archive.infolist()
+                     if not info.filename.endswith('/')]
+    else:
+        with tarfile.open(path) as archive:
+            names = [info.name for info in archive if info.isfile()]
+    for name in names:
+        if is_docx(name):
+            yield '{0}{1}{2}'.format(path, ARCHIVE_SEPARATOR, name)
+
+
+def _split_member_path(path):
+    """Split 'archive::member' path, None is returned for other paths."""
+
+    archive, separator, member = path.partition(ARCHIVE_SEPARATOR)
+    if not separator or os.path.exists(path) or \
+            not os.path.isfile(archive):
+        return None
+    return archive, member
+
+
+def exists(path):
+    """Whether the docx path (possibly an archive member path) exists."""
+
+    if os.path.lexists(path):
+        return True
+    member_path = _split_member_path(path)
+    if member_path is None:
+        return False
+    archive, member = member_path
+    try:
+        if _is_zip(archive):
+            with zipfile.ZipFile(archive) as bundle:
+                bundle.getinfo(member)
+        else:
+            with tarfile.open(archive) as bundle:
+                bundle.getmember(member)
+    except (KeyError, zipfile.BadZipFile, tarfile.TarError):
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def open_docx(docx):
+    """Open a docx document without copying it.
+
+    :param docx: path to docx file (as a string), 'archive::member' path of
+                 a docx file inside a zip or tar archive, a buffer (bytes,
+                 memoryview, mmap, etc.) or a file-like object
+    :returns: a seekable file-like object. Local files and uncompressed
+              archive members are memory-mapped, compressed members are
+              decompressed in memory, file-like objects are used as is
+    """
+
+    if isinstance(docx, str):
+        member_path = _split_member_path(docx)
+        data = (_read_member(*member_path) if member_path is not None else
+                _map_file(docx))
+    elif isinstance(docx, (bytes, bytearray, memoryview, mmap.mmap)):
+        data = docx
+    else:
+        yield docx
+        return
+    # A mapping is closed once it is not referenced anymore
+    reader = BufferReader(data)
+    try:
+        yield reader
+    finally:
+        reader.close()
@@ -0,0 +1,163 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['StreamingDocumentWrapper']
+
+import posixpath
+import zipfile
+
+from docx.opc.coreprops import CoreProperties
+from docx.oxml import element_class_lookup, parse_xml
+from docx.oxml.ns import qn
+from docx.section import Section
+from docx.text.paragraph import Paragraph
+from lxml import etree
+
+from .wrapper import DocumentWrapper
+
+_RELATIONSHIPS_NS = ('http://schemas.openxmlformats.org/'
+                     'package/2006/relationships')
+_RT_OFFICE_DOCUMENT = ('http://schemas.openxmlformats.org/'
+                       'officeDocument/2006/relationships/officeDocument')
+_RT_STYLES = ('http://schemas.openxmlformats.org/'
+              'officeDocument/2006/relationships/styles')
+_RT_CORE_PROPERTIES = ('http://schemas.openxmlformats.org/'
+                       'package/2006/relationships/metadata/core-properties')
+
+_BODY = qn('w:body')
+_P = qn('w:p')
+_SECT_PR = qn('w:sectPr')
+
+
+def _rels_part_name(part_name):
+    directory, name = posixpath.split(part_name)
+    return posixpath.join(directory, '_rels', name + '.rels')
+
+
+def _read_relationships(package, part_name):
+    """Get internal relationships of a package part.
+
+    :param part_name: part name or '' for the package relationships
+    :returns: a list of (id, type, target part name) tuples
+    """
+
+    try:
+        rels = etree.fromstring(package.read(_rels_part_name(part_name)))
+    except KeyError:
+        return []
+    base = posixpath.dirname(part_name)
+    relationships = []
+    for rel in rels.iterfind('{%s}Relationship' % _RELATIONSHIPS_NS):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target.lstrip('/')
+        else:
+            target = posixpath.normpath(posixpath.join(base, target))
+        relationships.append((rel.get('Id'), rel.get('Type'), target))
+    return relationships
+
+
+def _targets_by_type(relationships):
+    """Get targets of relationships by type, the first one of each type."""
+
+    targets = {}
+    for _, reltype, target in relationships:
+        targets.setdefault(reltype, target)
+    return targets
+
+
+class StreamingDocumentWrapper(DocumentWrapper):
+    """Wrapper that streams a docx document instead of loading it.
+
+    The main document part is parsed incrementally straight from the
+    package, each top-level body element is released as soon as it has
+    been processed, so memory usage does not depend on document length.
+    Only the styles and core properties parts are kept in memory.
+
+    Paragraphs and sections yielded by the wrapper are valid only until
+    the next one is requested.
+    """
+
+    transient = True
+
+    def __init__(self, docx):
+        """
+        :param docx: path to docx file (as a string) or a file-like object
+        """
+        self._docx = docx
+        with zipfile.ZipFile(docx) as package:
+            package_rels = _targets_by_type(_read_relationships(package, ''))
+            self._document_part = package_rels.get(_RT_OFFICE_DOCUMENT,
+                                                   'word/document.xml')
+            self._document_rels = _read_relationships(package,
+                                                      self._document_part)
+            document_rels = _targets_by_type(self._document_rels)
+            styles_part = document_rels.get(_RT_STYLES)
+            core_part = package_rels.get(_RT_CORE_PROPERTIES)
+            self._styles_element = parse_xml(
+                package.read(styles_part) if styles_part else
+                b'<w:styles xmlns:w="http://schemas.openxmlformats.org/'
+                b'wordprocessingml/2006/main"/>')
+            core_properties = (CoreProperties(parse_xml(
+                package.read(core_part))) if core_part else None)
+        self._author = getattr(core_properties, 'author', None)
+        self._created = getattr(core_properties, 'created', None)
+        self._modified = getattr(core_properties, 'modified', None)
+        self._last_modified_by = getattr(core_properties,
+                                         'last_modified_by', None)
+
+    def _iter_body_elements(self):
+        """Iterate over top-level elements of the document body.
+
+        An element is cleared and detached from the tree once the consumer
+        asks for the next one.
+        """
+
+        with zipfile.ZipFile(self._docx) as package:
+            with package.open(self._document_part) as stream:
+                context = etree.iterparse(stream, events=('end',),
+                                          remove_blank_text=True,
+                                          resolve_entities=False,
+                                          huge_tree=True)
+                context.set_element_class_lookup(element_class_lookup)
+                for _, element in context:
+                    body = element.getparent()
+                    if body is None or body.tag != _BODY:
+                        continue
+                    yield element
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del body[0]
+
+    def _read_related_part(self, rel_id=None, reltype=None):
+        for rel in self._document_rels:
+            if (rel[0] == rel_id if rel_id is not None else
+                    rel[1] == reltype):
+                break
+        else:
+            return None
+        with zipfile.ZipFile(self._docx) as package:
+            try:
+                return rel[2], parse_xml(package.read(rel[2]))
+            except KeyError:
+                return None
+
+    def _create_paragraph(self, element):
+        return Paragraph(element, None)
+
+    def iter_sections(self):
+        """Iterate over sections in docx document."""
+
+        for element in self._iter_body_elements():
+            if element.tag == _P:
+                pPr = element.pPr
+                sectPr = pPr.sectPr if pPr is not None else None
+            elif element.tag == _SECT_PR:
+                sectPr = element
+            else:
+                continue
+            if sectPr is not None:
+                yield Section(sectPr, None)
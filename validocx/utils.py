@@ -2,14 +2,42 @@
 #    Copyright 2017 Vitalii Kulanov
 #
 
-import os
-import yaml
+import copyreg
+import functools
 import json
+import logging
+import os
+import pickle
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIX = '.pickle'
+
+# Bumped whenever the sidecar layout changes
+_SIDECAR_VERSION = 1
+
+# Parsed files by absolute path: ((mtime, size), pickled data)
+_file_cache = {}
+
+
+def _yaml():
+    # PyYAML is imported on demand to keep the CLI startup fast
+    import yaml
+    return yaml
+
+
+def _yaml_safe_load(stream):
+    yaml = _yaml()
+    # libyaml based loader is an order of magnitude faster
+    return yaml.load(stream, Loader=getattr(yaml, 'CSafeLoader',
+                                            yaml.SafeLoader))
 
 
 def safe_load(data_format, stream):
     loaders = {'json': json.load,
-               'yaml': yaml.safe_load}
+               'yaml': _yaml_safe_load,
+               'yml': _yaml_safe_load}
 
     if data_format not in loaders:
         raise ValueError('Unsupported data format. Only {} data formats '
@@ -22,9 +50,10 @@ def safe_load(data_format, stream):
 def safe_dump(data_format, stream, data):
     dumpers = {
         'json': lambda d, s: json.dump(data, stream, indent=4),
-        'yaml': lambda d, s: yaml.safe_dump(data, stream,
-                                            default_flow_style=False)
+        'yaml': lambda d, s: _yaml().safe_dump(data, stream,
+                                               default_flow_style=False)
     }
+    dumpers['yml'] = dumpers['yaml']
 
     if data_format not in dumpers:
         raise ValueError('Unsupported data format. Only {} data formats '
@@ -34,13 +63,143 @@ def safe_dump(data_format, stream, data):
     dumper(data, stream)
 
 
-def read_from_file(file_path):
+def _read_sidecar(sidecar_path, signature):
+    try:
+        with open(sidecar_path, 'rb') as stream:
+            version, sidecar_signature, blob = pickle.load(stream)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Sidecar '{0}' is ignored: {1}".format(
+            sidecar_path, e))
+        return None
+    if version != _SIDECAR_VERSION or sidecar_signature != signature:
+        return None
+    return blob
+
+
+def _write_sidecar(sidecar_path, signature, blob):
+    try:
+        write_atomically(sidecar_path, functools.partial(
+            pickle.dump, (_SIDECAR_VERSION, signature, blob),
+            protocol=pickle.HIGHEST_PROTOCOL))
+    except OSError as e:
+        logger.debug("Sidecar '{0}' is not written: {1}".format(
+            sidecar_path, e))
+
+
+def read_from_file(file_path, sidecar=False):
+    """Read data (e.g. requirements) from a JSON or YAML file.
+
+    Parsed data is cached for the lifetime of the process and keyed by the
+    file path, modification time and size, so re-reading an unchanged file
+    costs a stat() call. Every call returns a new copy of the data.
+
+    :param sidecar: whether parsed data has to be stored next to the file,
+                    in '<file_path>.pickle', to be loaded by other
+                    processes instead of parsing the file. The sidecar is
+                    a pickle, it must be trusted as much as the code
+    """
+
     data_format = os.path.splitext(file_path)[1].lstrip('.')
-    with open(file_path, 'r') as stream:
-        return safe_load(data_format, stream)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        stat = None
+    if stat is None:
+        # Let open() report the error
+        with open(file_path, 'r') as stream:
+            return safe_load(data_format, stream)
+
+    path = os.path.abspath(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return pickle.loads(cached[1])
+
+    sidecar_path = file_path + SIDECAR_SUFFIX
+    blob = _read_sidecar(sidecar_path, signature) if sidecar else None
+    if blob is None:
+        with open(file_path, 'r') as stream:
+            data = safe_load(data_format, stream)
+        blob = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        if sidecar:
+            _write_sidecar(sidecar_path, signature, blob)
+    else:
+        data = pickle.loads(blob)
+    _file_cache[path] = (signature, blob)
+    return data
+
+
+def clear_file_cache():
+    """Drop data cached by read_from_file()."""
+
+    _file_cache.clear()
 
 
 def write_to_file(file_path, data):
     data_format = os.path.splitext(file_path)[1].lstrip('.')
     with open(file_path, 'w') as stream:
         safe_dump(data_format, stream, data)
+
+
+@functools.lru_cache(maxsize=None)
+def get_enum_value_class():
+    """Get class of python-docx enumeration values lacking pickle support.
+
+    :returns: None for python-docx 1.0+, its enumerations are regular
+              picklable enums
+    """
+
+    try:
+        from docx.enum.base import EnumValue
+    except ImportError:  # pragma: no cover
+        return None
+    return EnumValue
+
+
+def reduce_enum_value(value):
+    """Reduce a python-docx enumeration value, see get_enum_value_class()."""
+
+    return get_enum_value_class(), (value._member_name, int(value),
+                                    value._docstring)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_pickler_class():
+    enum_value_class = get_enum_value_class()
+    if enum_value_class is None:  # pragma: no cover
+        return pickle.Pickler
+
+    class Pickler(pickle.Pickler):
+        dispatch_table = copyreg.dispatch_table.copy()
+        dispatch_table[enum_value_class] = reduce_enum_value
+
+    return Pickler
+
+
+def dump_pickle(data, stream):
+    """Pickle data (e.g. violations) to a binary stream.
+
+    python-docx enumeration values are int subclasses without pickle
+    support, they are pickled with their names and descriptions.
+    """
+
+    _get_pickler_class()(stream, pickle.HIGHEST_PROTOCOL).dump(data)
+
+
+def write_atomically(file_path, write):
+    """Write a file atomically, so readers never see it partially written.
+
+    :param write: callable writing data to a binary stream passed to it
+    """
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as stream:
+            write(stream)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -2,129 +2,568 @@
 #    Copyright 2017 Vitalii Kulanov
 #
 
-__all__ = ['Validator', 'validate']
+__all__ = ['CacheInfo', 'ENGINES', 'Validator', 'validate']
 
-import jsonschema
+import collections
 import logging
 import math
 
 from docx import Document
+from docx.shared import Length
 
-from .wrapper import DocumentWrapper
-from .schema import RequirementsSchema
+from .cache import ResultCache
+from .constants import ENGINES, REL_TOL, SCOPES
+from .incremental import IncrementalCache
+from .profiling import NULL_PROFILER
+from .report import ERROR, WARNING, LoggingSink, ValidationReport
+from .report import Violation
+from .requirements import compile_bounds, compile_requirements
+from .sources import open_docx
+from .streaming import StreamingDocumentWrapper
+from .wrapper import DocumentWrapper, FontRecord, convert_unit
 
 logger = logging.getLogger(__name__)
 
+CacheInfo = collections.namedtuple('CacheInfo',
+                                   ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _get_bounds(requirements):
+    """Get EMU bounds of paragraph or section requirements."""
+
+    bounds = requirements.get('bounds')
+    # Requirements passed to validate_*() methods may be not compiled
+    return bounds if bounds is not None else compile_bounds(requirements)
+
+
+def _is_close(fetched, value, bounds):
+    """Whether a fetched attribute value is close to a required one.
+
+    Lengths are compared in EMUs (integers) with precompiled bounds, other
+    values (e.g. enumerations, line spacing multiples) as they are.
+    """
+
+    if isinstance(fetched, Length):
+        return bounds[0] <= fetched <= bounds[1]
+    return math.isclose(fetched, value, rel_tol=REL_TOL)
+
+
+class _VerdictCache(object):
+    """Bounded LRU cache of verdicts keyed by formatting signatures."""
+
+    def __init__(self, maxsize):
+        self._verdicts = collections.OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, signature, check, *args):
+        """Get a verdict, calling check(*args) if it is not cached yet."""
+
+        try:
+            verdict = self._verdicts[signature]
+        except KeyError:
+            self._misses += 1
+            verdict = self._verdicts[signature] = check(*args)
+            if len(self._verdicts) > self._maxsize:
+                self._verdicts.popitem(last=False)
+        else:
+            self._hits += 1
+            self._verdicts.move_to_end(signature)
+        return verdict
+
+    def __contains__(self, signature):
+        return signature in self._verdicts
+
+    def put(self, signature, verdict):
+        """Store a verdict found in advance, it counts as a miss."""
+
+        self._misses += 1
+        self._verdicts[signature] = verdict
+        if len(self._verdicts) > self._maxsize:
+            self._verdicts.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self._hits, self._misses, self._maxsize,
+                         len(self._verdicts))
+
 
 class Validator(object):
     """Class for validating docx document."""
 
-    schema = RequirementsSchema()
+    #: Methods of the document wrapper and of the validator itself
+    #: instrumented when validation is profiled
+    profiled_wrapper_methods = ('get_style_name', 'get_effective_style',
+                                'get_run_font_attributes',
+                                'get_paragraph_attributes',
+                                'get_section_attributes',
+                                'get_run_signature',
+                                'get_paragraph_signature')
+    profiled_methods = ('_check_run', '_check_paragraph')
 
-    def __init__(self, document):
+    def __init__(self, document, cache_size=1024, log_violations=True,
+                 profiler=None, incremental=None):
         """
-        :param document: docx.Document
+        :param document: docx.Document or an instance of DocumentWrapper
+                         (or its subclass)
+        :param cache_size: max number of distinct paragraph and run
+                           formattings, whose verdicts are memoized while
+                           validating styles
+        :param log_violations: whether violations have to be logged as they
+                               are found
+        :param profiler: validocx.profiling.Profiler collecting statistics
+                         of validation phases and hot methods
+        :param incremental: validocx.incremental.IncrementalCache with
+                            violations of unchanged paragraphs, which are
+                            reused by validate() and iter_violations()
         """
-        self._docx = DocumentWrapper(document)
+        if isinstance(document, DocumentWrapper):
+            self._docx = document
+        else:
+            self._docx = DocumentWrapper(document)
+        self._cache_size = cache_size
+        self._paragraph_cache = _VerdictCache(cache_size)
+        self._font_cache = _VerdictCache(cache_size)
+        self._sinks = (LoggingSink(logger),) if log_violations else ()
+        self._profiler = profiler or NULL_PROFILER
+        self._incremental = incremental
+
+    def create_report(self, sinks=(), keep=True):
+        """Create an empty report passing violations to the validator sinks.
+
+        :param sinks: additional sinks of the report
+        :param keep: whether violations have to be stored in the report
+        """
+
+        return ValidationReport(sinks=self._sinks + tuple(sinks), keep=keep)
+
+    def cache_info(self):
+        """Report statistics of verdict caches of the last styles validation.
+
+        :returns: a dict with CacheInfo for 'paragraph' and 'font' keys
+        """
+
+        return {'paragraph': self._paragraph_cache.info(),
+                'font': self._font_cache.info()}
 
-    def validate_sections(self, section_requirements):
-        """Validate sections of a document."""
+    def validate_sections(self, section_requirements, report=None):
+        """Validate sections of a document.
 
+        :param report: report to add violations to. None value implies a
+                       new report created with create_report()
+        :rtype: ValidationReport
+        """
+
+        return self._collect(
+            self._iter_section_violations(section_requirements), report)
+
+    def _iter_section_violations(self, section_requirements):
         for i, section in enumerate(self._docx.iter_sections()):
             if i < len(section_requirements):
-                unit = section_requirements[i]['unit']
-                fetched_attr = self._docx.get_section_attributes(section,
-                                                                 unit=unit)
-                for attr, v in section_requirements[i]['attributes'].items():
-                    if not math.isclose(fetched_attr[attr], v, rel_tol=1e-02):
-                        msg = ("'Section {0}': attribute '{1}' with value {2} "
-                               "does not match required value "
-                               "{3}".format(i, attr, fetched_attr[attr], v))
-                        logger.error(msg)
+                requirements = section_requirements[i]
+                unit = requirements['unit']
+                attributes = requirements['attributes']
+                bounds = _get_bounds(requirements)
+                fetched_attr = self._docx.get_section_attributes(
+                    section, unit=None, attributes=tuple(attributes))
+                for attr, v in attributes.items():
+                    fetched = getattr(fetched_attr, attr)
+                    if not _is_close(fetched, v, bounds[attr]):
+                        yield Violation(
+                            'section-attribute', ERROR, ('section', i),
+                            attribute=attr,
+                            actual=convert_unit(fetched, unit), expected=v)
             else:
-                logger.warning("The requirements for 'Section {0}' "
-                               "are not specified.".format(i))
-
-    def validate_styles(self, style_requirements):
-        """Validate styles of a document, i.e. font and paragraph."""
-
-        for paragraph in self._docx.iter_paragraphs():
-            if paragraph.style.name in style_requirements:
-                self.validate_paragraph(
-                    paragraph,
-                    style_requirements[paragraph.style.name]['paragraph']
-                )
-                self.validate_font(
-                    paragraph,
-                    style_requirements[paragraph.style.name]['font'])
+                yield Violation('section-undefined', WARNING, ('section', i))
+
+    def validate_styles(self, style_requirements, report=None):
+        """Validate styles of a document, i.e. font and paragraph.
+
+        Paragraphs (and runs) having the same style and direct formatting
+        are checked once, only messages are built for each of them.
+
+        :param report: report to add violations to. None value implies a
+                       new report created with create_report()
+        :rtype: ValidationReport
+        """
+
+        return self._collect(
+            self._iter_style_violations(style_requirements), report)
+
+    def _iter_style_violations(self, style_requirements, style_ids=None,
+                               paragraphs=None):
+        self._paragraph_cache = _VerdictCache(self._cache_size)
+        self._font_cache = _VerdictCache(self._cache_size)
+        incremental = self._incremental
+        if incremental is not None and not incremental.bound:
+            incremental = None
+        start, stop = paragraphs or (0, None)
+        for i, context, paragraph in self._docx.walk(style_ids, start or 0,
+                                                     stop):
+            if incremental is None:
+                yield from self._iter_paragraph_style_violations(
+                    paragraph, i, style_requirements, context)
+                continue
+            key = incremental.get_key(paragraph)
+            violations = incremental.get(key)
+            if violations is None:
+                violations = tuple(self._iter_paragraph_style_violations(
+                    paragraph, i, style_requirements, context))
+                incremental.put(key, violations)
+                yield from violations
             else:
-                msg = "Undefined style: '{0}'."
-                logger.warning(msg.format(paragraph.style.name))
+                for violation in violations:
+                    location = violation.location
+                    if location[1] != i or violation.context != context:
+                        # The paragraph has moved since it was cached
+                        violation = violation.replace(
+                            location=location[:1] + (i,) + location[2:],
+                            context=context)
+                    yield violation
+
+    def _iter_paragraph_style_violations(self, paragraph, index,
+                                         style_requirements, context=()):
+        style_name = self._docx.get_style_name(paragraph)
+        if style_name in style_requirements:
+            yield from self._iter_paragraph_violations(
+                paragraph, index,
+                style_requirements[style_name]['paragraph'],
+                self._paragraph_cache, context
+            )
+            yield from self._iter_font_violations(
+                paragraph, index,
+                style_requirements[style_name]['font'],
+                self._font_cache, context)
+        else:
+            yield Violation('style-undefined', WARNING, ('paragraph', index),
+                            style=style_name, context=context)
+
+    def validate_font(self, paragraph, font_requirements, report=None):
+        """Validate font in a specified paragraph.
+
+        :rtype: ValidationReport
+        """
 
-    def validate_font(self, paragraph, font_requirements):
-        """Validate font in a specified paragraph."""
+        return self._collect(self._iter_font_violations(
+            paragraph, None, font_requirements), report)
 
+    def _iter_font_violations(self, paragraph, index, font_requirements,
+                              cache=None, context=()):
         unit = font_requirements['unit']
         requirements = font_requirements['attributes']
-        fetched_attr = self._docx.get_font_attributes(paragraph, unit=unit)
-        for i, attr in enumerate(fetched_attr):
-            if set(attr) ^ set(requirements):
-                msg = ("Font attributes ({0}) mismatch required ({1}) in "
-                       "paragraph with style '{2}':\n'{3}'".format(
-                        ', '.join(str(a) for a in attr),
-                        ', '.join(str(r) for r in requirements),
-                        paragraph.style.name, paragraph.runs[i].text))
-                logger.error(msg)
-
-    def validate_paragraph(self, paragraph, paragraph_requirements):
-        """Validate paragraph."""
-
-        unit = paragraph_requirements['unit']
-        fetched_attr = self._docx.get_paragraph_attributes(paragraph,
-                                                           unit=unit)
-        for attr, value in paragraph_requirements['attributes'].items():
-            if fetched_attr[attr] is not None:
-                if not math.isclose(fetched_attr[attr], value, rel_tol=1e-02):
-                    msg = ("The attribute of paragraph '{0}' ({1}) with value "
-                           "{2} does not match required value {3}: "
-                           "\n'{4}'".format(attr, paragraph.style.name,
-                                            fetched_attr[attr], value,
-                                            paragraph.text))
-                    logger.error(msg)
+        required = font_requirements.get('record')
+        if required is None and 'attribute_set' not in font_requirements:
+            required = FontRecord.from_attributes(requirements, unit)
+        if required is None:
+            required = (font_requirements.get('attribute_set') or
+                        frozenset(requirements))
+        for j, run in enumerate(paragraph.runs):
+            if cache is None:
+                attr = self._check_run(paragraph, run, unit, required)
             else:
-                logger.error("The attribute of paragraph '{0}' is not "
-                             "defined. The required value is {1}: "
-                             "\n'{2}'".format(attr, value, paragraph.text))
+                attr = cache.get(self._docx.get_run_signature(paragraph, run),
+                                 self._check_run, paragraph, run, unit,
+                                 required)
+            if attr is not None:
+                yield Violation(
+                    'font', ERROR, ('paragraph', index, 'run', j),
+                    style=self._docx.get_style_name(paragraph), actual=attr,
+                    expected=requirements, text=run.text, context=context)
 
-    def validate(self, document_requirements):
-        """Validate the whole document."""
+    def _check_run(self, paragraph, run, unit, required):
+        """Get font attributes of a run if they mismatch required ones.
+
+        :param required: FontRecord with the size in EMUs or a set of
+                         attributes
+        """
 
-        self._validate_schema(document_requirements,
-                              self.schema.requirements_schema)
-        logger.info("Start validating sections.")
-        self.validate_sections(document_requirements['sections'])
-        logger.info("Start validating styles.")
-        self.validate_styles(document_requirements['styles'])
-        logger.info("Validation process completed.")
+        if isinstance(required, FontRecord):
+            record = self._docx.get_run_font_attributes(paragraph, run,
+                                                        unit=None)
+            if record == required:
+                return None
+            attr = list(record)
+            attr[0] = convert_unit(attr[0], unit)
+            return attr
+        record = self._docx.get_run_font_attributes(paragraph, run,
+                                                    unit=unit)
+        return list(record) if set(record) ^ required else None
+
+    def validate_paragraph(self, paragraph, paragraph_requirements,
+                           report=None):
+        """Validate paragraph.
+
+        :rtype: ValidationReport
+        """
+
+        return self._collect(self._iter_paragraph_violations(
+            paragraph, None, paragraph_requirements), report)
+
+    def _iter_paragraph_violations(self, paragraph, index,
+                                   paragraph_requirements, cache=None,
+                                   context=()):
+        if cache is None:
+            mismatches = self._check_paragraph(paragraph,
+                                               paragraph_requirements)
+        else:
+            mismatches = cache.get(
+                self._docx.get_paragraph_signature(paragraph),
+                self._check_paragraph, paragraph, paragraph_requirements)
+        if mismatches:
+            yield from self._iter_mismatch_violations(
+                paragraph, index, mismatches,
+                self._docx.get_style_name(paragraph), context)
 
     @staticmethod
-    def _validate_schema(requirements, schema):
-        """Validate requirements schema."""
+    def _iter_mismatch_violations(paragraph, index, mismatches, style_name,
+                                  context=()):
+        """Build violations of mismatches found by _check_paragraph()."""
+
+        text = paragraph.text
+        for attr, fetched, value in mismatches:
+            kind = ('paragraph-attribute' if fetched is not None else
+                    'paragraph-undefined-attribute')
+            yield Violation(kind, ERROR, ('paragraph', index),
+                            style=style_name, attribute=attr, actual=fetched,
+                            expected=value, text=text, context=context)
+
+    def _check_paragraph(self, paragraph, paragraph_requirements):
+        """Get paragraph attributes mismatching required ones.
+
+        :returns: a tuple of (attribute, fetched value, required value)
+                  tuples, fetched value is None for undefined attributes
+        """
+
+        unit = paragraph_requirements['unit']
+        attributes = paragraph_requirements['attributes']
+        bounds = _get_bounds(paragraph_requirements)
+        fetched_attr = self._docx.get_paragraph_attributes(
+            paragraph, unit=None, attributes=tuple(attributes))
+        mismatches = []
+        for attr, value in attributes.items():
+            fetched = getattr(fetched_attr, attr)
+            if fetched is None or not _is_close(fetched, value,
+                                                bounds[attr]):
+                # Units are converted for messages only
+                mismatches.append((attr, convert_unit(fetched, unit),
+                                   value))
+        return tuple(mismatches)
+
+    def _collect(self, violations, report=None):
+        if report is None:
+            report = self.create_report()
+        for violation in violations:
+            report.add(violation)
+        return report
+
+    def iter_violations(self, document_requirements, only=None, styles=None,
+                        paragraphs=None):
+        """Iterate over violations of the whole document.
 
-        logger.info("Start validating requirements schema.")
+        Violations are found lazily, i.e. the document is traversed only as
+        far as the consumer goes. Violations are not passed to the validator
+        sinks.
+
+        :param document_requirements: document requirements as a dict or
+                                      CompiledRequirements
+        :param only: validate only 'sections' or 'styles' of a document.
+                     None value implies both
+        :param styles: names or ids of styles, only paragraphs of which are
+                       validated. None value implies all styles
+        :param paragraphs: range of indices of paragraphs to be validated
+                           as a (start, stop) pair, either can be None
+        """
+
+        if only not in (None,) + SCOPES:
+            raise ValueError("Unsupported scope '{0}'. Only {1} scopes are "
+                             "allowed".format(only, ', '.join(SCOPES)))
+        profiler = self._profiler
+        with profiler.phase('requirements'):
+            document_requirements = compile_requirements(
+                document_requirements)
+        if self._incremental is not None:
+            self._incremental.bind(self._docx.get_styles_digest(),
+                                   document_requirements.digest)
+        style_ids = (self._docx.resolve_style_ids(styles)
+                     if styles is not None else None)
+        profiler.instrument(self._docx, self.profiled_wrapper_methods)
+        profiler.instrument(self, self.profiled_methods)
         try:
-            jsonschema.validate(requirements, schema)
-        except jsonschema.exceptions.ValidationError as e:
-            logger.exception(e)
-            raise
+            if only != 'styles':
+                logger.info("Start validating sections.")
+                yield from profiler.iter_phase(
+                    'sections', self._iter_section_violations(
+                        document_requirements.sections))
+            if only != 'sections':
+                logger.info("Start validating styles.")
+                yield from profiler.iter_phase(
+                    'styles', self._iter_style_violations(
+                        document_requirements.styles, style_ids,
+                        paragraphs))
+            logger.info("Validation process completed.")
+        finally:
+            profiler.restore()
 
+    def validate(self, document_requirements, sinks=(), fail_fast=False,
+                 max_errors=None, keep=True, **scope):
+        """Validate the whole document.
 
-def validate(docx, requirements):
+        :param document_requirements: document requirements as a dict or
+                                      CompiledRequirements. Use the latter
+                                      to validate many documents against
+                                      the same requirements
+        :param sinks: additional callables each violation is passed to
+                      as soon as it is found
+        :param fail_fast: stop validation on the first error
+        :param max_errors: stop validation once the specified number of
+                           errors is found. None value implies no limit
+        :param keep: whether violations have to be stored in the report.
+                     Use False with sinks to stream violations of large
+                     documents
+        :param scope: only, styles and paragraphs arguments limiting what
+                      is validated, see iter_violations()
+        :raises ValueError: if max_errors is less than 1
+        :rtype: ValidationReport
+        """
+
+        _check_max_errors(max_errors)
+        report = self.create_report(sinks, keep=keep)
+        limit = 1 if fail_fast else max_errors
+        violations = self.iter_violations(document_requirements, **scope)
+        try:
+            for violation in violations:
+                report.add(violation)
+                if limit is not None and report.errors >= limit:
+                    report.truncated = True
+                    logger.info("Validation stopped after {0} "
+                                "error(s).".format(report.errors))
+                    break
+        finally:
+            violations.close()
+        report.profile = self._profiler.finish()
+        return report
+
+
+def _check_max_errors(max_errors):
+    if max_errors is not None and max_errors < 1:
+        raise ValueError("Limit of errors must be a positive number, got "
+                         "{0}".format(max_errors))
+
+
+def validate(docx, requirements, engine='docx', log_violations=True,
+             fail_fast=False, max_errors=None, profiler=None,
+             incremental=None, cache=None, jobs=None, vectorized=False,
+             sinks=(), keep=True, **scope):
     """Validates docx document.
 
-    :param docx: path to docx file (as a string) or a file-like object
+    :param docx: path to docx file (as a string), 'archive::member' path of
+                 a docx file inside a zip or tar archive, a buffer (bytes,
+                 memoryview, mmap) or a file-like object. Files and buffers
+                 are not copied, see validocx.sources.open_docx()
     :param requirements: document requirements as a dict (see examples)
+                         or CompiledRequirements
+    :param engine: engine used to read the document, one of ENGINES
+    :param log_violations: whether violations have to be logged
+    :param fail_fast: stop validation on the first error
+    :param max_errors: stop validation once the specified number of errors
+                       is found. None value implies no limit
+    :param profiler: validocx.profiling.Profiler, statistics it collects
+                     are stored in the profile attribute of the report
+    :param incremental: path to a cache file or an IncrementalCache to reuse
+                        violations of paragraphs unchanged since a previous
+                        validation. A cache having a file is saved back
+    :param cache: cache directory or a ResultCache storing reports of
+                  validated documents. A document validated against the
+                  same requirements already is not opened, the stored
+                  report is returned. Not used when profiling
+    :param jobs: number of worker processes paragraphs of the document are
+                 validated in, see validocx.parallel.ParallelValidator.
+                 None value or 1 implies validation in the calling process.
+                 Cannot be combined with incremental or vectorized
+                 validation
+    :param vectorized: whether numeric attributes are compared as NumPy
+                       arrays, see validocx.vectorized.VectorizedValidator.
+                       Requires NumPy
+    :param sinks: callables each violation is passed to as soon as it is
+                  found, e.g. validocx.formatters writers. Violations of
+                  a cached report are passed to them as well
+    :param keep: whether violations have to be stored in the report. Use
+                 False with sinks to stream violations of large documents.
+                 Reports stored in the cache always keep their violations
+    :param scope: only, styles and paragraphs arguments limiting what is
+                  validated, see Validator.iter_violations()
+    :rtype: ValidationReport
     """
-    document = Document(docx)
-    validator = Validator(document)
-    validator.validate(requirements)
+    if engine not in ENGINES:
+        raise ValueError("Unsupported engine '{0}'. Only {1} engines are "
+                         "allowed".format(engine, ', '.join(ENGINES)))
+    if jobs is not None and jobs > 1 and incremental is not None:
+        raise ValueError("Incremental validation cannot be run in several "
+                         "processes")
+    if jobs is not None and jobs > 1 and vectorized:
+        raise ValueError("Vectorized validation cannot be run in several "
+                         "processes")
+    _check_max_errors(max_errors)
+    if fail_fast:
+        max_errors = 1
+    with open_docx(docx) as stream:
+        return _validate(stream, requirements, engine, log_violations,
+                         max_errors, profiler, incremental, cache, jobs,
+                         vectorized, sinks, keep, scope)
+
+
+def _validate(stream, requirements, engine, log_violations, max_errors,
+              profiler, incremental, cache, jobs, vectorized, sinks, keep,
+              scope):
+    if cache is not None and profiler is None:
+        if not isinstance(cache, ResultCache):
+            cache = ResultCache(cache)
+        requirements = compile_requirements(requirements)
+        key = cache.get_key(stream, requirements,
+                            dict(scope, max_errors=max_errors))
+        report = cache.get(key)
+        if report is not None:
+            logger.info("Report is taken from the cache.")
+            sinks = ((LoggingSink(logger),) if log_violations else
+                     ()) + tuple(sinks)
+            for violation in report:
+                for sink in sinks:
+                    sink(violation)
+            return report
+        report = _validate(stream, requirements, engine, log_violations,
+                           max_errors, None, incremental, None, jobs,
+                           vectorized, sinks, True, scope)
+        cache.put(key, report)
+        return report
+    with (profiler or NULL_PROFILER).phase('load'):
+        if engine == 'docx':
+            document = Document(stream)
+        else:
+            document = StreamingDocumentWrapper(stream)
+    if incremental is not None and \
+            not isinstance(incremental, IncrementalCache):
+        incremental = IncrementalCache(incremental)
+    if jobs is not None and jobs > 1:
+        # Imported here, parallel module depends on this one
+        from .parallel import ParallelValidator
+        validator = ParallelValidator(document, jobs=jobs,
+                                      log_violations=log_violations,
+                                      profiler=profiler)
+    elif vectorized:
+        # Imported here, NumPy is an optional dependency
+        from .vectorized import VectorizedValidator
+        validator = VectorizedValidator(document,
+                                        log_violations=log_violations,
+                                        profiler=profiler,
+                                        incremental=incremental)
+    else:
+        validator = Validator(document, log_violations=log_violations,
+                              profiler=profiler, incremental=incremental)
+    report = validator.validate(requirements, sinks=sinks,
+                                max_errors=max_errors, keep=keep, **scope)
+    if incremental is not None:
+        logger.info("Incremental validation: {0} paragraph(s) reused, {1} "
+                    "checked.".format(incremental.hits, incremental.misses))
+        if incremental.path is not None:
+            incremental.save()
+    return report
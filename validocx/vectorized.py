@@ -0,0 +1,210 @@
+#
+#    Copyright 2018 Vitalii Kulanov
+#
+
+__all__ = ['VectorizedValidator']
+
+import copy
+
+from docx.shared import Length
+from docx.text.paragraph import Paragraph
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+from .constants import REL_TOL
+from .report import ERROR, WARNING, Violation
+from .validator import Validator, _VerdictCache, _get_bounds
+from .wrapper import convert_unit
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _to_array(values):
+    """Convert attribute values to a float array, None values are NaN."""
+
+    return numpy.array([numpy.nan if v is None else v for v in values],
+                       dtype=float)
+
+
+def isclose(fetched, expected):
+    """Element-wise math.isclose(fetched, expected, rel_tol=REL_TOL).
+
+    Unlike numpy.isclose(), the tolerance is symmetric in its arguments and
+    there is no absolute tolerance. NaN (undefined) values are never close.
+    """
+
+    with numpy.errstate(invalid='ignore'):
+        return (fetched == expected) | (
+            numpy.abs(fetched - expected) <=
+            REL_TOL * numpy.maximum(numpy.abs(fetched), numpy.abs(expected)))
+
+
+def _check(fetched, expected, bounds):
+    """Element-wise validocx.validator._is_close() of fetched values.
+
+    :param fetched: rows of fetched values, a value per column
+    :param expected: required values of the columns
+    :param bounds: (lower, upper) EMU bounds of the columns
+    :returns: boolean matrix, True for close values
+    """
+
+    shape = (len(fetched), len(expected))
+    flat = [v for row in fetched for v in row]
+    lengths = numpy.array([isinstance(v, Length) for v in flat],
+                          dtype=bool).reshape(shape)
+    values = _to_array(flat).reshape(shape)
+    lower, upper = numpy.array(bounds, dtype=float).reshape(-1, 2).T
+    with numpy.errstate(invalid='ignore'):
+        within = (values >= lower) & (values <= upper)
+    return numpy.where(lengths, within, isclose(values, _to_array(expected)))
+
+
+class VectorizedValidator(Validator):
+    """Validator comparing numeric attributes as NumPy arrays.
+
+    Attributes of all the sections are compared at once. Paragraphs are
+    walked in batches, attributes of distinct formattings of a batch are
+    gathered into a matrix per style and compared with the style
+    requirements in a single operation. Lengths are compared in EMUs with
+    the bounds of compiled requirements. Violations are the same and in the
+    same order as of Validator.
+
+    Requires NumPy.
+    """
+
+    profiled_methods = Validator.profiled_methods + ('_check_paragraphs',)
+
+    def __init__(self, document, batch_size=None, **kwargs):
+        """
+        :param document: docx.Document or an instance of DocumentWrapper
+                         (or its subclass)
+        :param batch_size: number of paragraphs compared at once. Defaults
+                           to DEFAULT_BATCH_SIZE
+        :param kwargs: Validator keyword arguments
+        """
+        if numpy is None:
+            raise ImportError("Vectorized validation requires NumPy, "
+                              "install it with 'pip install numpy'")
+        super(VectorizedValidator, self).__init__(document, **kwargs)
+        self._batch_size = batch_size or DEFAULT_BATCH_SIZE
+
+    def _iter_section_violations(self, section_requirements):
+        checked = []
+        count = 0
+        for i, section in enumerate(self._docx.iter_sections()):
+            count += 1
+            if i >= len(section_requirements):
+                continue
+            requirements = section_requirements[i]
+            bounds = _get_bounds(requirements)
+            fetched_attr = self._docx.get_section_attributes(
+                section, unit=None,
+                attributes=tuple(requirements['attributes']))
+            checked.extend((i, attr, getattr(fetched_attr, attr), v,
+                            bounds[attr], requirements['unit'])
+                           for attr, v in requirements['attributes'].items())
+        if checked:
+            close = _check([[c[2] for c in checked]], [c[3] for c in checked],
+                           [c[4] for c in checked])[0]
+            for (i, attr, fetched, v, _, unit), ok in zip(checked,
+                                                          close.tolist()):
+                if not ok:
+                    yield Violation('section-attribute', ERROR,
+                                    ('section', i), attribute=attr,
+                                    actual=convert_unit(fetched, unit),
+                                    expected=v)
+        for i in range(len(section_requirements), count):
+            yield Violation('section-undefined', WARNING, ('section', i))
+
+    def _iter_style_violations(self, style_requirements, style_ids=None,
+                               paragraphs=None):
+        incremental = self._incremental
+        if incremental is not None and incremental.bound:
+            # Most paragraphs are not checked at all
+            violations = super(VectorizedValidator,
+                               self)._iter_style_violations(
+                style_requirements, style_ids, paragraphs)
+            yield from violations
+            return
+        self._paragraph_cache = _VerdictCache(self._cache_size)
+        self._font_cache = _VerdictCache(self._cache_size)
+        start, stop = paragraphs or (0, None)
+        transient = self._docx.transient
+        batch = []
+        for i, context, paragraph in self._docx.walk(style_ids, start or 0,
+                                                     stop):
+            if transient:
+                # Batched paragraphs have to outlive the walk step
+                paragraph = Paragraph(copy.deepcopy(paragraph._p),
+                                      paragraph._parent)
+            batch.append((i, context, paragraph))
+            if len(batch) == self._batch_size:
+                yield from self._iter_batch_violations(batch,
+                                                       style_requirements)
+                batch = []
+        yield from self._iter_batch_violations(batch, style_requirements)
+
+    def _iter_batch_violations(self, batch, style_requirements):
+        docx = self._docx
+        cache = self._paragraph_cache
+        paragraphs = []
+        formattings = {}
+        for i, context, paragraph in batch:
+            style_name = docx.get_style_name(paragraph)
+            signature = None
+            if style_name in style_requirements:
+                signature = docx.get_paragraph_signature(paragraph)
+                if signature not in cache:
+                    formattings.setdefault(style_name, {}).setdefault(
+                        signature, paragraph)
+            paragraphs.append((i, context, paragraph, style_name, signature))
+        for style_name, distinct in formattings.items():
+            requirements = style_requirements[style_name]['paragraph']
+            for signature, mismatches in zip(distinct, self._check_paragraphs(
+                    list(distinct.values()), requirements)):
+                cache.put(signature, mismatches)
+        for i, context, paragraph, style_name, signature in paragraphs:
+            if signature is None:
+                yield Violation('style-undefined', WARNING,
+                                ('paragraph', i), style=style_name,
+                                context=context)
+                continue
+            requirements = style_requirements[style_name]
+            # Verdicts are evicted from the cache only if a batch has more
+            # distinct formattings than the cache size
+            mismatches = cache.get(signature, self._check_paragraph,
+                                   paragraph, requirements['paragraph'])
+            if mismatches:
+                yield from self._iter_mismatch_violations(
+                    paragraph, i, mismatches, style_name, context)
+            yield from self._iter_font_violations(
+                paragraph, i, requirements['font'], self._font_cache,
+                context)
+
+    def _check_paragraphs(self, paragraphs, paragraph_requirements):
+        """Get attributes of paragraphs mismatching required ones.
+
+        :returns: a list of mismatches per paragraph, see
+                  Validator._check_paragraph()
+        """
+
+        unit = paragraph_requirements['unit']
+        attributes = paragraph_requirements['attributes']
+        names = tuple(attributes)
+        if not names:
+            return [()] * len(paragraphs)
+        bounds = _get_bounds(paragraph_requirements)
+        fetched = []
+        for paragraph in paragraphs:
+            fetched_attr = self._docx.get_paragraph_attributes(
+                paragraph, unit=None, attributes=names)
+            fetched.append([getattr(fetched_attr, attr) for attr in names])
+        expected = [attributes[attr] for attr in names]
+        close = _check(fetched, expected, [bounds[attr] for attr in names])
+        return [tuple((attr, convert_unit(fetched_value, unit), value)
+                      for attr, fetched_value, value, ok in zip(
+                          names, values, expected, row) if not ok)
+                for values, row in zip(fetched, close.tolist())]
@@ -2,14 +2,325 @@
 #    Copyright 2017 Vitalii Kulanov
 #
 
-__all__ = ['DocumentWrapper']
+__all__ = ['DocumentWrapper', 'EffectiveStyle', 'FontRecord',
+           'ParagraphAttributes', 'SectionAttributes', 'StyleTableInfo']
+
+import collections
+import functools
+import hashlib
+import math
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Length
+from docx.styles import BabelFish
+from docx.text.font import Font
+from docx.text.paragraph import Paragraph
+from docx.text.parfmt import ParagraphFormat
+from lxml import etree
+
+EffectiveStyle = collections.namedtuple(
+    'EffectiveStyle', ['name', 'font', 'paragraph_format', 'font_flags'])
+StyleTableInfo = collections.namedtuple('StyleTableInfo',
+                                        ['hits', 'misses', 'size'])
+ParagraphAttributes = collections.namedtuple('ParagraphAttributes', [
+    'alignment', 'first_line_indent', 'keep_together', 'keep_with_next',
+    'left_indent', 'line_spacing', 'line_spacing_rule', 'page_break_before',
+    'right_indent', 'space_after', 'space_before', 'widow_control'])
+SectionAttributes = collections.namedtuple('SectionAttributes', [
+    'start_type', 'orientation', 'page_width', 'page_height', 'left_margin',
+    'right_margin', 'top_margin', 'bottom_margin', 'header_distance',
+    'footer_distance', 'gutter'])
+
+_P = qn('w:p')
+_TBL = qn('w:tbl')
+_TR = qn('w:tr')
+_TC = qn('w:tc')
+_SDT = qn('w:sdt')
+_SDT_CONTENT = qn('w:sdtContent')
+_SECT_PR = qn('w:sectPr')
+_P_SECT_PR = '{0}/{1}'.format(qn('w:pPr'), _SECT_PR)
+_R_ID = qn('r:id')
+_W_ID = qn('w:id')
+_W_TYPE = qn('w:type')
+
+_HEADER_FOOTER_REFERENCES = {qn('w:headerReference'): 'header',
+                             qn('w:footerReference'): 'footer'}
+# Relationship type, tag of a note and its context name
+_NOTES = ((RT.FOOTNOTES, qn('w:footnote'), 'footnote'),
+          (RT.ENDNOTES, qn('w:endnote'), 'endnote'))
+
+
+class _Defaults(object):
+    """Stand-in for a style element holding document defaults.
+
+    ``Font`` and ``ParagraphFormat`` proxies read formatting from the
+    ``rPr`` and ``pPr`` children of their element, so this is all it takes
+    to expose ``w:docDefaults`` through them.
+    """
+
+    def __init__(self, rPr=None, pPr=None):
+        self.rPr = rPr
+        self.pPr = pPr
+
+
+@functools.lru_cache(maxsize=None)
+def accessor_plan(cls, exclude=(), include=None):
+    """Get an accessor plan for properties of a python-docx proxy class.
+
+    The plan is built once per set of arguments and is a tuple of
+    (attribute name, getter) pairs for properties defined by the class
+    itself, i.e. not inherited ones.
+
+    :param cls: python-docx proxy class, e.g. docx.text.font.Font
+    :param exclude: names (as a tuple) of properties to be skipped
+    :param include: names (as a tuple) of properties to be fetched. None
+                    value implies all properties
+    """
+
+    return tuple((attr, member.fget) for attr, member in cls.__dict__.items()
+                 if isinstance(member, property) and attr not in exclude and
+                 (include is None or attr in include))
+
+
+#: Number of EMUs (English Metric Units, python-docx Length values) in a
+#: unit of requirements. Values in other units are compared in EMUs as is
+EMUS_PER_UNIT = {'cm': Length._EMUS_PER_CM,
+                 'emu': 1,
+                 'inches': Length._EMUS_PER_INCH,
+                 'mm': Length._EMUS_PER_MM,
+                 'pt': Length._EMUS_PER_PT,
+                 'twips': Length._EMUS_PER_TWIP}
+
+
+def convert_unit(value, unit):
+    """Convert a Length value to a unit, other values are returned as is.
+
+    :param unit: name of a Length property, e.g. 'cm'. None value implies
+                 no conversion
+    """
+
+    if unit is None:
+        return value
+    try:
+        value = value.__getattribute__(unit)
+    except AttributeError:
+        pass
+    return value
+
+
+def to_emu(value, unit):
+    """Convert a value in a unit to the nearest whole number of EMUs."""
+
+    return int(round(value * EMUS_PER_UNIT.get(unit, 1)))
+
+
+def length_bounds(value, unit, rel_tol):
+    """Get EMU bounds of Length values close to a value in a unit.
+
+    A Length x is close to the value, i.e. math.isclose(x converted to the
+    unit, value, rel_tol=rel_tol), if and only if lower <= x <= upper.
+    The bounds are empty (lower > upper) if no Length is close.
+
+    :returns: a (lower, upper) tuple of integers
+    """
+
+    def is_close(emu):
+        return math.isclose(convert_unit(Length(emu), unit), value,
+                            rel_tol=rel_tol)
+
+    emus_per_unit = EMUS_PER_UNIT.get(unit, 1)
+    # Some units (e.g. twips) are rounded to integers when converted
+    resolution = (emus_per_unit
+                  if isinstance(convert_unit(Length(1), unit), int) else 1)
+    lower, upper = sorted((value * emus_per_unit * (1 - rel_tol),
+                           value * emus_per_unit / (1 - rel_tol)))
+    # Bounds found with floats are refined with the very comparison they
+    # replace, so that both agree at the edges as well
+    lower = math.ceil(lower) - resolution // 2 - 1
+    upper = math.floor(upper) + resolution // 2 + 1
+    while lower <= upper and not is_close(lower):
+        lower += 1
+    while upper >= lower and not is_close(upper):
+        upper -= 1
+    if lower <= upper:
+        while is_close(lower - 1):
+            lower -= 1
+        while is_close(upper + 1):
+            upper += 1
+    return lower, upper
+
+
+@functools.lru_cache(maxsize=None)
+def _record_plan(record, cls, include=None):
+    """Get a plan filling a record with properties of a proxy class.
+
+    :param record: namedtuple class of the record
+    :param cls: python-docx proxy class
+    :param include: names (as a tuple) of fields to be filled. None value
+                    implies all fields
+    :returns: a tuple of (field index, attribute name, getter) tuples
+    """
+
+    fields = record._fields
+    return tuple((fields.index(attr), attr, getter)
+                 for attr, getter in accessor_plan(
+                     cls, include=fields if include is None else include)
+                 if attr in fields)
+
+
+#: Boolean font properties. Flags of a run that are turned on are packed
+#: into a bitmask, the n-th flag being the n-th bit
+FONT_FLAGS = tuple(attr for attr, _ in accessor_plan(
+    Font, ('color', 'name', 'size')))
+
+_FONT_FLAG_BITS = {attr: 1 << i for i, attr in enumerate(FONT_FLAGS)}
+_FONT_FLAG_PLAN = tuple((attr, getter, _FONT_FLAG_BITS[attr])
+                        for attr, getter in accessor_plan(
+                            Font, include=FONT_FLAGS))
+
+
+def _pack_flags(font):
+    """Pack flags of a font (a dict of its properties) into a bitmask."""
+
+    flags = 0
+    for attr, _, bit in _FONT_FLAG_PLAN:
+        if font[attr] is True:
+            flags |= bit
+    return flags
+
+
+class FontRecord(object):
+    """Font attributes of a run: size, name and flags as a bitmask.
+
+    Records are compared as a few numbers. Iterating over a record yields
+    its size, name and names of the flags that are turned on, i.e. the
+    form font requirements are specified in.
+    """
+
+    __slots__ = ('size', 'name', 'flags')
+
+    def __init__(self, size, name, flags=0):
+        self.size = size
+        self.name = name
+        self.flags = flags
+
+    @classmethod
+    def from_attributes(cls, attributes, unit=None):
+        """Build a record from font attributes of requirements.
+
+        :param attributes: a size, a font name and names of font flags in
+                           any order
+        :param unit: unit of the size. The size of the record is in EMUs
+                     if specified, i.e. comparable with records fetched
+                     with no unit
+        :returns: None if attributes are not exactly a size, a name and
+                  known flags
+        """
+
+        sizes, names, flags = [], [], 0
+        for value in attributes:
+            if isinstance(value, str):
+                if value in _FONT_FLAG_BITS:
+                    flags |= _FONT_FLAG_BITS[value]
+                else:
+                    names.append(value)
+            elif isinstance(value, (int, float)) and \
+                    not isinstance(value, bool):
+                sizes.append(value)
+            else:
+                return None
+        if len(sizes) != 1 or len(names) != 1:
+            return None
+        size = sizes[0] if unit is None else to_emu(sizes[0], unit)
+        return cls(size, names[0], flags)
+
+    def __iter__(self):
+        yield self.size
+        yield self.name
+        for attr in FONT_FLAGS:
+            if self.flags & _FONT_FLAG_BITS[attr]:
+                yield attr
+
+    def __eq__(self, other):
+        if not isinstance(other, FontRecord):
+            return NotImplemented
+        return (self.size == other.size and self.name == other.name and
+                self.flags == other.flags)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash((self.size, self.name, self.flags))
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__,
+                                 ', '.join(repr(v) for v in self))
+
+
+def _read_properties(proxy, exclude=()):
+    """Get values of all properties of a python-docx proxy object."""
+
+    return {attr: getter(proxy)
+            for attr, getter in accessor_plan(type(proxy), exclude)}
+
+
+def _inherit(value, inherited):
+    return inherited if value is None else value
+
+
+def _iter_blocks(parent):
+    """Iterate over paragraphs and tables, content controls are unwrapped."""
+
+    for child in parent.iterchildren(_P, _TBL, _SDT):
+        if child.tag == _SDT:
+            content = child.find(_SDT_CONTENT)
+            if content is not None:
+                yield from _iter_blocks(content)
+        else:
+            yield child
+
+
+def _walk_blocks(blocks, context):
+    """Walk paragraphs of blocks, descending into (nested) tables.
+
+    :param blocks: paragraph and table elements
+    :param context: context of the blocks, see DocumentWrapper.walk()
+    :returns: (paragraph element, context) pairs
+    """
+
+    table = 0
+    for block in blocks:
+        if block.tag == _P:
+            yield block, context
+            continue
+        for i, row in enumerate(block.iterchildren(_TR)):
+            for j, cell in enumerate(row.iterchildren(_TC)):
+                yield from _walk_blocks(
+                    _iter_blocks(cell),
+                    context + ('table', table, 'row', i, 'cell', j))
+        table += 1
 
 
 class DocumentWrapper(object):
     """Wrapper class for retrieving docx document attributes."""
 
+    #: Whether paragraphs are valid only until the next one is requested
+    transient = False
+
+    _font_except_attributes = ('color',)
+    _paragraph_except_attributes = ('tab_stops',)
+    _style_table = None
+    _style_table_hits = 0
+    _style_table_misses = 0
+
     def __init__(self, document):
         self._document = document
+        self._styles_element = document.styles.element
         self._author = document.core_properties.author
         self._created = document.core_properties.created
         self._modified = document.core_properties.modified
@@ -39,12 +350,164 @@ class DocumentWrapper(object):
         :type styles: list
         """
 
-        for paragraph in self._document.paragraphs:
-            if styles:
-                if paragraph.style.name in styles:
-                    yield paragraph
-            else:
-                yield paragraph
+        style_ids = self.resolve_style_ids(styles) if styles else None
+        for _, paragraph in self.iter_indexed_paragraphs(style_ids):
+            yield paragraph
+
+    def iter_indexed_paragraphs(self, style_ids=None, start=0, stop=None):
+        """Get paragraphs of a document along with their indices.
+
+        See walk() for the arguments.
+        """
+
+        for i, _, paragraph in self.walk(style_ids, start, stop):
+            yield i, paragraph
+
+    def walk(self, style_ids=None, start=0, stop=None):
+        """Walk all the paragraphs of a document in a single pass.
+
+        Paragraphs of the body (including the ones in tables, nested tables
+        and content controls) are visited in document order, then the ones
+        of header and footer parts (each part once, even if it is linked by
+        several sections), footnotes and endnotes. Indices are assigned in
+        this order.
+
+        Paragraphs are filtered by raw style ids, proxies are created only
+        for the paragraphs that are yielded.
+
+        :param style_ids: style ids (as a set, see resolve_style_ids()) of
+                          paragraphs to be fetched. None value implies all
+                          paragraphs
+        :param start: index of the first paragraph to be fetched
+        :param stop: index of the paragraph to stop at, None value implies
+                     the end of a document
+        :returns: (index, context, paragraph) tuples. Context is the path
+                  to the paragraph container as a tuple, e.g. () for the
+                  body, ('table', 0, 'row', 1, 'cell', 2),
+                  ('section', 0, 'header', 'default') or ('footnote', 1)
+        """
+
+        if style_ids is not None:
+            if self._style_table is None:
+                self._style_table = self._build_style_table()
+            # Paragraphs of undefined styles are of the default one
+            known_ids = frozenset(self._style_table)
+            default_in_scope = None in style_ids
+        for i, (element, context) in enumerate(self._walk()):
+            if i < start:
+                continue
+            if stop is not None and i >= stop:
+                break
+            if style_ids is not None:
+                style_id = element.style
+                if style_id not in style_ids and (
+                        style_id in known_ids or not default_in_scope):
+                    continue
+            yield i, context, self._create_paragraph(element)
+
+    def _walk(self):
+        """Walk paragraph elements of a document, see walk().
+
+        :returns: (paragraph element, context) pairs
+        """
+
+        sections = []
+
+        def iter_body_blocks():
+            for element in self._iter_body_elements():
+                tag = element.tag
+                if tag == _P:
+                    sectPr = element.find(_P_SECT_PR)
+                    yield element
+                elif tag == _TBL:
+                    sectPr = None
+                    yield element
+                elif tag == _SDT:
+                    sectPr = None
+                    content = element.find(_SDT_CONTENT)
+                    if content is not None:
+                        yield from _iter_blocks(content)
+                elif tag == _SECT_PR:
+                    sectPr = element
+                else:
+                    continue
+                if sectPr is not None:
+                    # Parts are read once the body is walked
+                    sections.append([
+                        (_HEADER_FOOTER_REFERENCES[ref.tag],
+                         ref.get(_W_TYPE, 'default'), ref.get(_R_ID))
+                        for ref in sectPr.iterchildren(
+                            *_HEADER_FOOTER_REFERENCES)])
+
+        yield from _walk_blocks(iter_body_blocks(), ())
+
+        visited = set()
+        for i, references in enumerate(sections):
+            for kind, ref_type, rel_id in references:
+                part = self._read_related_part(rel_id=rel_id)
+                if part is None or part[0] in visited:
+                    continue
+                visited.add(part[0])
+                yield from _walk_blocks(_iter_blocks(part[1]),
+                                        ('section', i, kind, ref_type))
+
+        for reltype, tag, name in _NOTES:
+            part = self._read_related_part(reltype=reltype)
+            if part is None:
+                continue
+            for note in part[1].iterchildren(tag):
+                # Separators have a type, regular notes do not
+                if note.get(_W_TYPE) is None:
+                    yield from _walk_blocks(_iter_blocks(note),
+                                            (name, int(note.get(_W_ID))))
+
+    def _iter_body_elements(self):
+        return self._document.element.body.iterchildren()
+
+    def _read_related_part(self, rel_id=None, reltype=None):
+        """Read a part related to the main document part.
+
+        :param rel_id: id of the relationship
+        :param reltype: type of the relationship, used if rel_id is None.
+                        The first relationship of the type is taken
+        :returns: (part name, root element) or None if there is no such part
+        """
+
+        part = self._document.part
+        if rel_id is not None:
+            rel = part.rels.get(rel_id)
+        else:
+            rel = next((rel for rel in part.rels.values()
+                        if rel.reltype == reltype), None)
+        if rel is None or rel.is_external:
+            return None
+        target = rel.target_part
+        element = getattr(target, 'element', None)
+        if element is None:
+            # Parts python-docx has no class for, e.g. footnotes
+            element = parse_xml(target.blob)
+        return target.partname, element
+
+    def _create_paragraph(self, element):
+        return Paragraph(element, self._document._body)
+
+    def resolve_style_ids(self, styles):
+        """Get ids of styles specified by their names or ids.
+
+        :param styles: style names (UI ones, e.g. 'Heading 1') or ids (e.g.
+                       'Heading1'), a string is treated as a single style
+        :returns: a frozenset of style ids, None stands for the paragraphs
+                  without a style, i.e. of the default paragraph style
+        """
+
+        if isinstance(styles, str):
+            styles = (styles,)
+        styles = frozenset(styles)
+        if self._style_table is None:
+            self._style_table = self._build_style_table()
+        return frozenset(style_id for style_id, style in
+                         self._style_table.items()
+                         if style.name in styles or style_id in styles)
 
     def iter_sections(self):
         """Iterate over sections in docx document."""
@@ -52,64 +515,206 @@ class DocumentWrapper(object):
         for section in self._document.sections:
             yield section
 
+    def get_style_name(self, paragraph):
+        """Get UI name of the paragraph style."""
+
+        return self.get_effective_style(paragraph._p.style).name
+
+    def style_table_info(self):
+        """Report statistics of the effective style table.
+
+        Hits are lookups of known style ids, misses are lookups of style ids
+        that are not defined in the document (the default paragraph style is
+        used for them, as MS Word does).
+        """
+
+        return StyleTableInfo(self._style_table_hits,
+                              self._style_table_misses,
+                              len(self._style_table or ()))
+
+    def get_styles_digest(self):
+        """Get hex digest of the styles part of a document.
+
+        Documents having equal digests have equal effective styles.
+        """
+
+        return hashlib.sha1(etree.tostring(self._styles_element)).hexdigest()
+
+    def get_effective_style(self, style_id):
+        """Get effective formatting of a style.
+
+        :param style_id: style id, None value implies the default paragraph
+                         style
+        :rtype: EffectiveStyle
+        """
+
+        if self._style_table is None:
+            self._style_table = self._build_style_table()
+        try:
+            effective_style = self._style_table[style_id]
+        except KeyError:
+            self._style_table_misses += 1
+            effective_style = self._style_table[None]
+            # Remember the fallback, so each unknown style is a miss once
+            self._style_table[style_id] = effective_style
+        else:
+            self._style_table_hits += 1
+        return effective_style
+
+    def _build_style_table(self):
+        """Resolve effective formatting of every style in a document.
+
+        Formatting of a style is inherited from its base styles and the
+        document defaults (``w:docDefaults``).
+        """
+
+        styles = self._styles_element
+        rPr = styles.find('{0}/{1}/{2}'.format(
+            qn('w:docDefaults'), qn('w:rPrDefault'), qn('w:rPr')))
+        pPr = styles.find('{0}/{1}/{2}'.format(
+            qn('w:docDefaults'), qn('w:pPrDefault'), qn('w:pPr')))
+        defaults = self._read_style(None, _Defaults(rPr=rPr, pPr=pPr))
+        elements = {style.styleId: style for style in styles.iterfind(
+            qn('w:style')) if style.styleId is not None}
+
+        table = {}
+
+        def resolve(style_id, chain=()):
+            if style_id in table:
+                return table[style_id]
+            style = elements[style_id]
+            base_id = style.basedOn_val
+            if base_id in elements and base_id not in chain:
+                base = resolve(base_id, chain + (style_id,))
+            else:
+                base = defaults
+            own = self._read_style(style.name_val, style)
+            font = {attr: _inherit(value, base.font[attr])
+                    for attr, value in own.font.items()}
+            table[style_id] = EffectiveStyle(
+                name=own.name,
+                font=font,
+                paragraph_format={
+                    attr: _inherit(value, base.paragraph_format[attr])
+                    for attr, value in own.paragraph_format.items()},
+                font_flags=_pack_flags(font))
+            return table[style_id]
+
+        for style_id in elements:
+            resolve(style_id)
+        default_style = styles.default_for(WD_STYLE_TYPE.PARAGRAPH)
+        table[None] = (table[default_style.styleId]
+                       if default_style is not None and
+                       default_style.styleId is not None else defaults)
+        return table
+
+    def _read_style(self, name, element):
+        font = _read_properties(Font(element), self._font_except_attributes)
+        return EffectiveStyle(
+            name=BabelFish.internal2ui(name) if name is not None else None,
+            font=font,
+            paragraph_format=_read_properties(
+                ParagraphFormat(element), self._paragraph_except_attributes),
+            font_flags=_pack_flags(font))
+
     def get_font_attributes(self, paragraph, unit='pt'):
-        """Get font attributes for specified paragraph."""
-
-        runs = []
-        for run in paragraph.runs:
-            size = (run.font.size or
-                    self._find_paragraph_attribute(paragraph.style,
-                                                   'font', 'size'))
-            family = (run.font.name or
-                      self._find_paragraph_attribute(paragraph.style,
-                                                     'font', 'name'))
-            fetched_attributes = [self._convert_unit(size, unit), family]
-            for attr, member in type(paragraph.style.font).__dict__.items():
-                if isinstance(member, property):
-                    val = (run.font.__getattribute__(attr) or
-                           paragraph.style.font.__getattribute__(attr))
-                    if val is True:
-                        fetched_attributes.append(attr)
-            runs.append(fetched_attributes)
-        return runs
-
-    def get_section_attributes(self, section, unit='cm'):
-        """Get attributes for specified section."""
-
-        fetched_attributes = {
-            attr: self._convert_unit(section.__getattribute__(attr), unit)
-            for attr, p in type(section).__dict__.items()
-            if isinstance(p, property)
-        }
-        return fetched_attributes
-
-    def get_paragraph_attributes(self, paragraph, unit='cm'):
-        """Get attributes for specified paragraph."""
-
-        _except_attributes = ('tab_stops',)
-
-        fetched_attributes = {}
-        for attr, member in type(paragraph.paragraph_format).__dict__.items():
-            if isinstance(member, property) and attr not in _except_attributes:
-                fetched_attributes[attr] = self._convert_unit(
-                    paragraph.paragraph_format.__getattribute__(attr) or
-                    self._find_paragraph_attribute(paragraph.style,
-                                                   'paragraph_format',
-                                                   attr),
-                    unit)
-        return fetched_attributes
+        """Get font attributes for specified paragraph.
 
-    def _find_paragraph_attribute(self, p_style, p_element, attr):
-        value = p_style.__getattribute__(p_element).__getattribute__(attr)
-        if value is None and p_style.base_style is not None:
-            return self._find_paragraph_attribute(p_style.base_style,
-                                                  p_element, attr)
-        return value
+        :returns: a list of FontRecord, one per run
+        """
+
+        return [self.get_run_font_attributes(paragraph, run, unit=unit)
+                for run in paragraph.runs]
+
+    def get_run_font_attributes(self, paragraph, run, unit='pt'):
+        """Get font attributes for specified run of a paragraph.
+
+        :param unit: unit of the size. None value implies a Length
+        :rtype: FontRecord
+        """
+
+        style = self.get_effective_style(paragraph._p.style)
+        style_font = style.font
+        if run._r.rPr is None:
+            # No direct formatting, everything comes from the style
+            return FontRecord(convert_unit(style_font['size'], unit),
+                              style_font['name'], style.font_flags)
+        font = run.font
+        # Flags are fetched regardless of requirements, since any flag
+        # that is turned on but not required is a mismatch as well
+        flags = 0
+        for attr, getter, bit in _FONT_FLAG_PLAN:
+            if _inherit(getter(font), style_font[attr]) is True:
+                flags |= bit
+        return FontRecord(
+            convert_unit(_inherit(font.size, style_font['size']), unit),
+            _inherit(font.name, style_font['name']), flags)
 
     @staticmethod
-    def _convert_unit(value, unit):
-        try:
-            value = value.__getattribute__(unit)
-        except AttributeError:
-            pass
-        return value
+    def get_paragraph_signature(paragraph):
+        """Get formatting signature of a paragraph.
+
+        Paragraphs having equal signatures have equal paragraph attributes.
+        """
+
+        pPr = paragraph._p.pPr
+        return paragraph._p.style, (etree.tostring(pPr)
+                                    if pPr is not None else None)
+
+    @staticmethod
+    def get_run_signature(paragraph, run):
+        """Get formatting signature of a run of a paragraph.
+
+        Runs having equal signatures have equal font attributes.
+        """
+
+        rPr = run._r.rPr
+        return paragraph._p.style, (etree.tostring(rPr)
+                                    if rPr is not None else None)
+
+    def get_section_attributes(self, section, unit='cm', attributes=None):
+        """Get attributes for specified section.
+
+        :param unit: unit of lengths. None value implies Length values
+        :param attributes: names (as a tuple) of attributes to be fetched.
+                           None value implies all attributes
+        :returns: SectionAttributes, attributes that are not fetched are
+                  None
+        """
+
+        values = [None] * len(SectionAttributes._fields)
+        plan = _record_plan(SectionAttributes, type(section), attributes)
+        if unit is None:
+            for i, _, getter in plan:
+                values[i] = getter(section)
+        else:
+            for i, _, getter in plan:
+                values[i] = convert_unit(getter(section), unit)
+        return SectionAttributes._make(values)
+
+    def get_paragraph_attributes(self, paragraph, unit='cm', attributes=None):
+        """Get attributes for specified paragraph.
+
+        :param unit: unit of lengths. None value implies Length values
+        :param attributes: names (as a tuple) of attributes to be fetched.
+                           None value implies all attributes
+        :returns: ParagraphAttributes, attributes that are not fetched are
+                  None
+        """
+
+        style_format = self.get_effective_style(
+            paragraph._p.style).paragraph_format
+        paragraph_format = paragraph.paragraph_format
+        values = [None] * len(ParagraphAttributes._fields)
+        plan = _record_plan(ParagraphAttributes, type(paragraph_format),
+                            attributes)
+        if unit is None:
+            for i, attr, getter in plan:
+                values[i] = _inherit(getter(paragraph_format),
+                                     style_format[attr])
+        else:
+            for i, attr, getter in plan:
+                values[i] = convert_unit(
+                    _inherit(getter(paragraph_format), style_format[attr]),
+                    unit)
+        return ParagraphAttributes._make(values)